@@ -1,11 +1,13 @@
 """DSaaS client API module"""
 
+import copy
 import json
 import logging
 import urllib.parse
 import requests
 import urllib
 
+from datetime import datetime
 from pathlib import Path
 from typing import Generator
 from typing import Literal
@@ -13,11 +15,21 @@ from typing import Callable, TypeAlias
 
 from globus_compute_sdk import Client
 
-from aero_client.error import ClientError
+from aero_client.cache import SearchCache
+from aero_client.cache import get_json
+from aero_client.cache import validators
+from aero_client.cache import VersionCache
+from aero_client.error import RemoteError
 from aero_client.jobs import commit_analysis
 from aero_client.jobs import download
 from aero_client.jobs import database_commit
 from aero_client.jobs import get_versions
+from aero_client.jsonstream import iter_json
+from aero_client.records import MODELS
+from aero_client.records import Record
+from aero_client.records import Version
+from aero_client.transport import SESSION
+from aero_client.transport import request
 from aero_client.utils import _client_auth
 from aero_client.utils import CONF
 from aero_client.utils import PolicyEnum
@@ -27,8 +39,10 @@ logger = logging.getLogger(__name__)
 AUTH_ACCESS_TOKEN = _client_auth()
 JSON: TypeAlias = dict[str, "JSON"] | list["JSON"] | str | int | float | bool | None
 
-# tmp fix
-session = requests.Session()
+session = SESSION
+
+VERSION_CACHE = VersionCache(Path(CONF.aero_dir, "cache", "versions"))
+SEARCH_CACHE = SearchCache(maxsize=128, ttl=60)
 
 
 def register_function(func: Callable):
@@ -39,89 +53,441 @@ def register_function(func: Callable):
     return gcc.register_function(func)
 
 
-def list_versions(data_id: str) -> JSON:
+def _parse_time(value: str | datetime | None) -> datetime | None:
+    """Parse ISO 8601 and `ctime` formatted timestamps."""
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return datetime.strptime(value, "%a %b %d %H:%M:%S %Y")
+
+
+def _in_range(
+    version: JSON,
+    min_version: int | None,
+    max_version: int | None,
+    since: datetime | None,
+    until: datetime | None,
+) -> bool:
+    if min_version is not None and version["version"] < min_version:
+        return False
+    if max_version is not None and version["version"] > max_version:
+        return False
+    if since is not None or until is not None:
+        created_at = _parse_time(version.get("created_at"))
+        if created_at is None:
+            return True
+        if since is not None and created_at < since:
+            return False
+        if until is not None and created_at > until:
+            return False
+    return True
+
+
+def list_versions(
+    data_id: str,
+    min_version: int | None = None,
+    max_version: int | None = None,
+    since: str | datetime | None = None,
+    until: str | datetime | None = None,
+    use_cache: bool = True,
+    stream: bool = False,
+    typed: bool = False,
+) -> Generator[JSON | Version, None, None]:
+    """Get the versions of a dataset, in ascending version order.
+
+    Versions are fetched one page at a time and yielded as they arrive.
+    Versions are immutable, so the versions already seen are cached locally
+    and only versions newer than the cached ones are requested from the server.
+
+    With `stream`, the versions of a page are parsed and yielded while the
+    page is downloaded, in the order of the server, instead of once the
+    whole page is loaded.
+
+    Args:
+        data_id (str): The AERO data id.
+        min_version (int | None, optional): Lowest version to return. Defaults to None.
+        max_version (int | None, optional): Highest version to return. Defaults to None.
+        since (str | datetime | None, optional): Only return versions created
+            at or after this time. Defaults to None.
+        until (str | datetime | None, optional): Only return versions created
+            at or before this time. Defaults to None.
+        use_cache (bool, optional): Whether to use the local version cache.
+            Defaults to True.
+        stream (bool, optional): Whether to parse the pages incrementally.
+            Defaults to False.
+        typed (bool, optional): Whether to yield compact `Version` records
+            instead of dicts. Defaults to False.
+
+    Yields:
+        JSON | Version: The version records.
+    """
+    if typed:
+        for version in list_versions(
+            data_id, min_version, max_version, since, until, use_cache, stream
+        ):
+            yield Version.from_json(version)
+        return
+
+    since, until = _parse_time(since), _parse_time(until)
+    cached = VERSION_CACHE.load(data_id) if use_cache else {}
+
+    latest_cached = max(cached, default=0)
+    for number in sorted(cached):
+        if _in_range(cached[number], min_version, max_version, since, until):
+            yield cached[number]
+
+    if max_version is not None and max_version <= latest_cached:
+        return
+
     headers = {"Authorization": f"Bearer {AUTH_ACCESS_TOKEN}"}
     url = urllib.parse.urljoin(CONF.server_url, f"data/{data_id}/versions")
-    req = session.get(
-        url=url,
-        headers=headers,
-        verify=False,
+    params = {"min_version": max(latest_cached + 1, min_version or 0)}
+    if max_version is not None:
+        params["max_version"] = max_version
+    if since is not None:
+        params["since"] = since.isoformat()
+    if until is not None:
+        params["until"] = until.isoformat()
+
+    # only cache contiguous runs of versions so that later calls can resume
+    # from the latest cached version
+    cacheable = (
+        use_cache
+        and since is None
+        and until is None
+        and (min_version or 0) <= latest_cached + 1
     )
 
-    assert req.status_code == 200, str(req.content, encoding="utf-8")
-    try:
-        return req.json()
-    except requests.exceptions.JSONDecodeError:
-        return {
-            "status_code": req.status_code,
-            "message": str(req.content, encoding="utf-8"),
-        }
+    kwargs = {"stream": True} if stream else {}
+    seen = set(cached)
+    page = 1
+    while True:
+        req = request(
+            "GET",
+            url,
+            headers=headers,
+            params=params | {"page": page},
+            verify=False,
+            session=session,
+            raise_for_status=page == 1,
+            **kwargs,
+        )
+
+        # past the last page
+        if req.status_code != 200:
+            break
+
+        if stream:
+            n_seen = len(seen)
+            new = []
+            for version in iter_json(req):
+                if version["version"] in seen:
+                    continue
+                seen.add(version["version"])
+                # only retained to be cached
+                if cacheable:
+                    new.append(version)
+                if _in_range(version, min_version, max_version, since, until):
+                    yield version
+
+            if len(seen) == n_seen:
+                break
+            VERSION_CACHE.update(data_id, new)
+            page += 1
+            continue
+
+        new = [v for v in req.json() if v["version"] not in seen]
+        if len(new) == 0:
+            break
+
+        seen.update(v["version"] for v in new)
+        if cacheable:
+            VERSION_CACHE.update(data_id, new)
+
+        for version in sorted(new, key=lambda v: v["version"]):
+            if _in_range(version, min_version, max_version, since, until):
+                yield version
+
+        page += 1
+
+
+def _typed_pages(
+    pages: Generator[JSON, JSON, JSON], model: type[Record], stream: bool
+) -> Generator[JSON | Record, JSON, JSON]:
+    """Convert the records of `list_metadata` to `model`, keeping its return value."""
+    while True:
+        try:
+            item = next(pages)
+        except StopIteration as e:
+            return e.value
+        if stream:
+            yield model.from_json(item)
+        elif isinstance(item, list):
+            yield [model.from_json(record) for record in item]
+        else:
+            yield item
 
 
 def list_metadata(
     metadata_type: Literal["data", "prov", "flow"],
-) -> Generator[JSON, JSON, JSON]:
+    page: int = 1,
+    stream: bool = False,
+    typed: bool = False,
+) -> Generator[JSON | Record, JSON, JSON]:
     """Get the metadata records.
 
+    With `stream`, the records are yielded one at a time while each page is
+    downloaded and parsed, so memory use is bounded by the size of a record
+    and the first records are available before the page is fully received.
+
     Args:
         metadata_type (Literal["data", "prov", "flow"]): List metadata of a certain type.
+        page (int, optional): Page to start from. Defaults to 1.
+        stream (bool, optional): Whether to yield the records one at a time
+            as they are parsed instead of a page at a time. Defaults to False.
+        typed (bool, optional): Whether to return compact `Data`, `Flow` or
+            `Prov` records instead of dicts. Defaults to False.
 
     Returns:
-        Generation[JSON]: a generator returning up to 15 metadata records at a time.
+        Generation[JSON]: a generator returning up to 15 metadata records at a
+            time, or a single record at a time with `stream`.
     """
+    if typed:
+        return (
+            yield from _typed_pages(
+                list_metadata(metadata_type, page, stream),
+                MODELS[metadata_type],
+                stream,
+            )
+        )
+
     logger.debug("Retrieving all sources from server")
     headers = {"Authorization": f"Bearer {AUTH_ACCESS_TOKEN}"}
+    kwargs = {"stream": True} if stream else {}
 
     url = urllib.parse.urljoin(CONF.server_url, metadata_type)
-    req = session.get(
-        url=url,
+    req = request(
+        "GET",
+        url,
         headers=headers,
+        params={"page": page} if page > 1 else None,
         verify=False,
+        session=session,
+        **kwargs,
     )
 
     try:
-        assert req.status_code == 200, str(req.content, encoding="utf-8")
-        yield req.json()
-
-        page = 1
+        if stream:
+            yield from iter_json(req)
+        else:
+            yield req.json()
 
         while req.status_code == 200:
             page += 1
-            req = session.get(url, headers=headers, params={"page": page}, verify=False)
-            yield req.json()
-    except requests.exceptions.JSONDecodeError:
+            req = request(
+                "GET",
+                url,
+                headers=headers,
+                params={"page": page},
+                verify=False,
+                session=session,
+                raise_for_status=False,
+                **kwargs,
+            )
+            if req.status_code != 200:
+                break
+            if stream:
+                yield from iter_json(req)
+            else:
+                yield req.json()
+    except json.JSONDecodeError as e:
+        # error responses are not arrays of records
         return {
             "status_code": req.status_code,
-            "message": str(req.content, encoding="utf-8"),
+            "message": str(e) if stream else str(req.content, encoding="utf-8"),
         }
 
 
-def search_sources(query: str) -> list[dict[str, str | int]]:
+def _search(query: str, use_cache: bool, **params) -> JSON:
+    """Query `/data/search`, serving and revalidating results from `SEARCH_CACHE`."""
+    key = SEARCH_CACHE.key(query, **params)
+    cached = SEARCH_CACHE.get(key) if use_cache else None
+    if cached is not None and cached[2]:
+        return cached[0]
+
+    headers = {"Authorization": f"Bearer {AUTH_ACCESS_TOKEN}"}
+    if cached is not None:
+        headers |= cached[1]
+
+    url = f"{CONF.server_url}/data/search"
+    req = request(
+        "GET",
+        url,
+        params={"query": query} | params,
+        headers=headers,
+        verify=False,
+        session=session,
+    )
+
+    if req.status_code == 304 and cached is not None:
+        SEARCH_CACHE.touch(key)
+        return cached[0]
+    if req.status_code != 200:
+        raise RemoteError(
+            f"GET {url} returned {req.status_code}",
+            code=req.status_code,
+            message=f"Unexpected search response status {req.status_code}",
+            url=url,
+        )
+
+    try:
+        resp = req.json()
+    except requests.exceptions.JSONDecodeError as e:
+        raise RemoteError(
+            f"GET {url} returned invalid JSON",
+            code=req.status_code,
+            message=str(req.content, encoding="utf-8", errors="replace"),
+            url=url,
+        ) from e
+
+    SEARCH_CACHE.put(key, resp, validators(req.headers))
+    return resp
+
+
+def search_sources(query: str, use_cache: bool = True) -> list[dict[str, str | int]]:
     """Get the sources that match the query
 
+    Results are cached for `SEARCH_CACHE.ttl` seconds, after which they are
+    revalidated with a conditional request.
+
     Args:
         query (str): a Globus Search query string
+        use_cache (bool, optional): Whether to use the search result cache.
+            Defaults to True.
+
+    Raises:
+        RemoteError: if the search failed.
 
     Returns:
         list[dict[str, str | int]]: list of sources matching the query
     """
 
     logger.debug(f"Querying the sources with {query}")
-    params = {"query": query}
-    headers = {"Authorization": f"Bearer {AUTH_ACCESS_TOKEN}"}
-    req = requests.get(
-        f"{CONF.server_url}/data/search", params=params, headers=headers, verify=False
-    )
+    return _search(query, use_cache)
 
-    assert req.status_code == 200, str(req.content, encoding="utf-8")
-    try:
-        resp = req.json()
-    except requests.exceptions.JSONDecodeError:
-        resp = {
-            "status_code": req.status_code,
-            "message": str(req.content, encoding="utf-8"),
-        }
-    return resp
+
+def iter_search_sources(
+    query: str, use_cache: bool = True, stream: bool = False
+) -> Generator[dict[str, str | int], None, None]:
+    """Get the sources that match the query, one page at a time.
+
+    Pages are fetched lazily, so large result sets are never fully loaded.
+    With `stream`, the sources of a page are also parsed and yielded while
+    the page is downloaded, bypassing the search result cache.
+
+    Args:
+        query (str): a Globus Search query string
+        use_cache (bool, optional): Whether to use the search result cache.
+            Defaults to True.
+        stream (bool, optional): Whether to parse the pages incrementally.
+            Defaults to False.
+
+    Yields:
+        dict[str, str | int]: the sources matching the query
+    """
+    logger.debug(f"Paging through the sources matching {query}")
+    if stream:
+        yield from _stream_search(query)
+        return
+
+    first = None
+    page = 1
+    while True:
+        try:
+            results = _search(query, use_cache, page=page)
+        except RemoteError as e:
+            # past the last page
+            if page > 1 and e.code == 404:
+                break
+            raise
+
+        # past the last page, or the server does not page the results
+        if not isinstance(results, list) or len(results) == 0 or results == first:
+            break
+        first = first or results
+
+        yield from results
+        page += 1
+
+
+def _stream_search(query: str) -> Generator[dict[str, str | int], None, None]:
+    """Page through `/data/search`, parsing each page as it is downloaded."""
+    headers = {"Authorization": f"Bearer {AUTH_ACCESS_TOKEN}"}
+    url = f"{CONF.server_url}/data/search"
+    first = None
+    page = 1
+    while True:
+        req = request(
+            "GET",
+            url,
+            params={"query": query, "page": page},
+            headers=headers,
+            verify=False,
+            session=session,
+            raise_for_status=False,
+            stream=True,
+        )
+        if req.status_code != 200:
+            req.close()
+            # past the last page
+            if page > 1 and req.status_code == 404:
+                break
+            raise RemoteError(
+                f"GET {url} returned {req.status_code}",
+                code=req.status_code,
+                message=f"Search page {page} failed with {req.status_code}",
+                url=url,
+            )
+
+        n = 0
+        try:
+            for result in iter_json(req):
+                # the server does not page the results
+                if n == 0 and page > 1 and result == first:
+                    return
+                first = result if first is None else first
+                n += 1
+                yield result
+        except json.JSONDecodeError as e:
+            raise RemoteError(
+                f"GET {url} returned invalid JSON",
+                code=req.status_code,
+                message=f"Search page {page} is not a list of results: {e}",
+                url=url,
+            ) from e
+        finally:
+            req.close()
+
+        if n == 0:
+            break
+        page += 1
+
+
+def _pack_tasks(
+    tasks: list[JSON], pack_size: int, pack_workers: int | None
+) -> list[JSON]:
+    """Group tasks into packs run by a single Globus Compute invocation."""
+    packs = []
+    for i in range(0, len(tasks), pack_size):
+        pack = tasks[i : i + pack_size]
+        packed = {"aero_pack": pack, "pack_workers": pack_workers}
+        if any(task.get("metrics") is True for task in pack):
+            packed["metrics"] = True
+        packs.append(packed)
+    logger.debug(f"Packed {len(tasks)} tasks into {len(packs)} invocations")
+    return packs
 
 
 def register_flow(
@@ -136,6 +502,8 @@ def register_flow(
     timer_delay: int | None = None,
     pull_function_uuid: str | None = None,
     commit_function_uuid: str | None = None,
+    pack_size: int | None = None,
+    pack_workers: int | None = None,
 ) -> None:
     """Register user function to run as a Globus Flow on remote server periodically.
 
@@ -158,9 +526,14 @@ def register_flow(
         commit_function_uuid (str | none, optional): the uuid returned when registering either `aero_client.jobs.database_commit`
             or `aero_client.jobs.commit_analysis` with Globus Compute. The function will register with GC if not provided,
             but issues may arise if local python version does not match endpoint python version. default is none.
+        pack_size (int | None, optional): Number of tasks from `config` to run per Globus Compute
+            invocation. The tasks of a pack share their staged inputs and run in a process pool
+            on the endpoint. Default is None (one invocation per task).
+        pack_workers (int | None, optional): Size of the process pool running a pack.
+            Default is None (the number of CPUs of the endpoint).
 
     Raises:
-        ClientError: if function was not able to be registered as a flow, this error is raised
+        RemoteError: if function was not able to be registered as a flow, this error is raised
 
     Returns:
         str: the timer job uuid.
@@ -171,6 +544,9 @@ def register_flow(
         with open(config) as f:
             tasks = json.load(f)
 
+        if pack_size is not None and pack_size > 1 and len(tasks) > 1:
+            tasks = _pack_tasks(tasks, pack_size, pack_workers)
+
         if len(tasks) > 0:
             kwargs = tasks[0]
 
@@ -211,15 +587,15 @@ def register_flow(
         "Authorization": f"Bearer {AUTH_ACCESS_TOKEN}",
         "Content-type": "application/json",
     }
-    response = requests.post(
+    response = request(
+        "POST",
         f"{CONF.server_url}/flow/register",
         headers=headers,
         data=json.dumps(data),
         verify=False,
+        session=session,
     )
-    if response.status_code == 200:
-        return response.json()
-    raise ClientError(response.status_code, response.content)
+    return response.json()
 
 
 def get_flow(flow_id: str, inputs_only: bool = True) -> dict:
@@ -239,20 +615,20 @@ def get_flow(flow_id: str, inputs_only: bool = True) -> dict:
         "Content-type": "application/json",
     }
 
-    print(headers)
-
-    response = requests.get(
-        f"{CONF.server_url}/flow/{flow_id}",
-        headers=headers,
-        verify=False,
+    # served from the cache when the flow did not change
+    flow = copy.deepcopy(
+        get_json(
+            f"{CONF.server_url}/flow/{flow_id}",
+            headers=headers,
+            verify=False,
+            session=session,
+        )
     )
 
-    assert response.status_code == 200, str(response.content, encoding="utf-8")
-
     if inputs_only:
-        return response.json()["function_args"]["kwargs"]
+        return flow["function_args"]["kwargs"]
     else:
-        return response.json()
+        return flow
 
 
 # TODO: Fix bug where it'll request to login if tokens are not present
@@ -0,0 +1,95 @@
+"""AERO directory bundle module.
+
+Directory outputs are stored as a single uncompressed tar bundle, so that a
+function producing many small files makes one upload and one provenance
+entry. The bundle is recorded with an index of the byte range of every
+member, which lets inputs stage single members with range requests instead
+of fetching and extracting the whole bundle.
+"""
+
+import logging
+import os
+import tarfile
+
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FORMAT = "tar"
+
+
+def write_bundle(directory: str | Path, dest: str | Path) -> dict[str, Any]:
+    """Bundle the regular files of a directory.
+
+    Args:
+        directory (str | Path): Directory to bundle.
+        dest (str | Path): Path of the bundle to write.
+
+    Returns:
+        dict[str, Any]: The bundle index: its `format`, and the `offset` and
+            `size` in the bundle of each member, keyed by relative path.
+    """
+    directory = Path(directory)
+    with tarfile.open(dest, "w", format=tarfile.PAX_FORMAT) as tar:
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for name in sorted(files):
+                path = Path(root, name)
+                if path.is_file() and not path.is_symlink():
+                    tar.add(path, arcname=path.relative_to(directory).as_posix())
+
+    with tarfile.open(dest, "r") as tar:
+        members = {
+            m.name: {"offset": m.offset_data, "size": m.size}
+            for m in tar.getmembers()
+            if m.isfile()
+        }
+
+    logger.debug(f"Bundled {len(members)} files of {directory}")
+    return {"format": BUNDLE_FORMAT, "members": members}
+
+
+def _member_path(directory: Path, name: str) -> Path:
+    path = (directory / name).resolve()
+    if not path.is_relative_to(directory.resolve()):
+        raise ValueError(f"Bundle member {name} is outside of {directory}")
+    return path
+
+
+def extract_bundle(bundle: str | Path, directory: str | Path) -> Path:
+    """Extract the files of a bundle into `directory`.
+
+    Members that are not regular files, or with a path outside of
+    `directory`, are skipped.
+
+    Returns:
+        Path: The directory.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    with tarfile.open(bundle, "r") as tar:
+        for member in tar:
+            if not member.isfile():
+                continue
+            try:
+                path = _member_path(directory, member.name)
+            except ValueError as e:
+                logger.warning(f"Skipping bundle member: {e}")
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tar.extractfile(member) as src, open(path, "wb") as dst:
+                while chunk := src.read(1024 * 1024):
+                    dst.write(chunk)
+    return directory
+
+
+def member_path(directory: str | Path, name: str) -> Path:
+    """Path at which a member of a bundle is staged in `directory`.
+
+    Raises:
+        ValueError: if the member path is outside of `directory`.
+    """
+    path = _member_path(Path(directory), name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
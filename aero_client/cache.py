@@ -0,0 +1,274 @@
+"""AERO client-side cache module."""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+from typing import Mapping
+
+logger = logging.getLogger(__name__)
+
+
+def _atomic_write_json(path: Path, obj: Any) -> None:
+    """Write ``obj`` as JSON to ``path`` so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(obj, f)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+class VersionCache:
+    """Local cache of the (immutable) version records of datasets.
+
+    Versions are stored in one JSON file per dataset under `root`.
+
+    Args:
+        root (str | Path): Directory to store the cache in.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def _path(self, data_id: str) -> Path:
+        return self.root / f"{data_id}.json"
+
+    def load(self, data_id: str) -> dict[int, dict]:
+        """Cached version records of a dataset, keyed by version number."""
+        try:
+            with open(self._path(data_id)) as f:
+                return {int(k): v for k, v in json.load(f)["versions"].items()}
+        except FileNotFoundError:
+            return {}
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Ignoring corrupted version cache for {data_id}: {e}")
+            return {}
+
+    def update(self, data_id: str, versions: list[dict]) -> None:
+        """Add version records to the cache of a dataset."""
+        if len(versions) == 0:
+            return
+        cached = self.load(data_id)
+        cached.update({int(v["version"]): v for v in versions})
+        _atomic_write_json(self._path(data_id), {"versions": cached})
+
+    def clear(self, data_id: str | None = None) -> None:
+        """Remove the cache of one or all datasets."""
+        paths = [self._path(data_id)] if data_id else self.root.glob("*.json")
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+
+def _normalize_query(query: str) -> str:
+    """Collapse whitespace so that equivalent queries share a cache entry."""
+    return " ".join(query.split())
+
+
+class SearchCache:
+    """Bounded in-memory LRU cache of search results with a time to live.
+
+    Entries older than `ttl` are not dropped but returned as stale, so they
+    can be revalidated with a conditional request using their validators.
+
+    Args:
+        maxsize (int, optional): Maximum number of cached queries. Defaults to 128.
+        ttl (float, optional): Seconds a result is fresh. Defaults to 60.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(query: str, **params: Any) -> tuple:
+        """Cache key of a query and its request parameters."""
+        return (_normalize_query(query), *sorted(params.items()))
+
+    def get(self, key: tuple) -> tuple[Any, dict[str, str], bool] | None:
+        """Cached results, validators and freshness of a key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            fresh = time.monotonic() - entry["stored"] < self.ttl
+            return entry["results"], entry["validators"], fresh
+
+    def put(
+        self, key: tuple, results: Any, validators: dict[str, str] | None = None
+    ) -> None:
+        """Cache the results of a key, evicting the least recently used entries."""
+        with self._lock:
+            self._entries[key] = {
+                "results": results,
+                "validators": validators or {},
+                "stored": time.monotonic(),
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def touch(self, key: tuple) -> None:
+        """Mark a revalidated entry as fresh again."""
+        with self._lock:
+            if key in self._entries:
+                self._entries[key]["stored"] = time.monotonic()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def validators(headers: Mapping[str, str]) -> dict[str, str]:
+    """Conditional request headers revalidating a response with `headers`."""
+    conditional = {}
+    if "ETag" in headers:
+        conditional["If-None-Match"] = headers["ETag"]
+    if "Last-Modified" in headers:
+        conditional["If-Modified-Since"] = headers["Last-Modified"]
+    return conditional
+
+
+class ConditionalCache:
+    """Cache of JSON documents revalidated with conditional requests.
+
+    Documents are kept parsed in a bounded in-memory LRU and, when `root` is
+    set, persisted with their validators in one JSON file per document so
+    that other processes (e.g. later Globus Compute tasks on the same
+    endpoint) can revalidate them too. Entries are keyed by URL and
+    credentials, so documents are never shared between users.
+
+    Args:
+        root (str | Path | None, optional): Directory to persist the cache
+            in. Defaults to None (in memory only).
+        maxsize (int, optional): Maximum number of documents kept in memory.
+            Defaults to 256.
+    """
+
+    def __init__(self, root: str | Path | None = None, maxsize: int = 256):
+        self.root = Path(root) if root is not None else None
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url: str, headers: Mapping[str, str]) -> str:
+        credentials = headers.get("Authorization", "")
+        return hashlib.sha256(f"{url}\0{credentials}".encode()).hexdigest()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """The cached `body` and `validators` of a key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        if self.root is None:
+            return None
+        try:
+            with open(self.root / f"{key}.json") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            logger.warning(f"Ignoring corrupted cache entry {key}: {e}")
+            return None
+        self._remember(key, entry)
+        return entry
+
+    def _remember(self, key: str, entry: dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def put(self, key: str, body: Any, conditional: dict[str, str]) -> None:
+        entry = {"body": body, "validators": conditional}
+        self._remember(key, entry)
+        if self.root is not None:
+            _atomic_write_json(self.root / f"{key}.json", entry)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self.root is not None:
+            for path in self.root.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+
+_DEFAULT_CACHE: ConditionalCache | None = None
+
+
+def default_cache() -> ConditionalCache:
+    """The process-wide conditional cache, persisted under `<aero_dir>/cache/http`."""
+    global _DEFAULT_CACHE
+    if _DEFAULT_CACHE is None:
+        from aero_client.utils import CONF
+
+        _DEFAULT_CACHE = ConditionalCache(Path(CONF.aero_dir, "cache", "http"))
+    return _DEFAULT_CACHE
+
+
+def get_json(
+    url: str,
+    headers: Mapping[str, str] | None = None,
+    cache: ConditionalCache | None = None,
+    **kwargs,
+) -> Any:
+    """GET a JSON document, revalidating a cached copy with a conditional request.
+
+    When the server answers `304 Not Modified`, the cached document is
+    returned without transferring or parsing it again. The returned document
+    may be shared with later calls and must not be modified.
+
+    Args:
+        url (str): URL of the document.
+        headers (Mapping[str, str] | None, optional): Request headers.
+            Defaults to None.
+        cache (ConditionalCache | None, optional): Cache to use. Defaults to
+            `default_cache()`.
+        **kwargs: Passed on to `aero_client.transport.request`.
+
+    Raises:
+        RemoteError: if the request failed.
+
+    Returns:
+        Any: The parsed document.
+    """
+    from aero_client.transport import request
+
+    cache = default_cache() if cache is None else cache
+    headers = dict(headers or {})
+    key = cache.key(url, headers)
+
+    entry = cache.get(key)
+    if entry is not None:
+        headers |= entry["validators"]
+
+    resp = request("GET", url, headers=headers, **kwargs)
+    if resp.status_code == 304 and entry is not None:
+        return entry["body"]
+
+    body = resp.json()
+    conditional = validators(resp.headers)
+    if len(conditional) > 0:
+        cache.put(key, body, conditional)
+    return body
@@ -28,6 +28,12 @@ def main():
     # get_parser = subparsers.add_parser("get", help="Get source table from server")
     search_parser = subparsers.add_parser("search", help="Search sources")
     register_parser = subparsers.add_parser("register", help="Register analysis flow")
+    watch_parser = subparsers.add_parser(
+        "watch", help="Trigger ANY/ALL flows when their inputs change"
+    )
+    lineage_parser = subparsers.add_parser(
+        "lineage", help="Show the provenance lineage of a dataset or flow"
+    )
     config_parser = subparsers.add_parser("configure", help="Configure the client")
     _ = subparsers.add_parser("logout", help="Log out of Globus auth")
 
@@ -50,6 +56,35 @@ def main():
         help="list all versions associated with provided data id",
     )
 
+    list_parser.add_argument(
+        "--min-version", type=int, default=None, help="Lowest version to list"
+    )
+    list_parser.add_argument(
+        "--max-version", type=int, default=None, help="Highest version to list"
+    )
+    list_parser.add_argument(
+        "--since",
+        type=str,
+        default=None,
+        help="Only list versions created at or after this ISO 8601 time",
+    )
+    list_parser.add_argument(
+        "--until",
+        type=str,
+        default=None,
+        help="Only list versions created at or before this ISO 8601 time",
+    )
+    list_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not use the local version cache",
+    )
+    list_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print the records as they are received instead of a page at a time",
+    )
+
     # create_parser arguments
     create_parser.add_argument(
         "-n",
@@ -116,6 +151,22 @@ def main():
     )
 
     search_parser.add_argument("query", type=str, help="query to pass to search engine")
+    search_parser.add_argument(
+        "-p",
+        "--paged",
+        action="store_true",
+        help="Fetch and print the results one page at a time",
+    )
+    search_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not use cached search results",
+    )
+    search_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print the results as they are received, implies --paged and --no-cache",
+    )
 
     register_parser.add_argument(
         "-e", "--endpoint-uuid", type=str, help="Globus Compute endpoint uuid"
@@ -155,6 +206,49 @@ def main():
         "-f", "--file", type=str, default=None, help="Configuration file"
     )
 
+    watch_parser.add_argument("flow_ids", nargs="+", help="Flow ids to watch")
+    watch_parser.add_argument(
+        "-i",
+        "--interval",
+        type=float,
+        default=60,
+        help="Seconds between polls. Defaults to 60",
+    )
+    watch_parser.add_argument(
+        "-x",
+        "--exec",
+        type=str,
+        default=None,
+        help="Command to run when a flow is triggered, `{flow_id}` is substituted",
+    )
+
+    lineage_parser.add_argument(
+        "id",
+        type=str,
+        help="Data id, data version (`<data_id>@<version>`) or flow id",
+    )
+    lin_dir = lineage_parser.add_mutually_exclusive_group()
+    lin_dir.add_argument(
+        "-u",
+        "--upstream",
+        action="store_true",
+        help="Show what the id was derived from",
+    )
+    lin_dir.add_argument(
+        "-d",
+        "--downstream",
+        action="store_true",
+        help="Show what was derived from the id (default)",
+    )
+    lineage_parser.add_argument(
+        "--depth", type=int, default=None, help="Maximum number of hops to follow"
+    )
+    lineage_parser.add_argument(
+        "--no-refresh",
+        action="store_true",
+        help="Query the local index without fetching new provenance records",
+    )
+
     args = parser.parse_args()
 
     log_level = getattr(logging, args.log.upper(), None)
@@ -165,20 +259,33 @@ def main():
         if args.id is not None:
             from aero_client.api import list_versions
 
-            versions = list(list_versions(args.id))
-            if len(versions) == 0:
+            n_versions = 0
+            for version in list_versions(
+                args.id,
+                min_version=args.min_version,
+                max_version=args.max_version,
+                since=args.since,
+                until=args.until,
+                use_cache=not args.no_cache,
+                stream=args.stream,
+            ):
+                print(json.dumps(version, indent=4))
+                n_versions += 1
+            if n_versions == 0:
                 print("No versions available.")
-            else:
-                print(json.dumps(versions, indent=4))
         else:
             from aero_client.api import list_metadata
 
-            for page in list_metadata(args.type):
-                print(json.dumps(page, indent=4))
-                try:
-                    _ = input("Press enter to continue or CTRL-D to quit")
-                except EOFError:
-                    break
+            if args.stream:
+                for record in list_metadata(args.type, stream=True):
+                    print(json.dumps(record, indent=4))
+            else:
+                for page in list_metadata(args.type):
+                    print(json.dumps(page, indent=4))
+                    try:
+                        _ = input("Press enter to continue or CTRL-D to quit")
+                    except EOFError:
+                        break
 
     # elif args.command == "get":
     #     try:
@@ -194,18 +301,68 @@ def main():
     #         print(e)
 
     elif args.command == "search":
-        from aero_client.api import search_sources
-
-        res = search_sources(args.query)
+        if args.paged or args.stream:
+            from aero_client.api import iter_search_sources
 
-        if len(res) == 0:
-            print("Search returned no results")
+            n_results = 0
+            for source in iter_search_sources(
+                args.query, use_cache=not args.no_cache, stream=args.stream
+            ):
+                print(json.dumps(source, indent=4))
+                n_results += 1
+            if n_results == 0:
+                print("Search returned no results")
         else:
-            print(json.dumps(res, indent=4))
+            from aero_client.api import search_sources
+
+            res = search_sources(args.query, use_cache=not args.no_cache)
+
+            if len(res) == 0:
+                print("Search returned no results")
+            else:
+                print(json.dumps(res, indent=4))
 
     elif args.command == "register":
         pass
 
+    elif args.command == "watch":
+        import subprocess
+
+        from aero_client.api import get_flow
+        from aero_client.triggers import TriggerScheduler
+        from aero_client.triggers import WatchedFlow
+
+        def trigger(flow, versions):
+            print(json.dumps({"flow_id": flow.flow_id, "versions": versions}))
+            if args.exec is not None:
+                subprocess.run(args.exec.format(flow_id=flow.flow_id), shell=True)
+
+        flows = [
+            WatchedFlow.from_flow(get_flow(flow_id, inputs_only=False))
+            for flow_id in args.flow_ids
+        ]
+        scheduler = TriggerScheduler(flows, trigger=trigger, interval=args.interval)
+        try:
+            scheduler.run()
+        except KeyboardInterrupt:
+            scheduler.stop()
+
+    elif args.command == "lineage":
+        from pathlib import Path
+
+        from aero_client.lineage import LineageIndex
+        from aero_client.utils import CONF
+
+        index = LineageIndex(Path(CONF.aero_dir, "cache", "lineage.json"))
+        if not args.no_refresh:
+            index.refresh()
+
+        if args.upstream:
+            nodes = index.upstream(args.id, depth=args.depth)
+        else:
+            nodes = index.downstream(args.id, depth=args.depth)
+        print(json.dumps(nodes, indent=4))
+
     elif args.command == "configure":
         pprint(dataclasses.asdict(load_conf(args.file, update=True)))
 
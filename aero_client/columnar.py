@@ -0,0 +1,142 @@
+"""AERO columnar sidecar module.
+
+Converts tabular data (CSV/TSV files, DataFrames and Arrow tables) to Parquet
+so that downstream analyses can load typed, column-pruned data instead of
+parsing the full CSV on every run. Requires the optional `pyarrow` dependency
+(`pip install DSaaS-client[columnar]`).
+"""
+
+import logging
+import uuid
+
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+TABULAR_FORMATS = {".csv": ",", ".tsv": "\t"}
+"""Extensions of the tabular file formats that can be converted and their delimiter."""
+
+SIDECAR_FORMAT = ".parquet"
+
+_BLOCK_SIZE = 64 * 1024 * 1024
+
+
+def is_tabular(file_format: str | None) -> bool:
+    """Whether a file with the extension ``file_format`` can be converted."""
+    return file_format is not None and file_format.lower() in TABULAR_FORMATS
+
+
+def _schema(schema) -> list[dict[str, str]]:
+    return [{"name": field.name, "type": str(field.type)} for field in schema]
+
+
+def to_parquet(
+    source: str | Any,
+    file_format: str | None = None,
+    dest_dir: str | None = None,
+) -> dict[str, Any]:
+    """Write a Parquet copy of tabular data.
+
+    CSV files are converted block by block so memory use is bounded by the
+    block size rather than by the size of the file.
+
+    Args:
+        source (str | Any): Path to a CSV/TSV file, a pandas DataFrame or a
+            pyarrow Table.
+        file_format (str | None, optional): Extension of the file at `source`
+            (e.g. `.csv`). Defaults to the suffix of `source`.
+        dest_dir (str | None, optional): Directory to write the Parquet file
+            to. Defaults to the directory of `source`, or `/tmp`.
+
+    Returns:
+        dict[str, Any]: The sidecar metadata: path of the Parquet `file`,
+            its `file_format`, the inferred `schema` and number of `rows`.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+
+    if dest_dir is None:
+        dest_dir = Path(source).parent if isinstance(source, (str, Path)) else "/tmp"
+    dest = Path(dest_dir) / f"{uuid.uuid4()}{SIDECAR_FORMAT}"
+
+    if not isinstance(source, (str, Path)):
+        table = source if isinstance(source, pa.Table) else pa.Table.from_pandas(source)
+        pq.write_table(table, dest)
+        schema, rows = table.schema, table.num_rows
+    else:
+        file_format = file_format or Path(source).suffix
+        parse_options = pacsv.ParseOptions(
+            delimiter=TABULAR_FORMATS[file_format.lower()]
+        )
+        read_options = pacsv.ReadOptions(block_size=_BLOCK_SIZE)
+        rows = 0
+        try:
+            reader = pacsv.open_csv(
+                source, read_options=read_options, parse_options=parse_options
+            )
+            schema = reader.schema
+            with pq.ParquetWriter(dest, schema) as writer:
+                for batch in reader:
+                    writer.write_batch(batch)
+                    rows += batch.num_rows
+        except pa.ArrowInvalid:
+            # types inferred from the first block did not hold for a later one
+            table = pacsv.read_csv(source, parse_options=parse_options)
+            pq.write_table(table, dest)
+            schema, rows = table.schema, table.num_rows
+
+    return {
+        "file": str(dest),
+        "file_format": SIDECAR_FORMAT,
+        "schema": _schema(schema),
+        "rows": rows,
+    }
+
+
+def build_sidecar(
+    path: str | None, data: Any, file_format: str | None
+) -> dict[str, Any] | None:
+    """Build the Parquet sidecar of an output if it is tabular.
+
+    Args:
+        path (str | None): Path of the output file.
+        data (Any): In-memory output content.
+        file_format (str | None): Extension of the output file.
+
+    Returns:
+        dict[str, Any] | None: The sidecar metadata, or None if the output
+            is not tabular or pyarrow is not installed.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        logger.warning("pyarrow is not installed, skipping columnar sidecar.")
+        return None
+
+    if path is not None:
+        file_format = file_format or Path(path).suffix
+        if not is_tabular(file_format):
+            return None
+        return to_parquet(path, file_format=file_format)
+
+    if hasattr(data, "to_csv") or type(data).__module__.startswith("pyarrow"):
+        return to_parquet(data)
+
+    return None
+
+
+def read_columnar(path: str, columns: list[str] | None = None):
+    """Load a Parquet sidecar as a pandas DataFrame.
+
+    Args:
+        path (str): Path of the staged sidecar.
+        columns (list[str] | None, optional): Columns to load. Defaults to all.
+
+    Returns:
+        pandas.DataFrame: The typed table.
+    """
+    import pandas as pd
+
+    return pd.read_parquet(path, columns=columns)
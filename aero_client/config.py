@@ -36,6 +36,43 @@ class ClientConf:  # (BaseModel):
     token_file: str = "client_tokens.json"  # field(default_factory=str, default="client_tokens.json", init=False)
     server_address: Path = "https://aero.emews.org:5001"
     server_url: str = f"{server_address}/osprey/api/v1.0/"
+    hash_algorithm: str = "md5"
+    """
+    Checksum algorithm of stored outputs, see `aero_client.hashing`.
+    """
+    scratch_dir: Path | None = None
+    """
+    Root of the task scratch space, see `aero_client.scratch`.
+    """
+    scratch_quota: int | None = None
+    """
+    Maximum bytes of scratch space a task may use.
+    """
+    transfer_collection_limit: int | None = 4
+    """
+    Concurrent transfers per collection, see `aero_client.transfers`.
+    """
+    transfer_host_limit: int | None = 8
+    """
+    Concurrent transfers per collection host.
+    """
+    transfer_bandwidth: float | None = None
+    """
+    Aggregate transfer bandwidth cap in bytes per second.
+    """
+    offload_threshold: int | None = None
+    """
+    Size in bytes from which objects move by Globus Transfer, see
+    `aero_client.offload`. None to always use HTTPS.
+    """
+    offload_collection: str | None = None
+    """
+    UUID of the collection sharing `offload_dir`.
+    """
+    offload_dir: Path | None = None
+    """
+    Local directory of the worker, the root of `offload_collection`.
+    """
 
     def __post_init__(self):
         # does it ever not exist? probably not so can remove
@@ -64,6 +101,18 @@ def load_conf(conf_file: str, update: bool = False) -> None:
 
     conf_kwargs["server_url"] = f"{conf_kwargs['server_address']}"  # /osprey/api/v1.0/"
     conf_kwargs["aero_dir"] = Path(config["aero"]["cache_dir"]).expanduser().absolute()
+    conf_kwargs["hash_algorithm"] = config["aero"].get("hash_algorithm", "md5")
+    if "scratch_dir" in config["aero"]:
+        conf_kwargs["scratch_dir"] = Path(config["aero"]["scratch_dir"]).expanduser()
+    conf_kwargs["scratch_quota"] = config["aero"].get("scratch_quota")
+    for key in ("transfer_collection_limit", "transfer_host_limit"):
+        if key in config["aero"]:
+            conf_kwargs[key] = config["aero"][key]
+    conf_kwargs["transfer_bandwidth"] = config["aero"].get("transfer_bandwidth")
+    conf_kwargs["offload_threshold"] = config["aero"].get("offload_threshold")
+    conf_kwargs["offload_collection"] = config["aero"].get("offload_collection")
+    if "offload_dir" in config["aero"]:
+        conf_kwargs["offload_dir"] = Path(config["aero"]["offload_dir"]).expanduser()
 
     Path.mkdir(conf_kwargs["aero_dir"], parents=True, exist_ok=True)
 
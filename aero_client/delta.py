@@ -0,0 +1,115 @@
+"""AERO row-delta module.
+
+Detects when a new version of an ingested text source only appends rows to
+the previous version, and stages only those appended rows for analyses
+that opt into incremental processing.
+
+An ingested version opting into delta detection records a `row_delta` block in
+its metadata:
+
+- `source_size`, `source_checksum`, `rows`: size, md5 and data row count of
+  the downloaded content.
+- `header`: the first line of the content.
+- `base_version`, `offset`, `row_offset`: previous version the content
+  appends to, and the byte and row offsets of the appended tail, or None if
+  the content is not an append to the previous version.
+- `append_base`: oldest version from which every following version only
+  appended rows.
+"""
+
+import hashlib
+import logging
+
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+def count_rows(content: bytes) -> int:
+    """Number of data rows (lines, excluding the header line) in ``content``."""
+    if len(content) == 0:
+        return 0
+    lines = content.count(b"\n") + (0 if content.endswith(b"\n") else 1)
+    return lines - 1
+
+
+def detect_append(
+    content: bytes, previous: dict[str, Any] | None, previous_version: int | None
+) -> dict[str, Any]:
+    """Compute the row delta block of newly downloaded content.
+
+    The content is an append of the previous version if it starts with the
+    previous content, i.e. the md5 of its first `source_size` bytes matches
+    the previous `source_checksum`, the prefix ends on a line boundary and
+    holds the previous number of rows.
+
+    Args:
+        content (bytes): The downloaded content.
+        previous (dict[str, Any] | None): Row delta block of the previous version.
+        previous_version (int | None): Previous version number.
+
+    Returns:
+        dict[str, Any]: The row delta block of the new version.
+    """
+    header = content.split(b"\n", 1)[0]
+    delta = {
+        "source_size": len(content),
+        "source_checksum": hashlib.md5(content).hexdigest(),
+        "rows": count_rows(content),
+        "header": header.decode("utf-8", errors="replace"),
+        "base_version": None,
+        "offset": None,
+        "row_offset": None,
+        "append_base": None if previous_version is None else previous_version + 1,
+    }
+
+    if previous is None or previous.get("source_size") is None:
+        return delta
+
+    offset = previous["source_size"]
+    prefix = content[:offset]
+    if (
+        0 < offset <= len(content)
+        and prefix.endswith(b"\n")
+        and hashlib.md5(prefix).hexdigest() == previous["source_checksum"]
+        and count_rows(prefix) == previous["rows"]
+    ):
+        delta["base_version"] = previous_version
+        delta["offset"] = offset
+        delta["row_offset"] = previous["rows"]
+        delta["append_base"] = previous.get("append_base") or previous_version
+    else:
+        logger.debug("Content is not an append of the previous version.")
+
+    return delta
+
+
+def incremental_offset(
+    delta: dict[str, Any] | None, consumed: dict[str, Any] | None, version: int
+) -> dict[str, Any] | None:
+    """Byte and row offsets of the rows appended since a consumed version.
+
+    Args:
+        delta (dict[str, Any] | None): Row delta block of the current version.
+        consumed (dict[str, Any] | None): Version, size and rows of the input
+            last processed by the analysis, as recorded in its state output.
+        version (int): The current version.
+
+    Returns:
+        dict[str, Any] | None: The `since_version`, byte `offset` and
+            `row_offset` of the new rows, and whether there are none
+            (`empty`, the consumed version is the current one), or None if
+            the input must be processed in full.
+    """
+    if delta is None or consumed is None or delta.get("append_base") is None:
+        return None
+
+    if not (delta["append_base"] <= consumed["version"] <= version):
+        return None
+
+    return {
+        "since_version": consumed["version"],
+        "offset": consumed["size"],
+        "row_offset": consumed["rows"],
+        "empty": consumed["size"] >= delta["source_size"],
+    }
@@ -13,3 +13,56 @@ class ClientError(Exception):
 
     def __repr__(self) -> str:
         return f"ClientError({self.code}) : {self.message}"
+
+
+class RemoteError(ClientError):
+    """
+    Error response returned by the AERO server or a Globus collection.
+    """
+
+    def __init__(self, *args: object, **kwargs) -> None:
+        self.url = kwargs.get("url")
+        super().__init__(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"RemoteError({self.code}) : {self.url} : {self.message}"
+
+
+class ChecksumError(ClientError):
+    """
+    Staged data does not match its recorded checksum.
+    """
+
+    def __repr__(self) -> str:
+        return f"ChecksumError({self.code}) : {self.message}"
+
+
+class ScratchQuotaError(ClientError):
+    """
+    Scratch space quota of a task exceeded.
+    """
+
+    def __repr__(self) -> str:
+        return f"ScratchQuotaError({self.code}) : {self.message}"
+
+
+class TransientError(RemoteError):
+    """
+    Retryable failure (connection error, timeout, 429 or 5xx response) that
+    persisted after all retries.
+    """
+
+
+class CircuitOpenError(TransientError):
+    """
+    Request not sent because the circuit breaker of the host is open.
+    """
+
+
+class ReplayError(ClientError):
+    """
+    No recorded response matches a request sent while replaying a cassette.
+    """
+
+    def __repr__(self) -> str:
+        return f"ReplayError({self.code}) : {self.message}"
@@ -0,0 +1,164 @@
+"""AERO local executor module.
+
+Runs the pull → user function → commit chain of AERO flows in a process
+pool on the local machine instead of on a Globus Compute endpoint.
+"""
+
+import logging
+import time
+
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+from typing import Callable
+
+import dill
+
+from aero_client.jobs import commit_analysis
+from aero_client.jobs import database_commit
+from aero_client.jobs import download
+from aero_client.jobs import get_versions
+
+logger = logging.getLogger(__name__)
+
+
+def _timed(fn: Callable, *args, **kwargs) -> tuple[Any, dict[str, int]]:
+    start = time.time_ns()
+    result = fn(*args, **kwargs)
+    end = time.time_ns()
+    return result, {"task_start": start, "task_end": end, "duration": end - start}
+
+
+def _run_task(
+    payload: bytes,
+    kwargs: dict,
+    storage,
+    pull: Callable | None,
+    commit: Callable | None,
+    ingestion: bool,
+) -> dict[str, Any]:
+    """Run one task of a flow in a worker process."""
+    from aero_client.utils import aero_format
+
+    fn = aero_format(dill.loads(payload), storage=storage)
+    metrics = {}
+    args = ()
+
+    if pull is not None:
+        if ingestion:
+            (args, kwargs), metrics["pull"] = _timed(pull, **kwargs)
+        else:
+            (params,), metrics["pull"] = _timed(pull, {"kwargs": kwargs})
+            kwargs = params["kwargs"]
+
+    kwargs, metrics["function"] = _timed(fn, *args, **kwargs)
+
+    response = None
+    if commit is not None:
+        if ingestion:
+            response, metrics["commit"] = _timed(commit, *args, **kwargs)
+        else:
+            response, metrics["commit"] = _timed(commit, kwargs)
+
+    return {"kwargs": kwargs, "commit": response, "metrics": metrics}
+
+
+class LocalExecutor:
+    """Run `aero_format` functions through the AERO flow chain in a local process pool.
+
+    Each task runs the same steps as a flow on a Globus Compute endpoint:
+    `get_versions`, the wrapped function and `commit_analysis` for analyses,
+    or `download`, the wrapped function and `database_commit` for ingestions.
+
+    Args:
+        max_workers (int | None, optional): Number of worker processes.
+            Defaults to the number of CPUs.
+        storage (optional): Storage backend used to stage inputs and store
+            outputs, e.g. `aero_client.storage.LocalStorage`. Defaults to
+            the Globus Guest Collections (`HTTPSStorage`).
+        pull (Callable | None, optional): Function fetching the input
+            versions (or downloading the source for ingestions). `None`
+            skips the step, e.g. when the inputs are already resolved.
+            Defaults to `get_versions` (or `download`).
+        commit (Callable | None, optional): Function committing the
+            provenance. `None` skips the step. Defaults to `commit_analysis`
+            (or `database_commit`).
+        ingestion (bool, optional): Whether the tasks are ingestions.
+            Defaults to False.
+
+    Example:
+        ```py
+        with LocalExecutor(storage=LocalStorage("/tmp/aero"), pull=None, commit=None) as ex:
+            results = ex.map(my_analysis, tasks)
+        ```
+    """
+
+    _DEFAULT = object()
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        storage=None,
+        pull: Callable | None = _DEFAULT,
+        commit: Callable | None = _DEFAULT,
+        ingestion: bool = False,
+    ):
+        if pull is self._DEFAULT:
+            pull = download if ingestion else get_versions
+        if commit is self._DEFAULT:
+            commit = database_commit if ingestion else commit_analysis
+
+        self.storage = storage
+        self.pull = pull
+        self.commit = commit
+        self.ingestion = ingestion
+        self._pool = ProcessPoolExecutor(max_workers=max_workers)
+
+    def submit(self, fn: Callable, **kwargs) -> Future:
+        """Run a task of the (unwrapped) user function `fn`.
+
+        Args:
+            fn (Callable): The user function.
+            **kwargs: The task keyword arguments, as sent by AERO: `aero`
+                holding the `input_data`, `output_data` and `flow_id`, and
+                the function arguments.
+
+        Returns:
+            Future: Resolves to a dict with the task `kwargs` returned by the
+                wrapped function, the `commit` response and per-step `metrics`.
+        """
+        return self._pool.submit(
+            _run_task,
+            dill.dumps(fn),
+            kwargs,
+            self.storage,
+            self.pull,
+            self.commit,
+            self.ingestion,
+        )
+
+    def map(self, fn: Callable, tasks: list[dict]) -> list[dict[str, Any]]:
+        """Run one task per keyword argument dict of `tasks` and wait for all of them."""
+        payload = dill.dumps(fn)
+        futures = [
+            self._pool.submit(
+                _run_task,
+                payload,
+                kwargs,
+                self.storage,
+                self.pull,
+                self.commit,
+                self.ingestion,
+            )
+            for kwargs in tasks
+        ]
+        return [f.result() for f in futures]
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
@@ -0,0 +1,142 @@
+"""AERO checksum module.
+
+Checksums of stored and staged data are computed incrementally while the
+data is read or written. The hash is updated in a background thread, which
+overlaps with the I/O since `hashlib` and `xxhash` release the GIL on large
+buffers.
+
+Supported algorithms are `md5` (the default, for compatibility with the
+checksums already recorded), `sha256`, `blake2b`, `blake2s` and, with the
+optional `xxhash` dependency (`pip install DSaaS-client[xxhash]`), `xxh64`,
+`xxh3_64` and `xxh3_128`.
+"""
+
+import hashlib
+import queue
+import threading
+
+from typing import Any
+from typing import BinaryIO
+
+DEFAULT_ALGORITHM = "md5"
+
+HASHLIB_ALGORITHMS = ("md5", "sha256", "blake2b", "blake2s")
+XXHASH_ALGORITHMS = ("xxh64", "xxh3_64", "xxh3_128")
+
+_BATCH_SIZE = 256 * 1024
+"""Bytes handed over to the hashing thread at once. Smaller chunks, e.g. the
+16 KiB reads of `http.client`, are batched since a handoff per chunk would
+cost more than it overlaps."""
+
+
+def new_hash(algorithm: str = DEFAULT_ALGORITHM) -> Any:
+    """A new hash object of `algorithm`, with `update` and `hexdigest` methods."""
+    if algorithm in HASHLIB_ALGORITHMS:
+        return hashlib.new(algorithm)
+    if algorithm in XXHASH_ALGORITHMS:
+        try:
+            import xxhash
+        except ImportError as e:
+            raise ImportError(
+                f"The {algorithm} checksum requires the `xxhash` package"
+            ) from e
+        return getattr(xxhash, algorithm)()
+    raise ValueError(
+        f"Unsupported checksum algorithm {algorithm}, "
+        f"choose from {HASHLIB_ALGORITHMS + XXHASH_ALGORITHMS}"
+    )
+
+
+def checksum(content: bytes, algorithm: str = DEFAULT_ALGORITHM) -> str:
+    """Checksum of in-memory content."""
+    h = new_hash(algorithm)
+    h.update(content)
+    return h.hexdigest()
+
+
+class BackgroundHasher:
+    """Hash updated from a background thread.
+
+    `update` batches chunks and hands them over to a worker thread through
+    a bounded queue, so the caller can read or write the next chunk while
+    the previous ones are hashed. Content smaller than a batch is hashed
+    inline. Chunks must not be modified after `update`.
+
+    Args:
+        algorithm (str, optional): Checksum algorithm. Defaults to `md5`.
+    """
+
+    def __init__(self, algorithm: str = DEFAULT_ALGORITHM):
+        self.algorithm = algorithm
+        self._hash = new_hash(algorithm)
+        self._queue: queue.Queue | None = None
+        self._thread: threading.Thread | None = None
+        self._batch = bytearray()
+
+    def _work(self) -> None:
+        while (chunk := self._queue.get()) is not None:
+            self._hash.update(chunk)
+
+    def _submit(self, chunk: bytes | bytearray) -> None:
+        if self._thread is None:
+            self._queue = queue.Queue(maxsize=4)
+            self._thread = threading.Thread(target=self._work, daemon=True)
+            self._thread.start()
+        self._queue.put(chunk)
+
+    def update(self, chunk: bytes) -> None:
+        if not self._batch and len(chunk) >= _BATCH_SIZE:
+            self._submit(chunk)
+            return
+        self._batch += chunk
+        if len(self._batch) >= _BATCH_SIZE:
+            self._submit(self._batch)
+            self._batch = bytearray()
+
+    def _join(self) -> None:
+        if self._thread is None:
+            self._hash.update(self._batch)
+        else:
+            if self._batch:
+                self._queue.put(self._batch)
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        self._batch = bytearray()
+
+    def hexdigest(self) -> str:
+        """Wait for the pending chunks and return the checksum."""
+        self._join()
+        return self._hash.hexdigest()
+
+    def reset(self) -> None:
+        """Discard the pending chunks and restart from an empty hash."""
+        self._batch = bytearray()
+        self._join()
+        self._hash = new_hash(self.algorithm)
+
+
+class HashingWriter:
+    """File-like wrapper computing the checksum of the content written to it.
+
+    Args:
+        fileobj (BinaryIO): The file to write to.
+        algorithm (str, optional): Checksum algorithm. Defaults to `md5`.
+    """
+
+    def __init__(self, fileobj: BinaryIO, algorithm: str = DEFAULT_ALGORITHM):
+        self._fileobj = fileobj
+        self.hash = BackgroundHasher(algorithm)
+        self.size = 0
+
+    def write(self, chunk: bytes) -> int:
+        chunk = bytes(chunk)
+        self.hash.update(chunk)
+        self.size += len(chunk)
+        return self._fileobj.write(chunk)
+
+    def tell(self) -> int:
+        return self._fileobj.tell()
+
+    def flush(self) -> None:
+        self._fileobj.flush()
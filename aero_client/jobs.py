@@ -1,29 +1,50 @@
 """AERO flow compute function definition."""
 
 
+DOWNLOAD_CONCURRENCY = 8
+"""Default maximum number of sources an ingestion downloads at once."""
+
+
 def download(*args, **kwargs) -> tuple[str, str]:
     """Download data from user-specified repository.
 
+    Every source the flow contributes to is downloaded, concurrently, at most
+    `aero["download_concurrency"]` (default `DOWNLOAD_CONCURRENCY`) at a time.
+    Downloads also hold a slot of the process transfer scheduler for their
+    source host and are streamed to disk within its bandwidth cap, see
+    `aero_client.transfers`.
+
     Returns:
         tuple[str, str]: Path to the data and its
             associated extension.
     """
-    import hashlib
+    import codecs
+    import logging
     import pathlib
-    import requests
+    import urllib.parse
     import uuid
     import time
+    from concurrent.futures import ThreadPoolExecutor
     from mimetypes import guess_extension
     from pathlib import Path
 
+    from aero_client.cache import get_json
+    from aero_client.error import RemoteError
+    from aero_client.hashing import HashingWriter
+    from aero_client.transfers import scheduler
+    from aero_client.transport import STATS
+    from aero_client.transport import request
     from aero_client.utils import CONF
     from aero_client.utils import load_tokens
 
+    logger = logging.getLogger(__name__)
+
     task_start: float
     task_end: float
 
     if "metrics" in kwargs and kwargs["metrics"] is True:
         task_start = time.time_ns()
+        http_start = STATS.snapshot()
 
     outputs = list(kwargs["aero"]["output_data"].items())
 
@@ -38,47 +59,104 @@ def download(*args, **kwargs) -> tuple[str, str]:
 
     headers = {"Authorization": f"Bearer {auth_token}"}
 
-    # assert False, CONF.server_url
-    response = requests.get(
+    # flow definitions rarely change, revalidate the cached copy
+    flow = get_json(
         f'{CONF.server_url}/flow/{kwargs["aero"]["flow_id"]}',
         headers=headers,
         verify=False,
     )
-    flow = response.json()
-
-    assert response.status_code == 200, response
-
-    data = flow["contributed_to"][
-        0
-    ]  # assuming only one contribution / ingesting flow for now
 
-    response = requests.get(data["url"])
-    content_type = response.headers["content-type"]
-    encoding = response.encoding
-    ext = guess_extension(content_type.split(";")[0])
-
-    bn = str(uuid.uuid4())
-    fn = Path(TEMP_DIR, bn)
+    sources = []
+    for data in flow["contributed_to"]:
+        if data["name"] in kwargs["aero"]["output_data"]:
+            sources.append(data)
+        else:
+            logger.warning(f"No output_data entry for source {data['name']}, skipped.")
 
     TEMP_DIR.mkdir(exist_ok=True, parents=True)
 
-    try:
-        with open(fn, "w+") as f:
-            f.write(response.content.decode(encoding=encoding))
-    except UnicodeDecodeError:
-        with open(fn, "wb") as f:
-            f.write(response.content)
-
-    kwargs["aero"]["output_data"][data["name"]]["id"] = data["id"]
-    kwargs["aero"]["output_data"][data["name"]]["file"] = str(fn)
-    kwargs["aero"]["output_data"][data["name"]]["file_bn"] = bn
-    kwargs["aero"]["output_data"][data["name"]]["file_format"] = ext
-    kwargs["aero"]["output_data"][data["name"]]["checksum"] = hashlib.md5(
-        response.content
-    ).hexdigest()
-    kwargs["aero"]["output_data"][data["name"]]["size"] = fn.stat().st_size
-    kwargs["aero"]["output_data"][data["name"]]["download"] = True
-    kwargs["aero"]["output_data"][data["name"]]["encoding"] = encoding
+    def fetch(data: dict) -> dict[str, int]:
+        start = time.time_ns()
+        md = kwargs["aero"]["output_data"][data["name"]]
+
+        bn = str(uuid.uuid4())
+        fn = Path(TEMP_DIR, bn)
+
+        transfers = scheduler()
+        host = urllib.parse.urlparse(data["url"]).netloc
+        with transfers.slot(host, host):
+            response = request("GET", data["url"], stream=True)
+            try:
+                with open(fn, "wb") as f:
+                    # checksum of the downloaded bytes, computed as they arrive
+                    out = HashingWriter(f, CONF.hash_algorithm)
+                    for chunk in response.iter_content(1024 * 1024):
+                        transfers.throttle(len(chunk))
+                        out.write(chunk)
+            finally:
+                response.close()
+
+        content_type = response.headers["content-type"]
+        encoding = response.encoding
+        ext = guess_extension(content_type.split(";")[0])
+
+        # text is stored in the local encoding, UTF-8 content as downloaded
+        if encoding is not None and codecs.lookup(encoding).name not in (
+            "utf-8",
+            "ascii",
+        ):
+            content = fn.read_bytes()
+            try:
+                with open(fn, "w+") as f:
+                    f.write(content.decode(encoding=encoding))
+            except UnicodeDecodeError:
+                fn.write_bytes(content)
+
+        md["id"] = data["id"]
+        md["file"] = str(fn)
+        md["file_bn"] = bn
+        md["file_format"] = ext
+        md["checksum"] = out.hash.hexdigest()
+        md["checksum_algorithm"] = CONF.hash_algorithm
+        md["size"] = fn.stat().st_size
+        md["download"] = True
+        md["encoding"] = encoding
+
+        if md.get("delta") is True:
+            from aero_client.delta import detect_append
+
+            previous, previous_version = None, None
+            try:
+                latest = get_json(
+                    f'{CONF.server_url}/data/{data["id"]}/latest',
+                    headers=headers,
+                    verify=False,
+                )
+                previous_version = latest["version"]
+                previous = latest["data_file"].get("row_delta")
+            except RemoteError as e:
+                if e.code != 404:
+                    raise
+
+            # computed over the stored file, which is what analyses stage
+            md["row_delta"] = detect_append(fn.read_bytes(), previous, previous_version)
+
+        end = time.time_ns()
+        return {
+            "task_start": start,
+            "task_end": end,
+            "duration": end - start,
+            "size": md["size"],
+        }
+
+    concurrency = kwargs["aero"].get("download_concurrency") or DOWNLOAD_CONCURRENCY
+    if len(sources) == 1:
+        source_metrics = {sources[0]["name"]: fetch(sources[0])}
+    else:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            futures = {data["name"]: pool.submit(fetch, data) for data in sources}
+        # every source was attempted, fail the task on the first error
+        source_metrics = {name: f.result() for name, f in futures.items()}
 
     if "metrics" in kwargs and kwargs["metrics"] is True:
         task_end = time.time_ns()
@@ -86,6 +164,8 @@ def download(*args, **kwargs) -> tuple[str, str]:
             "task_start": task_start,
             "task_end": task_end,
             "duration": task_end - task_start,
+            "http": STATS.since(http_start),
+            "sources": source_metrics,
         }
 
     return args, kwargs
@@ -98,8 +178,9 @@ def database_commit(*args, **kwargs) -> dict[str, int | float | str | dict]:
         dict: Response dictionary returned by user function with optional metrics appended.
     """
     import json
-    import requests
     import time
+    from aero_client.transport import STATS
+    from aero_client.transport import request
     from aero_client.utils import CONF
     from aero_client.utils import load_tokens
 
@@ -108,6 +189,7 @@ def database_commit(*args, **kwargs) -> dict[str, int | float | str | dict]:
 
     if "metrics" in kwargs and kwargs["metrics"] is True:
         task_start = time.time_ns()
+        http_start = STATS.snapshot()
 
     tokens = load_tokens()
 
@@ -116,22 +198,23 @@ def database_commit(*args, **kwargs) -> dict[str, int | float | str | dict]:
 
     aero_headers["Content-type"] = "application/json"
 
-    # add provenance
-    response = requests.post(
+    # add provenance of every downloaded source in one request
+    response = request(
+        "POST",
         f"{CONF.server_url}/prov/new",
         headers=aero_headers,
         verify=False,
         data=json.dumps(kwargs["aero"]),
     )
 
-    assert response.status_code == 200, response.json()
-
     if "metrics" in kwargs and kwargs["metrics"] is True:
         task_end = time.time_ns()
         kwargs["download_metrics"] = {
             "task_start": task_start,
             "task_end": task_end,
             "duration": task_end - task_start,
+            "http": STATS.since(http_start),
+            "sources": len(kwargs["aero"]["output_data"]),
         }
 
         outkwargs = response.json()
@@ -148,8 +231,9 @@ def get_versions(*function_params) -> dict:
     Returns:
         dict: Function parameters to send to user-defined analysis function.
     """
-    import requests
     import time
+    from aero_client.cache import get_json
+    from aero_client.error import RemoteError
     from aero_client.utils import CONF
     from aero_client.utils import load_tokens
 
@@ -172,16 +256,46 @@ def get_versions(*function_params) -> dict:
 
         for name, md in kw["aero"]["input_data"].items():
             if md["version"] is None:
-                response = requests.get(
+                latest = get_json(
                     f"{CONF.server_url}/data/{md['id']}/latest",
                     headers=aero_headers,
                     verify=False,
                 )
-
-                assert response.status_code == 200, response.content
-                md["version"] = response.json()["version"]
-                md["file_bn"] = response.json()["data_file"]["file_name"]
-                md["encoding"] = response.json()["data_file"]["encoding"]
+                md["version"] = latest["version"]
+                md["file_bn"] = latest["data_file"]["file_name"]
+                md["encoding"] = latest["data_file"]["encoding"]
+                if latest["data_file"].get("sidecar") is not None:
+                    md["sidecar"] = latest["data_file"]["sidecar"]
+                if latest["data_file"].get("bundle") is not None:
+                    md["bundle"] = latest["data_file"]["bundle"]
+                # to pick the transfer method and verify the staged input
+                for key in ("size", "checksum", "checksum_algorithm"):
+                    if latest["data_file"].get(key) is not None:
+                        md[key] = latest["data_file"][key]
+                if md.get("delta") is True:
+                    md["row_delta"] = latest["data_file"].get("row_delta")
+
+        # previous version of state outputs for incremental analyses
+        for name, md in kw["aero"].get("output_data", {}).items():
+            if md.get("state") is not True or "id" not in md:
+                continue
+
+            try:
+                latest = get_json(
+                    f"{CONF.server_url}/data/{md['id']}/latest",
+                    headers=aero_headers,
+                    verify=False,
+                )
+            except RemoteError as e:
+                if e.code != 404:
+                    raise
+                continue
+
+            md["previous"] = {
+                "version": latest["version"],
+                "file_bn": latest["data_file"]["file_name"],
+                "consumed": latest["data_file"].get("consumed"),
+            }
 
     if metrics is True:
         task_end = time.time_ns()
@@ -201,9 +315,9 @@ def commit_analysis(*arglist) -> dict:
         dict: Response from database update.
     """
     import json
-    import requests
     import time
 
+    from aero_client.transport import request
     from aero_client.utils import CONF
     from aero_client.utils import load_tokens
 
@@ -220,20 +334,27 @@ def commit_analysis(*arglist) -> dict:
     aero_headers = {"Authorization": f"Bearer {auth_token}"}
     aero_headers["Content-type"] = "application/json"
 
-    responses = []
+    # packed invocations return the results of each of their tasks
+    tasks = []
     for task_kwargs in arglist:
+        if "aero_pack" in task_kwargs:
+            tasks.extend(t for t in task_kwargs["aero_pack"] if "error" not in t)
+        else:
+            tasks.append(task_kwargs)
+
+    responses = []
+    for task_kwargs in tasks:
         assert "input_data" in task_kwargs["aero"]
         assert "output_data" in task_kwargs["aero"]
         assert "flow_id" in task_kwargs["aero"]
 
-        response = requests.post(
+        response = request(
+            "POST",
             f"{CONF.server_url}/prov/new",
             headers=aero_headers,
             verify=False,
-            data=json.dumps(task_kwargs["aero"])
+            data=json.dumps(task_kwargs["aero"]),
         )
-
-        assert response.status_code == 200, response.content
         responses.append(response.json())
 
     if metrics is True:
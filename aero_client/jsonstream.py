@@ -0,0 +1,131 @@
+"""AERO streaming JSON module.
+
+Parses the records of a JSON array response while it is downloaded, so
+that memory use is bounded by the size of a record rather than of the
+response, and the first records are available before the download ends.
+"""
+
+import codecs
+import json
+
+from typing import Any
+from typing import Generator
+from typing import Iterable
+
+import requests
+
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+
+
+def _skip(buf: str, pos: int) -> int:
+    while pos < len(buf) and buf[pos] in _WHITESPACE:
+        pos += 1
+    return pos
+
+
+def iter_array(chunks: Iterable[bytes]) -> Generator[Any, None, None]:
+    """Yield the elements of a JSON array as its bytes arrive.
+
+    Args:
+        chunks (Iterable[bytes]): The UTF-8 encoded document, in chunks.
+
+    Raises:
+        json.JSONDecodeError: if the document is not a valid JSON array.
+
+    Yields:
+        Any: The decoded elements.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        for chunk in chunks:
+            if len(chunk) > 0:
+                buf = buf[pos:] + utf8.decode(chunk)
+                pos = 0
+                return True
+        buf = buf[pos:] + utf8.decode(b"", final=True)
+        pos = 0
+        eof = True
+        return False
+
+    while True:
+        pos = _skip(buf, pos)
+        if pos < len(buf) or eof:
+            break
+        fill()
+
+    if pos == len(buf):
+        raise json.JSONDecodeError("Empty document", buf, pos)
+
+    if buf[pos] != "[":
+        raise json.JSONDecodeError("Expecting an array", buf, pos)
+    pos += 1
+
+    count = 0
+    expect_value = True
+    while True:
+        pos = _skip(buf, pos)
+        if pos == len(buf):
+            if eof:
+                raise json.JSONDecodeError("Unterminated array", buf, pos)
+            fill()
+            continue
+
+        if buf[pos] == "]":
+            if expect_value and count > 0:
+                raise json.JSONDecodeError("Trailing comma", buf, pos)
+            return
+        if not expect_value:
+            if buf[pos] != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos)
+            pos += 1
+            expect_value = True
+            continue
+
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            fill()
+            continue
+
+        # a number at the end of the buffer may continue in the next chunk
+        if _skip(buf, end) == len(buf) and not eof:
+            fill()
+            continue
+
+        yield value
+        count += 1
+        pos = end
+        expect_value = False
+
+
+def iter_json(
+    resp: requests.Response, chunk_size: int = CHUNK_SIZE
+) -> Generator[Any, None, None]:
+    """Yield the records of a JSON array response as it is downloaded.
+
+    The response should be requested with `stream=True`, it is closed once
+    consumed.
+
+    Args:
+        resp (requests.Response): The response.
+        chunk_size (int, optional): Bytes read at a time. Defaults to 64 KiB.
+
+    Yields:
+        Any: The records.
+    """
+    try:
+        yield from iter_array(resp.iter_content(chunk_size=chunk_size))
+    finally:
+        resp.close()
@@ -0,0 +1,206 @@
+"""AERO provenance lineage module.
+
+Indexes the provenance records as a graph linking the data versions used
+by a flow run to the flow and to the data versions it produced, so that
+upstream and downstream queries do not have to scan every record.
+"""
+
+import hashlib
+import json
+import logging
+
+from collections import deque
+from pathlib import Path
+from typing import Any
+from typing import Iterable
+
+from aero_client.cache import _atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+FLOW_PREFIX = "flow:"
+
+
+def data_node(data_id: str, version: int | None = None) -> str:
+    """Node of a data version, or of a dataset when the version is unknown."""
+    return data_id if version is None else f"{data_id}@{version}"
+
+
+def _data_nodes(data: dict | list | None) -> list[str]:
+    entries = data.values() if isinstance(data, dict) else data or []
+    return [
+        data_node(d["id"], d.get("version"))
+        for d in entries
+        if isinstance(d, dict) and d.get("id") is not None
+    ]
+
+
+def _record_key(record: dict) -> str:
+    if record.get("id") is not None:
+        return str(record["id"])
+    return hashlib.md5(json.dumps(record, sort_keys=True).encode()).hexdigest()
+
+
+class LineageIndex:
+    """Adjacency index over provenance records.
+
+    Nodes are data versions (`<data_id>@<version>`) and flows
+    (`flow:<flow_id>`). Every record adds the edges
+    `input version -> flow -> output version`.
+
+    Args:
+        path (str | Path | None, optional): File persisting the index. The
+            index is loaded from it if it exists. Defaults to None.
+    """
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path is not None else None
+        self.up: dict[str, set[str]] = {}
+        self.down: dict[str, set[str]] = {}
+        self.versions: dict[str, set[str]] = {}
+        self.seen: set[str] = set()
+        self.page = 1
+
+        if self.path is not None:
+            self.load()
+
+    def _link(self, src: str, dst: str) -> None:
+        self.down.setdefault(src, set()).add(dst)
+        self.up.setdefault(dst, set()).add(src)
+
+    def add(self, record: dict) -> bool:
+        """Index a provenance record, returning False if it was already indexed."""
+        key = _record_key(record)
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+
+        inputs = _data_nodes(record.get("input_data"))
+        outputs = _data_nodes(record.get("output_data"))
+        for node in inputs + outputs:
+            self.versions.setdefault(node.split("@", 1)[0], set()).add(node)
+
+        if record.get("flow_id") is not None:
+            flow = f"{FLOW_PREFIX}{record['flow_id']}"
+            for node in inputs:
+                self._link(node, flow)
+            for node in outputs:
+                self._link(flow, node)
+        else:
+            for src in inputs:
+                for dst in outputs:
+                    self._link(src, dst)
+        return True
+
+    def update(self, records: Iterable[dict]) -> int:
+        """Index records, returning the number of new ones."""
+        return sum(self.add(r) for r in records)
+
+    def refresh(self) -> int:
+        """Index the provenance records added on the server since the last refresh.
+
+        Paging resumes from the last page seen, which may have been partial.
+
+        Returns:
+            int: The number of new records.
+        """
+        from aero_client.api import list_metadata
+
+        new = 0
+        page = self.page
+        for records in list_metadata("prov", page=page):
+            if not isinstance(records, list):
+                break
+            new += self.update(records)
+            if len(records) > 0:
+                self.page = page
+            page += 1
+
+        logger.debug(f"Indexed {new} new provenance records")
+        if self.path is not None and new > 0:
+            self.save()
+        return new
+
+    def _resolve(self, node: str) -> list[str]:
+        """Nodes matching a query: a data version, a dataset or a flow id."""
+        if node in self.up or node in self.down:
+            return [node]
+        if node in self.versions:
+            return sorted(self.versions[node])
+        flow = f"{FLOW_PREFIX}{node}"
+        if flow in self.up or flow in self.down:
+            return [flow]
+        return []
+
+    def _walk(
+        self, edges: dict[str, set[str]], node: str, depth: int | None
+    ) -> dict[str, int]:
+        start = self._resolve(node)
+        distances = {n: 0 for n in start}
+        queue = deque(start)
+        while queue:
+            current = queue.popleft()
+            if depth is not None and distances[current] >= depth:
+                continue
+            for nxt in edges.get(current, ()):
+                if nxt not in distances:
+                    distances[nxt] = distances[current] + 1
+                    queue.append(nxt)
+        return {n: d for n, d in distances.items() if d > 0}
+
+    def upstream(self, node: str, depth: int | None = None) -> dict[str, int]:
+        """Flows and data versions `node` was derived from, with their distance.
+
+        Args:
+            node (str): A data version (`<data_id>@<version>`), a data id
+                (all of its versions) or a flow id.
+            depth (int | None, optional): Maximum number of edges to follow.
+                Defaults to None (no limit).
+
+        Returns:
+            dict[str, int]: The upstream nodes and their distance to `node`.
+        """
+        return self._walk(self.up, node, depth)
+
+    def downstream(self, node: str, depth: int | None = None) -> dict[str, int]:
+        """Flows and data versions derived from `node`, with their distance.
+
+        Args:
+            node (str): A data version (`<data_id>@<version>`), a data id
+                (all of its versions) or a flow id.
+            depth (int | None, optional): Maximum number of edges to follow.
+                Defaults to None (no limit).
+
+        Returns:
+            dict[str, int]: The downstream nodes and their distance to `node`.
+        """
+        return self._walk(self.down, node, depth)
+
+    def save(self) -> None:
+        _atomic_write_json(
+            self.path,
+            {
+                "page": self.page,
+                "seen": sorted(self.seen),
+                "down": {k: sorted(v) for k, v in self.down.items()},
+            },
+        )
+
+    def load(self) -> None:
+        try:
+            with open(self.path) as f:
+                state: dict[str, Any] = json.load(f)
+        except FileNotFoundError:
+            return
+        except ValueError as e:
+            logger.warning(f"Ignoring corrupted lineage index {self.path}: {e}")
+            return
+
+        self.page = state["page"]
+        self.seen = set(state["seen"])
+        for src, dsts in state["down"].items():
+            for dst in dsts:
+                self._link(src, dst)
+        for node in set(self.up) | set(self.down):
+            if not node.startswith(FLOW_PREFIX):
+                self.versions.setdefault(node.split("@", 1)[0], set()).add(node)
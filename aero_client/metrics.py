@@ -0,0 +1,138 @@
+"""AERO resource accounting module.
+
+Collects wall-clock time, CPU time, peak resident set size and I/O volume
+for the phases (input staging, user function, output upload) of a wrapped
+AERO function.
+"""
+
+import logging
+import resource
+import sys
+import time
+
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+_PROC_SELF = Path("/proc/self")
+
+# ``ru_maxrss`` is reported in kilobytes on Linux and in bytes on macOS
+_MAXRSS_SCALE = 1 if sys.platform == "darwin" else 1024
+
+
+def _reset_peak_rss() -> bool:
+    """Reset the peak RSS high-water mark of the current process.
+
+    Only supported on Linux (>= 4.0) by writing ``5`` to ``/proc/self/clear_refs``.
+
+    Returns:
+        bool: Whether the high-water mark was reset.
+    """
+    try:
+        with open(_PROC_SELF / "clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss() -> int:
+    """Peak resident set size of the current process in bytes."""
+    try:
+        with open(_PROC_SELF / "status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _MAXRSS_SCALE
+
+
+def _io_counters() -> dict[str, int] | None:
+    """Bytes read and written by the current process.
+
+    ``read_chars``/``write_chars`` count all read and write system calls
+    (including sockets), ``read_bytes``/``write_bytes`` only the bytes that
+    reached the storage layer.
+    """
+    try:
+        with open(_PROC_SELF / "io") as f:
+            counters = dict(line.split(": ") for line in f.read().splitlines())
+        return {
+            "read_chars": int(counters["rchar"]),
+            "write_chars": int(counters["wchar"]),
+            "read_bytes": int(counters["read_bytes"]),
+            "write_bytes": int(counters["write_bytes"]),
+        }
+    except (OSError, KeyError, ValueError):
+        pass
+
+    try:
+        import psutil
+
+        io = psutil.Process().io_counters()
+        return {
+            "read_chars": getattr(io, "read_chars", io.read_bytes),
+            "write_chars": getattr(io, "write_chars", io.write_bytes),
+            "read_bytes": io.read_bytes,
+            "write_bytes": io.write_bytes,
+        }
+    except Exception:
+        return None
+
+
+class PhaseUsage:
+    """Context manager recording the resources used by a phase of a task.
+
+    Args:
+        enabled (bool, optional): Whether to collect the metrics. A disabled
+            instance does nothing so that it can be used unconditionally.
+            Defaults to True.
+
+    Example:
+        ```py
+        with PhaseUsage() as usage:
+            do_work()
+        usage.as_dict()
+        ```
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.metrics: dict[str, int | float | dict | None] = {}
+
+    def __enter__(self):
+        if not self.enabled:
+            return self
+
+        self._peak_reset = _reset_peak_rss()
+        self._rusage = resource.getrusage(resource.RUSAGE_SELF)
+        self._io = _io_counters()
+        self._start = time.time_ns()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if not self.enabled:
+            return
+
+        end = time.time_ns()
+        rusage = resource.getrusage(resource.RUSAGE_SELF)
+        io = _io_counters()
+
+        self.metrics = {
+            "task_start": self._start,
+            "task_end": end,
+            "duration": end - self._start,
+            "cpu_user": rusage.ru_utime - self._rusage.ru_utime,
+            "cpu_system": rusage.ru_stime - self._rusage.ru_stime,
+            "peak_rss": _peak_rss(),
+            # peak RSS covers the whole process lifetime if it could not be reset
+            "peak_rss_scope": "phase" if self._peak_reset else "process",
+            "io": None
+            if io is None or self._io is None
+            else {k: io[k] - self._io[k] for k in io},
+        }
+
+    def as_dict(self) -> dict[str, int | float | dict | None]:
+        """The recorded metrics, empty if disabled."""
+        return self.metrics
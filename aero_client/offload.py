@@ -0,0 +1,362 @@
+"""AERO Globus Transfer offload module.
+
+Inputs and outputs larger than a threshold are moved by managed Globus
+Transfer tasks instead of HTTPS requests from within the task. The task
+worker only submits the transfer and polls its status, the data moves
+between the guest collections and a directory of the worker node shared
+through a Globus collection, with checksum verification and retries by the
+Transfer service. The transfer task is recorded in the input or output
+metadata, and so in the provenance of the run.
+
+The shared directory may be exposed by a guest collection, or by a mapped
+collection of the endpoint filesystem, which requires consent to its
+`data_access` scope. `utils._client_auth` requests it at login when
+`offload_collection` is configured.
+
+`LocalTransferClient` is a stand-in for the Transfer service copying files
+between local directories, e.g. to use with `storage.LocalStorage`.
+"""
+
+import logging
+import mimetypes
+import shutil
+import time
+import urllib.parse
+import uuid
+
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from globus_sdk import TransferData
+
+from aero_client.error import ChecksumError
+from aero_client.error import RemoteError
+from aero_client.hashing import BackgroundHasher
+
+logger = logging.getLogger(__name__)
+
+TRANSFER_RESOURCE_SERVER = "transfer.api.globus.org"
+
+GLOBUS_CHECKSUMS = {"md5": "MD5", "sha256": "SHA256"}
+"""Checksum algorithms of the client that Globus Transfer can verify."""
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def _remote_path(collection_url: str, file_bn: str) -> str:
+    """Path in a guest collection of the object at `<collection_url>/<file_bn>`."""
+    return urllib.parse.urlparse(
+        urllib.parse.urljoin(f"{collection_url.rstrip('/')}/", file_bn)
+    ).path
+
+
+def _file_checksum(path: Path, algorithm: str) -> str:
+    h = BackgroundHasher(algorithm)
+    with open(path, "rb") as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def transfer_client():
+    """A Transfer client authorized by the stored Transfer refresh token."""
+    from globus_sdk import NativeAppAuthClient
+    from globus_sdk import RefreshTokenAuthorizer
+    from globus_sdk import TransferClient
+
+    from aero_client.utils import CONF
+    from aero_client.utils import load_tokens
+
+    refresh_token = load_tokens()[TRANSFER_RESOURCE_SERVER]["refresh_token"]
+    authorizer = RefreshTokenAuthorizer(
+        refresh_token=refresh_token,
+        auth_client=NativeAppAuthClient(client_id=CONF.client_uuid),
+    )
+    return TransferClient(authorizer=authorizer)
+
+
+class TransferOffload:
+    """Moves large objects with Globus Transfer tasks.
+
+    Args:
+        collection (str): UUID of the collection sharing `directory`.
+        directory (str | Path): Local directory, the root of `collection`.
+        threshold (int): Size in bytes from which objects are offloaded.
+        client (Any, optional): A `globus_sdk.TransferClient` or stand-in.
+            Defaults to a client authorized by the stored tokens.
+        timeout (float, optional): Seconds to wait for a transfer task.
+            Defaults to 24 hours.
+        polling_interval (int, optional): Seconds between two status checks
+            of a transfer task. Defaults to 10.
+    """
+
+    def __init__(
+        self,
+        collection: str,
+        directory: str | Path,
+        threshold: int,
+        client: Any = None,
+        timeout: float = 24 * 3600,
+        polling_interval: int = 10,
+    ):
+        self.collection = collection
+        self.directory = Path(directory)
+        self.threshold = threshold
+        self._client = client
+        self.timeout = timeout
+        self.polling_interval = polling_interval
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            self._client = transfer_client()
+        return self._client
+
+    def applies(self, size: int | None) -> bool:
+        """Whether an object of `size` bytes is offloaded."""
+        return size is not None and size >= self.threshold
+
+    def _local_path(self, path: Path) -> str:
+        return "/" + path.absolute().relative_to(self.directory.absolute()).as_posix()
+
+    def _run(self, data: TransferData) -> dict[str, Any]:
+        """Submit a transfer task and wait for it to end."""
+        start = time.time_ns()
+        task_id = self.client.submit_transfer(data)["task_id"]
+        logger.info(f"Submitted Globus Transfer task {task_id}")
+
+        deadline = time.monotonic() + self.timeout
+        while not self.client.task_wait(
+            task_id,
+            timeout=self.polling_interval,
+            polling_interval=self.polling_interval,
+        ):
+            if time.monotonic() > deadline:
+                self.client.cancel_task(task_id)
+                raise RemoteError(
+                    f"Globus Transfer task {task_id} timed out",
+                    code=504,
+                    message=f"Transfer task {task_id} did not end in {self.timeout}s",
+                )
+        end = time.time_ns()
+
+        task = self.client.get_task(task_id)
+        if task["status"] != "SUCCEEDED":
+            raise RemoteError(
+                f"Globus Transfer task {task_id} {task['status']}",
+                code=502,
+                message=task.get("nice_status") or task["status"],
+            )
+
+        return {
+            "service": "globus_transfer",
+            "task_id": task_id,
+            "status": task["status"],
+            "bytes_transferred": task.get("bytes_transferred"),
+            "verify_checksum": True,
+            "start": start,
+            "end": end,
+            "duration": (end - start) / 10**9,
+        }
+
+    def _add_item(
+        self,
+        data: TransferData,
+        source: str,
+        destination: str,
+        checksum: str | None,
+        algorithm: str,
+    ) -> None:
+        kwargs = {}
+        if checksum is not None and algorithm in GLOBUS_CHECKSUMS:
+            kwargs = {
+                "external_checksum": checksum,
+                "checksum_algorithm": GLOBUS_CHECKSUMS[algorithm],
+            }
+        data.add_item(source, destination, **kwargs)
+
+    def upload(
+        self,
+        path: str | Path,
+        collection_url: str,
+        collection_uuid: str,
+        algorithm: str = "md5",
+    ) -> dict[str, Any]:
+        """Store a file with a transfer task, see `utils.gcs_save`.
+
+        The file is moved to the shared directory if it is not in it, and
+        removed once transferred. If the transfer fails, it is moved back.
+
+        Returns:
+            dict: Metadata of the stored output, with the `transfer` task.
+        """
+        source = Path(path).absolute()
+        mtype = mimetypes.guess_type(source)
+        path = source
+        if not source.is_relative_to(self.directory.absolute()):
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = Path(shutil.move(source, self.directory / str(uuid.uuid4())))
+
+        try:
+            checksum = _file_checksum(path, algorithm)
+            size = path.stat().st_size
+            filename = str(uuid.uuid4())
+
+            data = TransferData(
+                source_endpoint=self.collection,
+                destination_endpoint=collection_uuid,
+                label=f"AERO output {filename}",
+                verify_checksum=True,
+            )
+            self._add_item(
+                data,
+                self._local_path(path),
+                _remote_path(collection_url, filename),
+                checksum,
+                algorithm,
+            )
+            transfer = self._run(data)
+        except BaseException:
+            if path != source:
+                shutil.move(path, source)
+            raise
+        path.unlink(missing_ok=True)
+
+        return {
+            "created_at": datetime.now().ctime(),
+            "checksum": checksum,
+            "checksum_algorithm": algorithm,
+            "size": size,
+            "file_bn": filename,
+            "file_format": mtype,
+            "start": transfer["start"],
+            "end": transfer["end"],
+            "duration": transfer["duration"],
+            "transfer": transfer,
+        }
+
+    def download(
+        self,
+        collection_url: str,
+        collection_uuid: str,
+        file_bn: str,
+        checksum: str | None = None,
+        algorithm: str = "md5",
+        verify: bool = False,
+    ) -> tuple[Path, dict[str, Any]]:
+        """Stage an object to the shared directory with a transfer task.
+
+        Args:
+            collection_url (str): HTTPS URL of the collection.
+            collection_uuid (str): UUID of the collection.
+            file_bn (str): Name of the object.
+            checksum (str | None, optional): Recorded checksum of the object,
+                verified by the Transfer service. Defaults to None.
+            algorithm (str, optional): Algorithm of `checksum`. Defaults to md5.
+            verify (bool, optional): Whether to verify `checksum` locally
+                when the Transfer service does not support `algorithm`.
+                Defaults to False.
+
+        Raises:
+            ChecksumError: if `verify` and the staged file does not match.
+            RemoteError: if the transfer task failed.
+
+        Returns:
+            tuple[Path, dict]: The staged file and the transfer task. The
+                staged file is removed if staging fails.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        dest = self.directory / str(uuid.uuid4())
+
+        data = TransferData(
+            source_endpoint=collection_uuid,
+            destination_endpoint=self.collection,
+            label=f"AERO input {file_bn}",
+            verify_checksum=True,
+        )
+        self._add_item(
+            data,
+            _remote_path(collection_url, file_bn),
+            self._local_path(dest),
+            checksum,
+            algorithm,
+        )
+        try:
+            transfer = self._run(data)
+
+            if verify and checksum is not None and algorithm not in GLOBUS_CHECKSUMS:
+                actual = _file_checksum(dest, algorithm)
+                if actual != checksum:
+                    raise ChecksumError(
+                        f"Checksum mismatch for {file_bn}",
+                        code=422,
+                        message=(
+                            f"Transferred {file_bn} has {algorithm} checksum "
+                            f"{actual}, expected {checksum}"
+                        ),
+                    )
+        except BaseException:
+            dest.unlink(missing_ok=True)
+            raise
+        return dest, transfer
+
+
+def default_offload() -> TransferOffload | None:
+    """The offload of the client configuration, None if not configured."""
+    from aero_client.utils import CONF
+
+    threshold = getattr(CONF, "offload_threshold", None)
+    collection = getattr(CONF, "offload_collection", None)
+    directory = getattr(CONF, "offload_dir", None)
+    if threshold is None or collection is None or directory is None:
+        return None
+    return TransferOffload(collection, directory, threshold)
+
+
+class LocalTransferClient:
+    """Stand-in for the Transfer service copying files between local directories.
+
+    Tasks run synchronously when submitted. Items with an external checksum
+    are verified, a mismatch fails the task.
+
+    Args:
+        collections (dict[str, str | Path]): Root directory of each
+            collection UUID.
+    """
+
+    def __init__(self, collections: dict[str, str | Path]):
+        self.collections = {k: Path(v) for k, v in collections.items()}
+        self.tasks: dict[str, dict[str, Any]] = {}
+
+    def _path(self, collection: str, path: str) -> Path:
+        return self.collections[collection] / path.lstrip("/")
+
+    def submit_transfer(self, data: TransferData) -> dict[str, str]:
+        task_id = str(uuid.uuid4())
+        task = {"task_id": task_id, "status": "SUCCEEDED", "bytes_transferred": 0}
+        for item in data["DATA"]:
+            src = self._path(data["source_endpoint"], item["source_path"])
+            dst = self._path(data["destination_endpoint"], item["destination_path"])
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(src, dst)
+            task["bytes_transferred"] += dst.stat().st_size
+
+            expected = item.get("external_checksum")
+            algorithm = item.get("checksum_algorithm")
+            if isinstance(expected, str) and isinstance(algorithm, str):
+                if _file_checksum(dst, algorithm.lower()) != expected:
+                    dst.unlink()
+                    task |= {"status": "FAILED", "nice_status": "CHECKSUM_MISMATCH"}
+                    break
+        self.tasks[task_id] = task
+        return {"task_id": task_id}
+
+    def task_wait(self, task_id: str, timeout: int = 10, polling_interval: int = 10):
+        return True
+
+    def get_task(self, task_id: str) -> dict[str, Any]:
+        return self.tasks[task_id]
+
+    def cancel_task(self, task_id: str) -> None:
+        self.tasks[task_id]["status"] = "FAILED"
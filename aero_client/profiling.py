@@ -0,0 +1,154 @@
+"""AERO function profiling module.
+
+Profiles the user function of a wrapped AERO function, with the sampling
+profiler `pyinstrument` when it is installed (`pip install
+DSaaS-client[profiling]`) and the deterministic `cProfile` otherwise. The
+profile is summarized as its hottest functions, and the raw profile can be
+saved to be stored as an output.
+"""
+
+import cProfile
+import logging
+import pstats
+
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+TOP_FUNCTIONS = 20
+"""Number of functions listed in a profile summary."""
+
+
+def _default_profiler() -> str:
+    try:
+        import pyinstrument  # noqa: F401
+
+        return "pyinstrument"
+    except ImportError:
+        return "cprofile"
+
+
+class FunctionProfile:
+    """Context manager profiling the code it runs.
+
+    Args:
+        profiler (str | bool | None, optional): `cprofile`, `pyinstrument`,
+            True for the sampling profiler when installed, or None/False to
+            disable profiling so that it can be used unconditionally.
+            Defaults to True.
+        top (int, optional): Number of functions listed in the summary.
+            Defaults to `TOP_FUNCTIONS`.
+
+    Example:
+        ```py
+        with FunctionProfile() as profile:
+            do_work()
+        profile.summary()
+        ```
+    """
+
+    def __init__(self, profiler: str | bool | None = True, top: int = TOP_FUNCTIONS):
+        if profiler is True:
+            profiler = _default_profiler()
+        if profiler not in (None, False) and profiler not in PROFILERS:
+            raise ValueError(
+                f"Unsupported profiler {profiler}, choose from {PROFILERS}"
+            )
+        self.profiler = profiler or None
+        self.enabled = self.profiler is not None
+        self.top = top
+        self._profiler: Any = None
+
+    def __enter__(self) -> "FunctionProfile":
+        if not self.enabled:
+            return self
+
+        if self.profiler == "pyinstrument":
+            from pyinstrument import Profiler
+
+            self._profiler = Profiler()
+            self._profiler.start()
+        else:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if not self.enabled:
+            return
+        if self.profiler == "cprofile":
+            self._profiler.disable()
+        else:
+            self._profiler.stop()
+
+    def summary(self) -> dict[str, Any]:
+        """The hottest functions of the profile, empty if disabled.
+
+        Returns:
+            dict[str, Any]: The `profiler`, the profiled `duration` in seconds
+                and the `top` functions with their own (`self_time`) and
+                cumulative (`total_time`) time in seconds, by descending own
+                time. `cprofile` also records the number of `calls`.
+        """
+        if not self.enabled:
+            return {}
+        if self.profiler == "cprofile":
+            return self._cprofile_summary()
+        return self._pyinstrument_summary()
+
+    def _cprofile_summary(self) -> dict[str, Any]:
+        stats = pstats.Stats(self._profiler)
+        functions = []
+        for (filename, line, name), (_, calls, tt, ct, _) in stats.stats.items():
+            functions.append(
+                {
+                    "function": f"{filename}:{line}({name})",
+                    "calls": calls,
+                    "self_time": tt,
+                    "total_time": ct,
+                }
+            )
+        functions.sort(key=lambda f: f["self_time"], reverse=True)
+        return {
+            "profiler": self.profiler,
+            "duration": stats.total_tt,
+            "top": functions[: self.top],
+        }
+
+    def _pyinstrument_summary(self) -> dict[str, Any]:
+        session = self._profiler.last_session
+        functions: dict[str, dict[str, float]] = {}
+
+        def walk(frame) -> None:
+            key = f"{frame.file_path}:{frame.line_no}({frame.function})"
+            entry = functions.setdefault(key, {"self_time": 0.0, "total_time": 0.0})
+            entry["self_time"] += frame.total_self_time
+            entry["total_time"] += frame.time
+            for child in frame.children:
+                walk(child)
+
+        root = session.root_frame()
+        if root is not None:
+            walk(root)
+
+        top = sorted(functions.items(), key=lambda f: f[1]["self_time"], reverse=True)
+        return {
+            "profiler": self.profiler,
+            "duration": session.duration,
+            "top": [{"function": k} | v for k, v in top[: self.top]],
+        }
+
+    def save(self, path: str | Path) -> Path:
+        """Write the raw profile, a `pstats` dump or a pyinstrument session.
+
+        Returns:
+            Path: The path of the raw profile.
+        """
+        if self.profiler == "cprofile":
+            self._profiler.dump_stats(path)
+        else:
+            self._profiler.last_session.save(path)
+        return Path(path)
@@ -0,0 +1,204 @@
+"""AERO record models module.
+
+Compact, typed alternatives to the JSON dicts returned by the metadata
+API, for holding many records in memory. Records store their commonly used
+scalar fields in slots, interning the strings, and keep every other field
+(e.g. the nested `input_data` of a provenance record) as compact encoded
+JSON that is only decoded when first accessed.
+
+Lists of records can be exported to a columnar table with `to_columns`,
+`to_dataframe` or, with the optional `pyarrow` dependency, `to_arrow`.
+"""
+
+import itertools
+import json
+import sys
+
+from typing import Any
+from typing import Iterable
+
+_MISSING = object()
+
+
+def _compact(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _lookup(value: Any, path: str, default: Any = None) -> Any:
+    for key in path.split(".") if path else ():
+        if not isinstance(value, dict):
+            return default
+        value = value.get(key, default)
+    return value
+
+
+class Record:
+    """Base class of the record models.
+
+    Subclasses list their eagerly decoded fields in `FIELDS` (also their
+    `__slots__`), and the nested fields they document in `LAZY`. Any field
+    of the JSON record, listed or not, is available as an attribute.
+    """
+
+    __slots__ = ("_lazy", "_extra")
+
+    FIELDS: tuple[str, ...] = ()
+    LAZY: tuple[str, ...] = ()
+
+    def __init__(self, **fields: Any):
+        for name in self.FIELDS:
+            setattr(self, name, _compact(fields.pop(name, None)))
+        self._lazy = (
+            json.dumps(fields, separators=(",", ":")).encode() if fields else None
+        )
+        self._extra: dict[str, Any] | None = None
+
+    @classmethod
+    def from_json(cls, record: dict[str, Any]) -> "Record":
+        """Build a record from its JSON representation."""
+        return cls(**record)
+
+    def _decoded(self) -> dict[str, Any]:
+        # decoded once, the encoded form is then dropped
+        if self._extra is None:
+            self._extra = {} if self._lazy is None else json.loads(self._lazy)
+            self._lazy = None
+        return self._extra
+
+    def extra(self) -> dict[str, Any]:
+        """The fields that are not in `FIELDS`."""
+        return dict(self._decoded())
+
+    def __getattr__(self, name: str) -> Any:
+        # only called for the fields that are not slots
+        if name.startswith("_"):
+            raise AttributeError(name)
+        value = self._decoded().get(name, _MISSING)
+        if value is _MISSING:
+            if name in self.LAZY:
+                return None
+            raise AttributeError(f"{type(self).__name__} record has no field {name!r}")
+        return value
+
+    def get(self, path: str, default: Any = None) -> Any:
+        """A field, or a nested field with a dotted `path` (e.g. `data_file.size`)."""
+        name, _, rest = path.partition(".")
+        return _lookup(getattr(self, name, default), rest, default)
+
+    def to_json(self) -> dict[str, Any]:
+        """The JSON representation of the record."""
+        return {name: getattr(self, name) for name in self.FIELDS} | self._decoded()
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_json() == other.to_json()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS)
+        return f"{type(self).__name__}({fields})"
+
+
+class Data(Record):
+    """Data source record."""
+
+    FIELDS = (
+        "id",
+        "name",
+        "url",
+        "description",
+        "collection_uuid",
+        "collection_url",
+        "available_versions",
+    )
+    __slots__ = FIELDS
+    LAZY = ("versions",)
+
+
+class Version(Record):
+    """Data version record."""
+
+    FIELDS = ("id", "data_id", "version", "created_at")
+    __slots__ = FIELDS
+    LAZY = ("data_file",)
+
+
+class Flow(Record):
+    """Flow record."""
+
+    FIELDS = (
+        "id",
+        "description",
+        "endpoint",
+        "function_id",
+        "policy",
+        "timer",
+        "timer_job_id",
+        "last_executed",
+    )
+    __slots__ = FIELDS
+    LAZY = ("function_args", "contributed_to", "derived_from")
+
+
+class Prov(Record):
+    """Provenance record of a flow run."""
+
+    FIELDS = ("id", "flow_id", "created_at")
+    __slots__ = FIELDS
+    LAZY = ("input_data", "output_data", "function_args")
+
+
+MODELS: dict[str, type[Record]] = {"data": Data, "flow": Flow, "prov": Prov}
+"""Record model of each metadata type."""
+
+
+def to_columns(
+    records: Iterable[Record], columns: Iterable[str] | None = None
+) -> dict[str, list[Any]]:
+    """Transpose records into columns.
+
+    Args:
+        records (Iterable[Record]): Records of the same model.
+        columns (Iterable[str] | None, optional): Fields to export, nested
+            fields by their dotted path (e.g. `data_file.size`). Defaults to
+            the `FIELDS` of the model.
+
+    Returns:
+        dict[str, list[Any]]: The values of each column.
+    """
+    records = iter(records)
+    first = next(records, None)
+    if first is None:
+        return {name: [] for name in columns or ()}
+
+    columns = list(columns or first.FIELDS)
+    table = {name: [] for name in columns}
+    # decode the lazy fields of a record once for all the columns
+    lazy = any(name.split(".", 1)[0] not in first.FIELDS for name in columns)
+    for record in itertools.chain((first,), records):
+        if lazy:
+            values = record.to_json()
+            for name in columns:
+                table[name].append(_lookup(values, name))
+        else:
+            for name in columns:
+                table[name].append(getattr(record, name))
+    return table
+
+
+def to_dataframe(records: Iterable[Record], columns: Iterable[str] | None = None):
+    """Export records to a pandas DataFrame, see `to_columns`."""
+    import pandas as pd
+
+    return pd.DataFrame(to_columns(records, columns))
+
+
+def to_arrow(records: Iterable[Record], columns: Iterable[str] | None = None):
+    """Export records to a pyarrow Table, see `to_columns`.
+
+    Requires the optional `pyarrow` dependency
+    (`pip install DSaaS-client[columnar]`).
+    """
+    import pyarrow as pa
+
+    return pa.table(to_columns(records, columns))
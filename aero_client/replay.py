@@ -0,0 +1,236 @@
+"""AERO HTTP record and replay module.
+
+Records the HTTP exchanges of the client, i.e. every request sent through
+`transport.SESSION` by `api`, `jobs` and `utils`, to a cassette file along
+with their sizes and latencies, and replays them without network access,
+optionally at the recorded latencies. This allows benchmarking client
+changes against the traffic of a production flow on an offline machine.
+
+Calls made by the Globus SDKs (authentication, Globus Compute) do not use
+the shared session and are neither recorded nor replayed.
+
+Example:
+    ```py
+    with record("flow.cassette"):
+        run_flow()
+
+    with replay("flow.cassette", latency=True):
+        run_flow()
+    ```
+"""
+
+import base64
+import io
+import json
+import logging
+import re
+import threading
+import time
+
+from collections import defaultdict
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+import requests
+
+from requests.adapters import BaseAdapter
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from aero_client.error import ReplayError
+from aero_client.transport import SESSION
+
+logger = logging.getLogger(__name__)
+
+REDACTED_HEADERS = frozenset(["authorization", "cookie", "set-cookie"])
+
+_UUID = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.IGNORECASE
+)
+
+
+def _headers(headers) -> dict[str, str]:
+    return {
+        k: "<redacted>" if k.lower() in REDACTED_HEADERS else v
+        for k, v in headers.items()
+    }
+
+
+def _generic(url: str) -> str:
+    """URL with its UUIDs masked, e.g. the random names of uploaded outputs."""
+    return _UUID.sub("<uuid>", url)
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Transport adapter appending every exchange to a cassette.
+
+    Response bodies are read in full to be recorded, streamed responses are
+    still readable afterwards.
+
+    Args:
+        path (str | Path): Cassette file, in JSON lines.
+        max_body (int | None, optional): Largest response body recorded in
+            full. Only the size of larger bodies is recorded, and they are
+            replayed as zero bytes. Defaults to None (no limit).
+    """
+
+    def __init__(self, path: str | Path, max_body: int | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.path = Path(path)
+        self.max_body = max_body
+        self._lock = threading.Lock()
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        started = time.time()
+        start = time.perf_counter()
+        resp = super().send(request, **kwargs)
+        content = resp.content
+        total = time.perf_counter() - start
+
+        body = request.body
+        if isinstance(body, (bytes, str)):
+            request_size = len(body)
+        else:
+            request_size = int(request.headers.get("Content-Length") or 0)
+
+        exchange = {
+            "started": started,
+            "method": request.method,
+            "url": request.url,
+            "request_headers": _headers(request.headers),
+            "request_size": request_size,
+            "status": resp.status_code,
+            "reason": resp.reason,
+            "headers": _headers(resp.headers),
+            "size": len(content),
+            "latency": resp.elapsed.total_seconds(),
+            "duration": total,
+            "body": None
+            if self.max_body is not None and len(content) > self.max_body
+            else base64.b64encode(content).decode(),
+        }
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(exchange) + "\n")
+        return resp
+
+
+def load_cassette(path: str | Path) -> list[dict]:
+    """The exchanges recorded in a cassette, in the order they were sent."""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class ReplayAdapter(BaseAdapter):
+    """Transport adapter serving the responses recorded in a cassette.
+
+    A request is matched with the next unused exchange with the same method
+    and URL, or, failing that, with the same URL once UUIDs are masked, so
+    that uploads to randomly named objects still match. When all matching
+    exchanges were used, the last one is served again.
+
+    Args:
+        path (str | Path): Cassette file.
+        latency (bool | float, optional): Whether to wait for the recorded
+            duration of each exchange before responding, or a factor to scale
+            the recorded durations by. Defaults to False.
+    """
+
+    def __init__(self, path: str | Path, latency: bool | float = False):
+        super().__init__()
+        self.scale = float(latency)
+        self._lock = threading.Lock()
+        self._exact: dict[tuple, deque] = defaultdict(deque)
+        self._generic: dict[tuple, deque] = defaultdict(deque)
+        self._last: dict[tuple, dict] = {}
+        for exchange in load_cassette(path):
+            method = exchange["method"]
+            self._exact[method, exchange["url"]].append(exchange)
+            self._generic[method, _generic(exchange["url"])].append(exchange)
+
+    def _match(self, method: str, url: str) -> dict:
+        with self._lock:
+            for key, queues in (
+                ((method, url), self._exact),
+                ((method, _generic(url)), self._generic),
+            ):
+                if key not in queues:
+                    continue
+                queue = queues[key]
+                if queue:
+                    exchange = queue.popleft()
+                    self._last[key] = exchange
+                    return exchange
+                return self._last[key]
+
+        raise ReplayError(
+            f"No recorded response for {method} {url}",
+            code=404,
+            message=f"No exchange recorded for {method} {url}",
+        )
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        exchange = self._match(request.method, request.url)
+
+        # consume streamed request bodies, e.g. to compute upload checksums
+        if request.body is not None and hasattr(request.body, "read"):
+            while request.body.read(1024 * 1024):
+                pass
+
+        if self.scale > 0:
+            time.sleep(exchange["duration"] * self.scale)
+
+        resp = requests.Response()
+        resp.status_code = exchange["status"]
+        resp.reason = exchange.get("reason")
+        resp.headers = CaseInsensitiveDict(exchange["headers"])
+        resp.encoding = get_encoding_from_headers(resp.headers)
+        resp.url = request.url
+        resp.request = request
+        # a raw body, so that streamed responses can be read with iter_content
+        resp.raw = io.BytesIO(
+            bytes(exchange["size"])
+            if exchange["body"] is None
+            else base64.b64decode(exchange["body"])
+        )
+        return resp
+
+    def close(self) -> None:
+        pass
+
+
+@contextmanager
+def _mounted(session: requests.Session, adapter: BaseAdapter):
+    previous = {prefix: session.adapters[prefix] for prefix in ("http://", "https://")}
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    try:
+        yield adapter
+    finally:
+        for prefix, mounted in previous.items():
+            session.mount(prefix, mounted)
+
+
+@contextmanager
+def record(
+    path: str | Path,
+    session: requests.Session = SESSION,
+    max_body: int | None = None,
+):
+    """Record the exchanges of `session` to a cassette, see `RecordingAdapter`."""
+    with _mounted(session, RecordingAdapter(path, max_body=max_body)) as adapter:
+        yield adapter
+
+
+@contextmanager
+def replay(
+    path: str | Path,
+    session: requests.Session = SESSION,
+    latency: bool | float = False,
+):
+    """Serve the requests of `session` from a cassette, see `ReplayAdapter`."""
+    with _mounted(session, ReplayAdapter(path, latency=latency)) as adapter:
+        yield adapter
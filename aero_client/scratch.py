@@ -0,0 +1,212 @@
+"""AERO scratch space module.
+
+Temporary files of a task (staged inputs, previous state outputs,
+downloads) are allocated in a per-task session directory under a scratch
+root, e.g. a tmpfs mount. The session directory is removed when the task
+ends, whether it succeeded or failed, and the session directories left
+behind by crashed workers are garbage collected.
+"""
+
+import json
+import logging
+import os
+import shutil
+import socket
+import tempfile
+import time
+import uuid
+
+from pathlib import Path
+
+from aero_client.error import ScratchQuotaError
+
+logger = logging.getLogger(__name__)
+
+SESSION_PREFIX = "aero-"
+_OWNER_FILE = ".owner"
+
+ORPHAN_GRACE = 3600
+"""Seconds after which a session directory without a readable owner is removed."""
+
+
+def default_root() -> Path:
+    """The configured scratch root, or `<tmp>/aero-scratch`."""
+    from aero_client.utils import CONF
+
+    root = getattr(CONF, "scratch_dir", None)
+    return Path(root) if root else Path(tempfile.gettempdir(), "aero-scratch")
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _size(path: Path) -> int:
+    try:
+        if path.is_dir():
+            return sum(
+                p.stat().st_size
+                for p in path.rglob("*")
+                if p.is_file() and p.name != _OWNER_FILE
+            )
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def collect_orphans(root: str | Path, max_age: float | None = None) -> int:
+    """Remove the session directories of dead workers.
+
+    A session is orphaned when its owner process ran on this host and no
+    longer exists, when it is older than `max_age`, or when it has no
+    readable owner and is older than `ORPHAN_GRACE`.
+
+    Args:
+        root (str | Path): Scratch root.
+        max_age (float | None, optional): Maximum age in seconds of a
+            session, whether or not its owner is alive. Defaults to None.
+
+    Returns:
+        int: Number of bytes freed.
+    """
+    freed = 0
+    host = socket.gethostname()
+    now = time.time()
+
+    for session in Path(root).glob(f"{SESSION_PREFIX}*"):
+        try:
+            age = now - session.stat().st_mtime
+            with open(session / _OWNER_FILE) as f:
+                owner = json.load(f)
+            orphaned = owner["host"] == host and not _pid_alive(owner["pid"])
+        except FileNotFoundError:
+            if not session.exists():
+                continue
+            orphaned = age > ORPHAN_GRACE
+        except (ValueError, KeyError):
+            orphaned = age > ORPHAN_GRACE
+
+        if orphaned or (max_age is not None and age > max_age):
+            size = _size(session)
+            shutil.rmtree(session, ignore_errors=True)
+            logger.info(f"Removed orphaned scratch session {session} ({size} B)")
+            freed += size
+
+    return freed
+
+
+class ScratchSpace:
+    """Scratch session of a task.
+
+    Used as a context manager, the session directory and all the files
+    allocated or adopted by the session are removed on exit, including when
+    the task raised. Orphaned sessions are collected when a session opens.
+
+    Args:
+        root (str | Path | None, optional): Scratch root. Defaults to
+            `scratch_dir` of the client configuration, or `<tmp>/aero-scratch`.
+        quota (int | None, optional): Maximum number of bytes the session
+            may use. Defaults to `scratch_quota` of the client configuration,
+            or no limit.
+    """
+
+    def __init__(self, root: str | Path | None = None, quota: int | None = None):
+        if quota is None:
+            from aero_client.utils import CONF
+
+            quota = getattr(CONF, "scratch_quota", None)
+
+        self.root = Path(root) if root is not None else default_root()
+        self.quota = quota
+        self.dir: Path | None = None
+        self.peak = 0
+        self._external: list[Path] = []
+
+    def open(self) -> "ScratchSpace":
+        self.root.mkdir(parents=True, exist_ok=True)
+        collect_orphans(self.root)
+        self.dir = Path(
+            tempfile.mkdtemp(prefix=f"{SESSION_PREFIX}{os.getpid()}-", dir=self.root)
+        )
+        with open(self.dir / _OWNER_FILE, "w") as f:
+            json.dump({"host": socket.gethostname(), "pid": os.getpid()}, f)
+        return self
+
+    def close(self) -> None:
+        """Remove all the files of the session."""
+        for path in self._external:
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink(missing_ok=True)
+        self._external.clear()
+        if self.dir is not None:
+            shutil.rmtree(self.dir, ignore_errors=True)
+            self.dir = None
+
+    def __enter__(self) -> "ScratchSpace":
+        return self.open()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def path(self, size: int = 0, directory: str | Path | None = None) -> Path:
+        """Allocate a new file path.
+
+        Args:
+            size (int, optional): Expected size of the file, checked against
+                the quota. Defaults to 0.
+            directory (str | Path | None, optional): Directory outside of the
+                scratch root to allocate the file in, e.g. the `tmp_dir` of an
+                input. The file is still removed with the session. Defaults
+                to None.
+
+        Raises:
+            ScratchQuotaError: if the file would exceed the quota.
+
+        Returns:
+            Path: The path of the new file.
+        """
+        self.check(size)
+        if directory is None:
+            return self.dir / str(uuid.uuid4())
+        path = Path(directory) / str(uuid.uuid4())
+        self._external.append(path)
+        return path
+
+    def adopt(self, path: str | Path) -> None:
+        """Remove a file created outside of the session with the session."""
+        self._external.append(Path(path))
+
+    def used(self) -> int:
+        """Bytes currently used by the session."""
+        used = 0 if self.dir is None else _size(self.dir)
+        return used + sum(_size(p) for p in self._external)
+
+    def check(self, size: int = 0) -> int:
+        """Check the session usage, plus `size` bytes, against the quota.
+
+        Raises:
+            ScratchQuotaError: if the quota is exceeded.
+
+        Returns:
+            int: Bytes currently used by the session.
+        """
+        used = self.used()
+        self.peak = max(self.peak, used)
+        if self.quota is not None and used + size > self.quota:
+            raise ScratchQuotaError(
+                "Scratch quota exceeded",
+                code=507,
+                message=(
+                    f"Scratch session {self.dir} would use {used + size} B, "
+                    f"over its quota of {self.quota} B"
+                ),
+            )
+        return used
@@ -0,0 +1,212 @@
+"""AERO storage backends module.
+
+Storage backends stage inputs from and upload outputs to the collections
+referenced by a flow. `HTTPSStorage` talks to Globus Guest Collections and
+is used by default, `LocalStorage` is a stand-in keeping the objects in a
+local directory, e.g. to run flows with the `LocalExecutor`.
+
+Either may hold an `offload.TransferOffload`, moving large objects with
+Globus Transfer tasks instead.
+"""
+
+import shutil
+import time
+import urllib.parse
+import uuid
+
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from typing import BinaryIO
+
+from aero_client import utils
+from aero_client.error import RemoteError
+from aero_client.offload import TransferOffload
+from aero_client.transfers import scheduler
+from aero_client.transport import request
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+class HTTPSStorage:
+    """Globus Guest Collection storage accessed over HTTPS.
+
+    Args:
+        offload (TransferOffload | None, optional): Offload of the objects
+            above its threshold. Defaults to None (HTTPS only).
+    """
+
+    def __init__(self, offload: TransferOffload | None = None):
+        self.offload = offload
+
+    def fetch(
+        self,
+        collection_url: str,
+        collection_uuid: str,
+        file_bn: str,
+        out: BinaryIO,
+        offset: int = 0,
+        length: int | None = None,
+        size: int | None = None,
+    ) -> int:
+        """Write `length` bytes of an object, or all of them, from byte
+        `offset` onwards, to `out`.
+
+        `size` is the expected number of bytes, used to schedule the
+        transfer, defaulting to `length`.
+
+        Returns:
+            int: Number of bytes written.
+        """
+        TRANSFER_TOKEN = utils.get_transfer_token(collection_uuid)
+        headers = {"Authorization": f"Bearer {TRANSFER_TOKEN}"}
+        size = length if size is None else size
+        if length is not None:
+            headers["Range"] = f"bytes={offset}-{offset + length - 1}"
+        elif offset > 0:
+            headers["Range"] = f"bytes={offset}-"
+
+        url = urllib.parse.urljoin(f"{collection_url}/", f"{file_bn}")
+        transfers = scheduler()
+        with transfers.slot(collection_uuid, urllib.parse.urlparse(url).netloc, size):
+            try:
+                resp = request("GET", url, headers=headers, stream=True)
+            except RemoteError as e:
+                # range starts at the end of the object, nothing to fetch
+                if e.code == 416 and "Range" in headers:
+                    return 0
+                raise
+
+            # collection ignored the range request and returned the whole object
+            skip = offset if "Range" in headers and resp.status_code == 200 else 0
+            remaining = length
+            written = 0
+            try:
+                # written, and hashed by checksumming outputs, as it arrives
+                for chunk in resp.iter_content(_CHUNK_SIZE):
+                    # limit the transfer while it is in progress
+                    transfers.throttle(len(chunk))
+                    if skip > 0:
+                        chunk, skip = chunk[skip:], max(0, skip - len(chunk))
+                    if remaining is not None:
+                        chunk = chunk[:remaining]
+                        remaining -= len(chunk)
+                    if chunk:
+                        out.write(chunk)
+                        written += len(chunk)
+                    if remaining == 0:
+                        break
+            finally:
+                resp.close()
+
+        return written
+
+    def save(
+        self,
+        collection_url: str,
+        collection_uuid: str,
+        path: str | None = None,
+        data: Any = None,
+        file_format: str | None = None,
+    ) -> dict:
+        """Store an output, see `utils.gcs_save`.
+
+        Returns:
+            dict: Metadata of the stored output.
+        """
+        return utils.gcs_save(
+            path=path,
+            data=data,
+            file_format=file_format,
+            collection_url=collection_url,
+            collection_uuid=collection_uuid,
+        )
+
+
+class LocalStorage:
+    """Stand-in storage keeping objects under `root/<collection_uuid>/`.
+
+    Args:
+        root (str | Path): Directory to store the objects in.
+        offload (TransferOffload | None, optional): Offload of the objects
+            above its threshold, e.g. with an `offload.LocalTransferClient`
+            mapping `<collection_uuid>` to `root/<collection_uuid>`.
+            Defaults to None.
+    """
+
+    def __init__(self, root: str | Path, offload: TransferOffload | None = None):
+        self.root = Path(root)
+        self.offload = offload
+
+    def _path(self, collection_uuid: str, file_bn: str) -> Path:
+        return self.root / collection_uuid / file_bn
+
+    def fetch(
+        self,
+        collection_url: str,
+        collection_uuid: str,
+        file_bn: str,
+        out: BinaryIO,
+        offset: int = 0,
+        length: int | None = None,
+        size: int | None = None,
+    ) -> int:
+        """Write `length` bytes of an object, or all of them, from byte
+        `offset` onwards, to `out`.
+
+        `size`, the expected number of bytes, is ignored.
+
+        Returns:
+            int: Number of bytes written.
+        """
+        with open(self._path(collection_uuid, file_bn), "rb") as f:
+            f.seek(offset)
+            if length is not None:
+                return out.write(f.read(length))
+            start = out.tell()
+            shutil.copyfileobj(f, out, _CHUNK_SIZE)
+            return out.tell() - start
+
+    def save(
+        self,
+        collection_url: str,
+        collection_uuid: str,
+        path: str | None = None,
+        data: Any = None,
+        file_format: str | None = None,
+    ) -> dict:
+        """Store an output, returning the same metadata as `utils.gcs_save`.
+
+        Returns:
+            dict: Metadata of the stored output.
+        """
+        filename = str(uuid.uuid4())
+        dest = self._path(collection_uuid, filename)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+
+        body, length, mtype = utils._upload_body(path, data, file_format)
+        reader = utils._HashingReader(body, length)
+
+        start = time.time_ns()
+        try:
+            with open(dest, "wb") as f:
+                shutil.copyfileobj(reader, f, _CHUNK_SIZE)
+        finally:
+            if body is not data:
+                body.close()
+        end = time.time_ns()
+
+        if path is not None:
+            Path(path).unlink(missing_ok=True)  # remove tmp output
+
+        return {
+            "created_at": datetime.now().ctime(),
+            "checksum": reader.hash.hexdigest(),
+            "checksum_algorithm": reader.hash.algorithm,
+            "size": reader.size,
+            "file_bn": filename,
+            "file_format": mtype,
+            "start": start,
+            "end": end,
+            "duration": (end - start) / 10**9,
+        }
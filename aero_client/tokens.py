@@ -0,0 +1,125 @@
+"""AERO token store module.
+
+The token file is shared by every client process on a node, e.g. all the
+Globus Compute workers of an endpoint. Writes take an exclusive file lock
+and replace the file atomically, so readers never see a partial file, and
+refreshed access tokens are written back so that other processes reuse
+them instead of refreshing again.
+"""
+
+import json
+import logging
+import os
+import time
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+from typing import Callable
+
+from aero_client.cache import _atomic_write_json
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not POSIX
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+EXPIRY_MARGIN = 60
+"""Seconds before its expiry an access token is considered expired."""
+
+
+class TokenStore:
+    """Tokens of the client, keyed by resource server.
+
+    Args:
+        path (str | Path): Path of the token file.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock_path = self.path.with_name(f".{self.path.name}.lock")
+        self._cached: tuple[tuple[int, int, int], dict] | None = None
+
+    @contextmanager
+    def lock(self):
+        """Hold the exclusive lock of the token file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._lock_path, "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def load(self) -> dict[str, Any]:
+        """The stored tokens, re-read only when the file changed."""
+        stat = os.stat(self.path)
+        version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if self._cached is not None and self._cached[0] == version:
+            return self._cached[1]
+
+        with open(self.path) as f:
+            tokens = json.load(f)
+        self._cached = (version, tokens)
+        return tokens
+
+    def update(self, fn: Callable[[dict[str, Any]], dict[str, Any]]) -> dict[str, Any]:
+        """Atomically replace the tokens by `fn(tokens)` under the lock."""
+        with self.lock():
+            try:
+                tokens = dict(self.load())
+            except FileNotFoundError:
+                tokens = {}
+            tokens = fn(tokens)
+            _atomic_write_json(self.path, tokens)
+            self._cached = None
+            return tokens
+
+    def save(self, tokens: dict[str, Any]) -> None:
+        """Merge `tokens` into the stored tokens."""
+        self.update(lambda stored: stored | tokens)
+
+    def access_token(self, resource_server: str, refresh: Callable[[str], dict]) -> str:
+        """A valid access token of `resource_server`.
+
+        The stored access token is returned while it is valid. Otherwise a
+        single process refreshes it under the lock, and processes waiting
+        for the lock then find the refreshed token in the file.
+
+        Args:
+            resource_server (str): The resource server, e.g. a collection UUID.
+            refresh (Callable[[str], dict]): Exchanges a refresh token for the
+                new token data of `resource_server` (`access_token`,
+                `expires_at_seconds` and possibly a rotated `refresh_token`).
+
+        Returns:
+            str: The access token.
+        """
+        token = self.load()[resource_server]
+        if _valid(token):
+            return token["access_token"]
+
+        with self.lock():
+            token = self.load()[resource_server]
+            if _valid(token):
+                return token["access_token"]
+
+            logger.debug(f"Refreshing the access token of {resource_server}")
+            tokens = dict(self.load())
+            tokens[resource_server] = token | refresh(token["refresh_token"])
+            _atomic_write_json(self.path, tokens)
+            self._cached = None
+            return tokens[resource_server]["access_token"]
+
+
+def _valid(token: dict[str, Any]) -> bool:
+    expires_at = token.get("expires_at_seconds")
+    return (
+        token.get("access_token") is not None
+        and expires_at is not None
+        and expires_at - EXPIRY_MARGIN > time.time()
+    )
@@ -0,0 +1,188 @@
+"""AERO transfer scheduling module.
+
+Uploads to and downloads from the guest collections share a scheduler that
+limits the number of concurrent transfers per collection and per host, so
+that parallel staging, uploads and ingestion downloads do not overwhelm a
+collection (429 responses, timeouts), and optionally caps the aggregate
+bandwidth of the process. Waiting transfers are started smallest first,
+except that transfers waiting for longer than `starvation` seconds go first.
+"""
+
+import itertools
+import logging
+import math
+import threading
+import time
+
+from collections import Counter
+from contextlib import contextmanager
+from typing import Generator
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_LIMIT = 4
+HOST_LIMIT = 8
+STARVATION = 30.0
+
+
+class TokenBucket:
+    """Bandwidth limiter, consumers sleep until their bytes are paid for.
+
+    Args:
+        rate (float): Bytes per second.
+        burst (float | None, optional): Bytes that may be consumed at once
+            after an idle period. Defaults to one second of `rate`.
+    """
+
+    def __init__(self, rate: float, burst: float | None = None):
+        self.rate = rate
+        self.burst = rate if burst is None else burst
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, n: int) -> float:
+        """Consume `n` bytes, returning the seconds slept to respect the rate."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= n
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class TransferScheduler:
+    """Admission control of the transfers of a process.
+
+    Args:
+        collection_limit (int | None, optional): Concurrent transfers per
+            collection. Defaults to `COLLECTION_LIMIT`, None for no limit.
+        host_limit (int | None, optional): Concurrent transfers per host.
+            Defaults to `HOST_LIMIT`, None for no limit.
+        bandwidth (float | None, optional): Aggregate bandwidth cap in bytes
+            per second. Defaults to None (no cap).
+        starvation (float, optional): Seconds after which a waiting transfer
+            goes before smaller ones. Defaults to `STARVATION`.
+    """
+
+    def __init__(
+        self,
+        collection_limit: int | None = COLLECTION_LIMIT,
+        host_limit: int | None = HOST_LIMIT,
+        bandwidth: float | None = None,
+        starvation: float = STARVATION,
+    ):
+        self.collection_limit = collection_limit
+        self.host_limit = host_limit
+        self.bucket = TokenBucket(bandwidth) if bandwidth else None
+        self.starvation = starvation
+
+        self._cond = threading.Condition()
+        self._collections: Counter[str] = Counter()
+        self._hosts: Counter[str] = Counter()
+        self._waiting: list[list] = []
+        self._seq = itertools.count()
+        self.waited = 0.0
+        """Total seconds transfers waited for a slot."""
+
+    def _fits(self, collection: str, host: str) -> bool:
+        return (
+            self.collection_limit is None
+            or self._collections[collection] < self.collection_limit
+        ) and (self.host_limit is None or self._hosts[host] < self.host_limit)
+
+    def _priority(self, entry: list, now: float) -> tuple:
+        size, seq, enqueued, _, _ = entry
+        # starving transfers go first, in arrival order
+        if now - enqueued >= self.starvation:
+            return (0, seq)
+        return (1, size, seq)
+
+    def _ready(self, entry: list) -> bool:
+        collection, host = entry[3], entry[4]
+        if not self._fits(collection, host):
+            return False
+
+        # competing transfers with a higher priority that could start go first
+        now = time.monotonic()
+        priority = self._priority(entry, now)
+        return not any(
+            (other[3] == collection or other[4] == host)
+            and self._priority(other, now) < priority
+            and self._fits(other[3], other[4])
+            for other in self._waiting
+            if other is not entry
+        )
+
+    @contextmanager
+    def slot(
+        self, collection: str, host: str, size: int | None = None
+    ) -> Generator["TransferScheduler", None, None]:
+        """Hold a transfer slot of a collection and host.
+
+        Args:
+            collection (str): The collection UUID.
+            host (str): The host of the collection.
+            size (int | None, optional): Expected bytes of the transfer, to
+                start small transfers first. Defaults to None (unknown, last).
+        """
+        entry = [
+            math.inf if size is None else size,
+            next(self._seq),
+            time.monotonic(),
+            collection,
+            host,
+        ]
+        with self._cond:
+            self._waiting.append(entry)
+            while not self._ready(entry):
+                # priorities change as transfers start starving
+                self._cond.wait(timeout=self.starvation or None)
+            self._waiting.remove(entry)
+            self._collections[collection] += 1
+            self._hosts[host] += 1
+            self.waited += time.monotonic() - entry[2]
+
+        try:
+            yield self
+        finally:
+            with self._cond:
+                self._collections[collection] -= 1
+                self._hosts[host] -= 1
+                self._cond.notify_all()
+
+    def throttle(self, n: int) -> None:
+        """Account for `n` transferred bytes against the bandwidth cap."""
+        if self.bucket is not None and n > 0:
+            self.bucket.consume(n)
+
+
+_SCHEDULER: TransferScheduler | None = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def scheduler() -> TransferScheduler:
+    """The scheduler shared by the transfers of the process.
+
+    Configured by `transfer_collection_limit`, `transfer_host_limit` and
+    `transfer_bandwidth` of the client configuration.
+    """
+    global _SCHEDULER
+
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None:
+            from aero_client.utils import CONF
+
+            _SCHEDULER = TransferScheduler(
+                collection_limit=getattr(
+                    CONF, "transfer_collection_limit", COLLECTION_LIMIT
+                ),
+                host_limit=getattr(CONF, "transfer_host_limit", HOST_LIMIT),
+                bandwidth=getattr(CONF, "transfer_bandwidth", None),
+            )
+        return _SCHEDULER
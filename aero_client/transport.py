@@ -0,0 +1,299 @@
+"""AERO HTTP transport module.
+
+All remote calls of the client go through `request`, which shares one
+connection pool, retries idempotent requests on transient failures with
+jittered exponential backoff, fails fast through a per-host circuit breaker
+during outages and raises typed errors for failed responses.
+"""
+
+import copy
+import logging
+import random
+import threading
+import time
+import urllib.parse
+
+from dataclasses import dataclass
+from typing import Any
+
+import requests
+
+from aero_client.error import CircuitOpenError
+from aero_client.error import RemoteError
+from aero_client.error import TransientError
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "PUT", "DELETE", "OPTIONS"])
+
+
+@dataclass
+class RetryPolicy:
+    """Retry and circuit breaker configuration."""
+
+    max_retries: int = 3
+    """Retries after the first attempt of an idempotent request."""
+
+    backoff: float = 0.5
+    """Base delay in seconds, doubled at every retry."""
+
+    max_backoff: float = 10.0
+    """Upper bound of the delay between two attempts."""
+
+    retry_statuses: frozenset[int] = frozenset([429, 500, 502, 503, 504])
+    """Response status codes considered transient."""
+
+    failure_threshold: int = 5
+    """Consecutive transient failures after which the circuit of a host opens."""
+
+    reset_timeout: float = 30.0
+    """Seconds an open circuit waits before letting a trial request through."""
+
+    def delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay before retry `attempt` (from 0)."""
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+
+DEFAULT_POLICY = RetryPolicy()
+
+
+class CircuitBreaker:
+    """Circuit breaker of a single host.
+
+    Closed: requests flow. Open (after `failure_threshold` consecutive
+    failures): requests fail immediately. Half-open (after `reset_timeout`):
+    one trial request is let through, closing the circuit on success.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a request may be sent."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial = False
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """End a trial request that was interrupted without an outcome."""
+        with self._lock:
+            self._trial = False
+
+
+class TransportStats:
+    """Per-host request counters reported in the task metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: dict[str, dict[str, int | float]] = {}
+
+    def record(self, host: str, **counts: int | float) -> None:
+        with self._lock:
+            stats = self._hosts.setdefault(
+                host,
+                {
+                    "requests": 0,
+                    "retries": 0,
+                    "failures": 0,
+                    "rejected": 0,
+                    "latency": 0.0,
+                },
+            )
+            for k, v in counts.items():
+                stats[k] += v
+
+    def snapshot(self) -> dict[str, dict[str, int | float]]:
+        with self._lock:
+            return copy.deepcopy(self._hosts)
+
+    def since(self, before: dict) -> dict[str, dict[str, int | float]]:
+        """Counters accumulated since the `before` snapshot."""
+        delta = {}
+        for host, stats in self.snapshot().items():
+            prev = before.get(host, {})
+            diff = {k: v - prev.get(k, 0) for k, v in stats.items()}
+            if diff["requests"] > 0 or diff["rejected"] > 0:
+                delta[host] = diff
+        return delta
+
+
+SESSION = requests.Session()
+"""Session shared by all requests of the client, pooling connections per host."""
+
+STATS = TransportStats()
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker(host: str, policy: RetryPolicy = DEFAULT_POLICY) -> CircuitBreaker:
+    """The circuit breaker of `host`."""
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(
+                policy.failure_threshold, policy.reset_timeout
+            )
+        return _breakers[host]
+
+
+def _rewind(data: Any) -> bool:
+    """Rewind a request body before a retry, returning whether it is replayable."""
+    if data is None or isinstance(data, (bytes, str, dict, list, tuple)):
+        return True
+    if hasattr(data, "rewind"):
+        data.rewind()
+        return True
+    return False
+
+
+def _error_message(resp: requests.Response) -> str:
+    try:
+        return str(resp.content, encoding="utf-8")
+    except (TypeError, UnicodeDecodeError):
+        return repr(resp.content)
+
+
+def request(
+    method: str,
+    url: str,
+    *,
+    idempotent: bool | None = None,
+    raise_for_status: bool = True,
+    policy: RetryPolicy = DEFAULT_POLICY,
+    session: requests.Session | None = None,
+    **kwargs,
+) -> requests.Response:
+    """Send an HTTP request with retries and a circuit breaker.
+
+    Args:
+        method (str): HTTP method.
+        url (str): URL of the request.
+        idempotent (bool | None, optional): Whether the request may be
+            retried. Defaults to True for GET, HEAD, PUT, DELETE and OPTIONS.
+        raise_for_status (bool, optional): Raise a `RemoteError` for 4xx and
+            5xx responses. Defaults to True.
+        policy (RetryPolicy, optional): Retry and circuit breaker
+            configuration. Defaults to `DEFAULT_POLICY`.
+        session (requests.Session | None, optional): Session to send the
+            request with. Defaults to the shared `SESSION`.
+        **kwargs: Passed on to `requests.Session.request`.
+
+    Raises:
+        CircuitOpenError: if the circuit breaker of the host is open.
+        TransientError: if the request failed transiently on every attempt.
+        RemoteError: if `raise_for_status` and the response is an error.
+
+    Returns:
+        requests.Response: The response.
+    """
+    method = method.upper()
+    session = SESSION if session is None else session
+    host = urllib.parse.urlparse(url).netloc
+    circuit = breaker(host, policy)
+
+    if idempotent is None:
+        idempotent = method in IDEMPOTENT_METHODS
+    retries = policy.max_retries if idempotent else 0
+
+    attempt = 0
+    while True:
+        if not circuit.allow():
+            STATS.record(host, rejected=1)
+            raise CircuitOpenError(
+                f"Circuit open for {host}",
+                code=503,
+                message=f"Circuit breaker open for {host}",
+                url=url,
+            )
+
+        start = time.perf_counter()
+        error: Exception | None = None
+        resp = None
+        try:
+            resp = session.request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+        except Exception:
+            # e.g. invalid headers or a broken chunked response from the host
+            circuit.failure()
+            raise
+        except BaseException:
+            circuit.release()
+            raise
+        latency = time.perf_counter() - start
+
+        transient = error is not None or resp.status_code in policy.retry_statuses
+        STATS.record(host, requests=1, latency=latency, failures=int(transient))
+
+        if not transient:
+            circuit.success()
+            break
+
+        circuit.failure()
+        if attempt >= retries or not _rewind(kwargs.get("data")):
+            if error is not None:
+                raise TransientError(
+                    str(error), code=503, message=str(error), url=url
+                ) from error
+            if raise_for_status:
+                raise TransientError(
+                    f"{method} {url} failed with {resp.status_code}",
+                    code=resp.status_code,
+                    message=_error_message(resp),
+                    url=url,
+                )
+            break
+
+        delay = policy.delay(attempt)
+        if resp is not None and resp.headers.get("Retry-After", "").isdigit():
+            delay = min(policy.max_backoff, float(resp.headers["Retry-After"]))
+        logger.debug(
+            f"Retrying {method} {url} in {delay:.2f}s "
+            f"({error or resp.status_code}, attempt {attempt + 1}/{retries})"
+        )
+        STATS.record(host, retries=1)
+        if resp is not None:
+            resp.close()  # release the connection of a streamed response
+        time.sleep(delay)
+        attempt += 1
+
+    if raise_for_status and resp.status_code >= 400:
+        raise RemoteError(
+            f"{method} {url} failed with {resp.status_code}",
+            code=resp.status_code,
+            message=_error_message(resp),
+            url=url,
+        )
+
+    return resp
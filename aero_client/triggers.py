@@ -0,0 +1,193 @@
+"""AERO client-side trigger scheduler module.
+
+Watches the latest versions of the inputs of ANY/ALL policy flows with
+conditional requests and triggers a flow only when its policy is met.
+"""
+
+import json
+import logging
+import threading
+import urllib.parse
+
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from typing import Callable
+
+import requests
+
+from aero_client.cache import _atomic_write_json
+from aero_client.cache import validators
+from aero_client.error import RemoteError
+from aero_client.transport import request
+from aero_client.utils import CONF
+from aero_client.utils import PolicyEnum
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WatchedFlow:
+    """A flow whose inputs are watched by the scheduler."""
+
+    flow_id: str
+    """The flow UUID."""
+
+    policy: PolicyEnum
+    """`PolicyEnum.ANY` or `PolicyEnum.ALL`."""
+
+    data_ids: list[str] = field(default_factory=list)
+    """AERO data ids of the flow inputs."""
+
+    @classmethod
+    def from_flow(cls, flow: dict) -> "WatchedFlow":
+        """Build from a flow document as returned by `api.get_flow(..., inputs_only=False)`."""
+        data_ids = [d["id"] for d in flow.get("derived_from", [])]
+        if len(data_ids) == 0:
+            input_data = (
+                flow.get("function_args", {})
+                .get("kwargs", {})
+                .get("aero", {})
+                .get("input_data", {})
+            )
+            data_ids = [v["id"] for v in input_data.values()]
+        return cls(
+            flow_id=flow["id"],
+            policy=PolicyEnum(flow["policy"]),
+            data_ids=data_ids,
+        )
+
+
+class TriggerScheduler:
+    """Trigger flows when their ANY/ALL input policy is actually met.
+
+    The latest version of every watched data id is polled with conditional
+    requests (`If-None-Match`/`If-Modified-Since`), so unchanged inputs cost
+    a `304 Not Modified`. A flow with the ANY policy is triggered when any of
+    its inputs has a version newer than when it was last triggered, a flow
+    with the ALL policy when all of them have.
+
+    Args:
+        flows (list[WatchedFlow]): Flows to watch.
+        trigger (Callable[[WatchedFlow, dict[str, int]], None]): Called with
+            the flow and the latest version of each of its inputs when the
+            flow must run.
+        interval (float, optional): Seconds between polls. Defaults to 60.
+        state_path (str | Path | None, optional): File persisting the input
+            versions flows were last triggered with, so that a restarted
+            scheduler does not trigger them again. Defaults to
+            `<aero_dir>/triggers.json`.
+        token (str | None, optional): AERO access token. Defaults to the
+            token of the authenticated client.
+    """
+
+    def __init__(
+        self,
+        flows: list[WatchedFlow],
+        trigger: Callable[[WatchedFlow, dict[str, int]], None],
+        interval: float = 60,
+        state_path: str | Path | None = None,
+        token: str | None = None,
+    ):
+        for flow in flows:
+            if flow.policy not in (PolicyEnum.ANY, PolicyEnum.ALL):
+                raise ValueError(
+                    f"Flow {flow.flow_id} has policy {flow.policy.name}, "
+                    "only ANY and ALL policies can be scheduled."
+                )
+
+        if token is None:
+            from aero_client.api import AUTH_ACCESS_TOKEN as token
+
+        self.flows = flows
+        self.trigger = trigger
+        self.interval = interval
+        self.state_path = Path(state_path or Path(CONF.aero_dir, "triggers.json"))
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {token}"
+
+        self.latest: dict[str, int] = {}
+        self._validators: dict[str, dict[str, str]] = {}
+        self._stop = threading.Event()
+
+        try:
+            with open(self.state_path) as f:
+                self.triggered: dict[str, dict[str, int]] = json.load(f)
+        except FileNotFoundError:
+            self.triggered = {}
+
+    def _poll(self, data_id: str) -> int | None:
+        """Latest version of a data id, using a conditional request."""
+        url = urllib.parse.urljoin(f"{CONF.server_url}/", f"data/{data_id}/latest")
+        resp = request(
+            "GET",
+            url,
+            headers=self._validators.get(data_id, {}),
+            verify=False,
+            session=self.session,
+            raise_for_status=False,
+        )
+
+        if resp.status_code == 304:
+            return self.latest.get(data_id)
+        if resp.status_code != 200:
+            logger.warning(f"Could not poll {data_id}: {resp.status_code}")
+            return self.latest.get(data_id)
+
+        self._validators[data_id] = validators(resp.headers)
+
+        return resp.json()["version"]
+
+    def _due(self, flow: WatchedFlow, versions: dict[str, int]) -> bool:
+        last = self.triggered.get(flow.flow_id)
+        if last is None:
+            return False
+
+        changed = [versions[d] > last.get(d, 0) for d in flow.data_ids]
+        if flow.policy == PolicyEnum.ANY:
+            return any(changed)
+        return all(changed)
+
+    def poll_once(self) -> list[str]:
+        """Poll all watched inputs once and trigger the flows that are due.
+
+        Flows seen for the first time are not triggered, only their current
+        input versions are recorded.
+
+        Returns:
+            list[str]: The ids of the triggered flows.
+        """
+        for data_id in {d for flow in self.flows for d in flow.data_ids}:
+            version = self._poll(data_id)
+            if version is not None:
+                self.latest[data_id] = version
+
+        triggered = []
+        for flow in self.flows:
+            if any(d not in self.latest for d in flow.data_ids):
+                continue
+
+            versions = {d: self.latest[d] for d in flow.data_ids}
+            if flow.flow_id not in self.triggered:
+                self.triggered[flow.flow_id] = versions
+            elif self._due(flow, versions):
+                logger.info(f"Triggering flow {flow.flow_id} with {versions}")
+                self.trigger(flow, versions)
+                self.triggered[flow.flow_id] = versions
+                triggered.append(flow.flow_id)
+
+        _atomic_write_json(self.state_path, self.triggered)
+        return triggered
+
+    def run(self) -> None:
+        """Poll until `stop` is called."""
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except (requests.exceptions.RequestException, RemoteError) as e:
+                logger.warning(f"Polling failed: {e}")
+            self._stop.wait(self.interval)
+
+    def stop(self) -> None:
+        """Stop a running scheduler after its current poll."""
+        self._stop.set()
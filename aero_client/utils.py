@@ -2,11 +2,9 @@
 
 import codecs
 import dill
-import hashlib
-import json
+import io
 import logging
 import mimetypes
-import requests
 import urllib
 import uuid
 
@@ -14,6 +12,10 @@ from dataclasses import dataclass
 from datetime import datetime
 from enum import IntEnum
 from pathlib import Path
+from typing import Any
+from typing import BinaryIO
+from typing import Callable
+from typing import Literal
 
 from globus_compute_sdk import Client as ComputeClient
 from globus_sdk import AccessTokenAuthorizer
@@ -25,7 +27,12 @@ from globus_sdk import TransferClient
 from aero_client.config import _conf_symlink_path
 from aero_client.config import _conf_fn
 from aero_client.config import load_conf
+from aero_client.error import ChecksumError
 from aero_client.error import ClientError
+from aero_client.hashing import BackgroundHasher
+from aero_client.hashing import HashingWriter
+from aero_client.tokens import TokenStore
+from aero_client.transport import request
 
 
 logger = logging.getLogger(__name__)
@@ -65,8 +72,153 @@ class PolicyEnum(IntEnum):
 
 @dataclass
 class AeroOutput:
+    """
+    Output of a user function to be stored in a Globus Guest Collection.
+
+    Exactly one of `path` or `data` must be provided. In-memory `data` is
+    streamed straight into the upload without being written to disk.
+    """
+
     name: str
-    path: str
+    """Name of the output, matching a key of the flow `output_data`."""
+
+    path: str | None = None
+    """Path of the output file or directory on the local filesystem. A
+    directory is stored as a single tar bundle with an index of its files."""
+
+    data: Any = None
+    """Output content as bytes, a binary file-like object, a pandas DataFrame
+    or a pyarrow Table."""
+
+    file_format: Literal["csv", "parquet"] | None = None
+    """Serialization format of DataFrame and Table `data`. Defaults to `csv`
+    for DataFrames and `parquet` for Tables."""
+
+    def __post_init__(self):
+        if (self.path is None) == (self.data is None):
+            raise ClientError(
+                code=400,
+                message=f"AeroOutput {self.name} requires exactly one of path or data",
+            )
+
+
+_UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+_TABULAR_MIMETYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class _HashingReader:
+    """File-like wrapper computing the checksum of the content as it is read.
+
+    Defines `__len__` so that `requests` sends a `Content-Length` header and
+    streams the content in blocks instead of loading it in memory.
+    """
+
+    def __init__(
+        self,
+        fileobj: BinaryIO,
+        length: int,
+        algorithm: str | None = None,
+        throttle: Callable[[int], None] | None = None,
+    ):
+        self._fileobj = fileobj
+        self._start = fileobj.tell()
+        self._length = length
+        self._throttle = throttle
+        self.hash = BackgroundHasher(algorithm or CONF.hash_algorithm)
+        self.size = 0
+
+    def rewind(self) -> None:
+        """Restart reading from the beginning, e.g. to retry an upload."""
+        self._fileobj.seek(self._start)
+        self.hash.reset()
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self._length - self.size
+
+    def __iter__(self):
+        while chunk := self.read(_UPLOAD_CHUNK_SIZE):
+            yield chunk
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._fileobj.read(size)
+        self.hash.update(chunk)
+        self.size += len(chunk)
+        if self._throttle is not None:
+            self._throttle(len(chunk))
+        return chunk
+
+
+def _serialize_table(table: Any, file_format: str | None) -> tuple[bytes, str]:
+    """Serialize a pandas DataFrame or pyarrow Table in memory.
+
+    Returns:
+        tuple[bytes, str]: The serialized table and its format.
+    """
+    is_arrow = type(table).__module__.startswith("pyarrow")
+    file_format = file_format or ("parquet" if is_arrow else "csv")
+
+    buf = io.BytesIO()
+    if is_arrow:
+        if file_format == "parquet":
+            import pyarrow.parquet as pq
+
+            pq.write_table(table, buf)
+        else:
+            import pyarrow.csv as pacsv
+
+            pacsv.write_csv(table, buf)
+    elif file_format == "parquet":
+        table.to_parquet(buf)
+    else:
+        table.to_csv(buf, index=False)
+
+    return buf.getvalue(), file_format
+
+
+def _upload_body(
+    path: str | None, data: Any, file_format: str | None
+) -> tuple[BinaryIO, int, tuple[str | None, str | None]]:
+    """Open the content of an output as a binary stream.
+
+    Returns:
+        tuple: The stream, its length in bytes and its mimetype.
+    """
+    if path is not None:
+        return open(path, "rb"), Path(path).stat().st_size, mimetypes.guess_type(path)
+
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return io.BytesIO(data), len(data), ("application/octet-stream", None)
+
+    if hasattr(data, "read"):
+        try:
+            start = data.tell()
+            length = data.seek(0, io.SEEK_END) - start
+            data.seek(start)
+        except (AttributeError, OSError):
+            # non-seekable streams are materialized to know their length
+            content = data.read()
+            data, length = io.BytesIO(content), len(content)
+        mtype = mimetypes.guess_type(getattr(data, "name", ""))
+        if mtype == (None, None):
+            mtype = ("application/octet-stream", None)
+        return data, length, mtype
+
+    if hasattr(data, "to_csv") or type(data).__module__.startswith("pyarrow"):
+        content, file_format = _serialize_table(data, file_format)
+        return (
+            io.BytesIO(content),
+            len(content),
+            (_TABULAR_MIMETYPES[file_format], None),
+        )
+
+    raise ClientError(
+        code=400, message=f"Unsupported output data type {type(data).__name__}"
+    )
 
 
 def serialize(obj) -> str:
@@ -112,11 +264,15 @@ def _client_auth() -> str:
             "email",
             TransferClient.scopes.all,
         ]
+        if getattr(CONF, "offload_collection", None) is not None:
+            # consent to the offload collection, required if it is mapped
+            scopes[-1] = (
+                f"{TransferClient.scopes.all}[*https://auth.globus.org/scopes/"
+                f"{CONF.offload_collection}/data_access]"
+            )
         token_response = authenticate(client=client, scope=scopes)
 
-        CONF.aero_dir.mkdir(exist_ok=True, parents=True)
-        with open(_TOKEN_PATH, "w+") as f:
-            json.dump(token_response.by_resource_server, f)
+        _token_store().save(token_response.by_resource_server)
 
         auth_token = token_response.by_resource_server[CONF.portal_client_id][
             "access_token"
@@ -138,18 +294,19 @@ def get_transfer_token(collection_uuid: str) -> str:
     Returns:
         str: The transfer token for the guest collection
     """
-    tokens = load_tokens()
+    store = _token_store()
+    tokens = store.load()
 
     client = NativeAppAuthClient(client_id=CONF.client_uuid)
 
     if collection_uuid in tokens:
-        transfer_token = tokens[collection_uuid]["access_token"]
-        ref_transfer_token = tokens[collection_uuid]["refresh_token"]
-        rta = RefreshTokenAuthorizer(
-            refresh_token=ref_transfer_token, auth_client=client
-        )
-        transfer_token = rta.get_authorization_header().split(" ")[-1]
-        return transfer_token
+
+        def refresh(refresh_token: str) -> dict:
+            response = client.oauth2_refresh_token(refresh_token)
+            return response.by_resource_server[collection_uuid]
+
+        # shared with the other processes, refreshed only once expired
+        return store.access_token(collection_uuid, refresh)
 
     else:
         scopes = [
@@ -159,9 +316,7 @@ def get_transfer_token(collection_uuid: str) -> str:
 
         token_response = authenticate(client=client, scope=scopes)
 
-        tokens = tokens | token_response.by_resource_server
-        with open(_TOKEN_PATH, "w+") as f:
-            json.dump(tokens, f)
+        store.save(token_response.by_resource_server)
 
         transfer_token = token_response.by_resource_server[collection_uuid][
             "access_token"
@@ -171,12 +326,19 @@ def get_transfer_token(collection_uuid: str) -> str:
         return transfer_token
 
 
+_TOKEN_STORES: dict[Path, TokenStore] = {}
+
+
+def _token_store() -> TokenStore:
+    """The token store of the token file, shared within the process."""
+    if _TOKEN_PATH not in _TOKEN_STORES:
+        _TOKEN_STORES[_TOKEN_PATH] = TokenStore(_TOKEN_PATH)
+    return _TOKEN_STORES[_TOKEN_PATH]
+
+
 def load_tokens():
     logger.debug("Token file exists. Instantiating tokens from authorizer.")
-    with open(_TOKEN_PATH, "r") as f:
-        tokens = json.load(f)
-
-    return tokens
+    return _token_store().load()
 
 
 def get_collection_metadata(domain: str) -> None:
@@ -200,12 +362,12 @@ def download(*args, **kwargs):
     """
     import hashlib
     import pathlib
-    import requests
     import uuid
     from mimetypes import guess_extension
     from pathlib import Path
 
     from aero_client.config import CONF
+    from aero_client.transport import request
     from aero_client.utils import load_tokens
 
     if "temp_dir" in kwargs:
@@ -219,12 +381,15 @@ def download(*args, **kwargs):
 
     headers = {"Authorization": f"Bearer {auth_token}"}
 
-    response = requests.get(
-        f'{CONF.server_url}/source/{kwargs["source_id"]}', headers=headers, verify=False
+    response = request(
+        "GET",
+        f'{CONF.server_url}/source/{kwargs["source_id"]}',
+        headers=headers,
+        verify=False,
     )
     source = response.json()
 
-    response = requests.get(source["url"])
+    response = request("GET", source["url"])
     content_type = response.headers["content-type"]
     ext = guess_extension(content_type.split(";")[0])
 
@@ -253,40 +418,65 @@ def register_function(fn: callable):
     return func_uuid
 
 
-def gcs_save(path: str, collection_url: str, collection_uuid: str) -> dict:
+def gcs_save(
+    path: str | None,
+    collection_url: str,
+    collection_uuid: str,
+    data: Any = None,
+    file_format: str | None = None,
+) -> dict:
+    """Upload an output to a Globus Guest Collection over HTTPS.
+
+    The content is streamed to the collection and its checksum computed
+    while it is being sent.
+
+    Args:
+        path (str | None): Path of the file to upload. The file is removed
+            once uploaded.
+        collection_url (str): HTTPS URL of the collection.
+        collection_uuid (str): UUID of the collection.
+        data (Any, optional): In-memory content to upload instead of `path`.
+            See `AeroOutput.data`. Defaults to None.
+        file_format (str | None, optional): Serialization format of tabular
+            `data`. Defaults to None.
+
+    Returns:
+        dict: Metadata of the stored output.
+    """
     # collection_domain = urllib.parse.urlparse(collection_url).netloc
     import time
 
+    from aero_client.transfers import scheduler
+
     TRANSFER_TOKEN = get_transfer_token(collection_uuid)
     headers = {"Authorization": f"Bearer {TRANSFER_TOKEN}"}
 
     filename = str(uuid.uuid4())
     url = urllib.parse.urljoin(collection_url, filename)
 
-    mtype = mimetypes.guess_type(path)
-
-    if "text" not in mtype:
-        with open(path, "rb") as f:
-            data = f.read()
-            checksum = hashlib.md5(data).hexdigest()
-    else:
-        with open(path, "r") as f:
-            data = f.read()
-            checksum = hashlib.md5(data.encode("utf-8")).hexdigest()
+    transfers = scheduler()
+    body, length, mtype = _upload_body(path, data, file_format)
+    reader = _HashingReader(body, length, throttle=transfers.throttle)
 
     # store in GCS
     start = time.time_ns()
-    resp = requests.put(url, headers=headers, data=data)
+    try:
+        host = urllib.parse.urlparse(url).netloc
+        with transfers.slot(collection_uuid, host, length):
+            request("PUT", url, headers=headers, data=reader)
+    finally:
+        if body is not data:
+            body.close()
     end = time.time_ns()
 
-    Path(path).unlink(missing_ok=True)  # remove tmp output
-
-    assert resp.status_code == 200, resp.content
+    if path is not None:
+        Path(path).unlink(missing_ok=True)  # remove tmp output
 
     return {
         "created_at": datetime.now().ctime(),
-        "checksum": checksum,
-        "size": len(data),
+        "checksum": reader.hash.hexdigest(),
+        "checksum_algorithm": reader.hash.algorithm,
+        "size": reader.size,
         "file_bn": filename,
         "file_format": mtype,
         "start": start,
@@ -295,116 +485,440 @@ def gcs_save(path: str, collection_url: str, collection_uuid: str) -> dict:
     }
 
 
-def aero_format(fn: callable):
-    """AERO decorator that wraps user analysis function to capture provenance information."""
-    import requests
-    import urllib
-    import time
+def _verify_checksum(name: str, recorded: dict, staged: HashingWriter) -> None:
+    """Check a staged input against the checksum recorded for it.
 
-    from pathlib import Path
+    Raises:
+        ChecksumError: if the checksums differ.
+    """
+    if recorded.get("checksum") is None:
+        logger.warning(f"No checksum recorded for input {name}, not verified.")
+        return
+
+    actual = staged.hash.hexdigest()
+    if actual != recorded["checksum"]:
+        raise ChecksumError(
+            f"Checksum mismatch for input {name}",
+            code=422,
+            message=(
+                f"Staged input {name} has {staged.hash.algorithm} checksum "
+                f"{actual}, expected {recorded['checksum']}"
+            ),
+        )
 
-    def wrapper(*args, **kwargs):
-        task_start: float
-        task_end: float
-        subtasks: dict[str, float] = {}
 
-        if "metrics" in kwargs and kwargs["metrics"] is True:
-            task_start = time.time_ns()
+def _run_packed_task(fn: Any, fn_in: dict) -> tuple[Any, dict]:
+    """Run one task of a pack, returning its outputs and timing or error."""
+    import time
 
-        fn_in = {}
+    if isinstance(fn, bytes):
+        fn = dill.loads(fn)
 
-        assert "aero" in kwargs.keys()
+    start = time.time_ns()
+    try:
+        outputs = fn(**fn_in)
+    except Exception as e:
+        logger.exception(f"Packed task failed: {e}")
+        return None, {"error": repr(e)}
+    end = time.time_ns()
+    return outputs, {"task_start": start, "task_end": end, "duration": end - start}
+
+
+def aero_format(fn: callable, storage=None):
+    """AERO decorator that wraps user analysis function to capture provenance information.
+
+    Inputs are staged from and outputs stored to `storage`, an
+    `aero_client.storage.HTTPSStorage` (the default) or a stand-in such as
+    `aero_client.storage.LocalStorage`.
+
+    Outputs whose `output_data` entry sets `"columnar": True` are also stored
+    as a Parquet sidecar, recorded under `"sidecar"` in the output metadata.
+    Inputs whose `input_data` entry sets `"columnar": True` are staged from
+    their sidecar when the version has one.
+
+    Inputs whose `input_data` entry sets `"verify": True` are checked against
+    their recorded checksum while they are staged, a mismatch raises a
+    `ChecksumError`. Incrementally staged inputs are not verified.
+
+    Inputs whose `input_data` entry sets `"delta": True` are staged
+    incrementally: when an output marked `"state": True` records the input
+    version it last consumed and the source only appended rows since, only
+    the header and the new rows are staged, or only the header when the
+    consumed version is the current one. The function then receives
+    `<input>_delta` describing the staged rows and `<output>_previous`, the
+    path to the previous version of the state output.
+
+    Outputs whose `path` is a directory are stored as a single tar bundle,
+    with an index of its files recorded under `"bundle"`. Bundled inputs are
+    staged as a directory, or, when their `input_data` entry lists
+    `"members"`, as a directory holding only those files, each fetched with
+    a range request.
+
+    Tasks packed by `api.register_flow(..., pack_size=N)` are received as
+    an `aero_pack` list of task arguments. The shared inputs are staged once,
+    the function runs once per task in a local process pool of
+    `pack_workers` processes, and the outputs of each task are stored
+    separately. The result holds one entry per task in `aero_pack`, with its
+    own `aero` metadata, or the `error` raised by the function.
+
+    When `storage` holds an `offload.TransferOffload` (by default when
+    `offload_threshold`, `offload_collection` and `offload_dir` are
+    configured), file and bundle outputs and fully staged inputs at least as
+    large as its threshold are moved by Globus Transfer tasks, verifying their
+    checksum, and the task is recorded under `"transfer"` in their metadata.
+
+    When the wrapped function is called with ``metrics=True``, the wall-clock
+    time, CPU time, peak RSS and I/O volume of the input staging, user function
+    and output upload phases are recorded in ``wrapper_metrics["phases"]``.
+
+    When it is called with ``profile=True`` (or ``"cprofile"`` or
+    ``"pyinstrument"``), the user function is profiled and its hottest
+    functions are recorded in ``wrapper_metrics["profile"]``. The raw profile
+    is stored to the output whose `output_data` entry sets `"profile": True`,
+    if any, so that it is recorded in the provenance of the run. Packed tasks
+    are not profiled.
+    """
+    import shutil
+    import time
+
+    from aero_client.bundles import extract_bundle
+    from aero_client.bundles import member_path
+    from aero_client.bundles import write_bundle
+    from aero_client.columnar import build_sidecar
+    from aero_client.delta import incremental_offset
+    from aero_client.metrics import PhaseUsage
+    from aero_client.offload import default_offload
+    from aero_client.profiling import FunctionProfile
+    from aero_client.scratch import ScratchSpace
+    from aero_client.storage import HTTPSStorage
+    from aero_client.transport import STATS
+
+    backend = HTTPSStorage(offload=default_offload()) if storage is None else storage
+    offload = getattr(backend, "offload", None)
+
+    def fetch_offloaded(scratch, val: dict, file_bn: str, recorded: dict) -> Path:
+        """Stage a whole input with a transfer task, recorded in `val`."""
+        path, val["transfer"] = offload.download(
+            val["collection_url"],
+            val["collection_uuid"],
+            file_bn,
+            checksum=recorded.get("checksum"),
+            algorithm=recorded.get("checksum_algorithm", "md5"),
+            verify=val.get("verify") is True,
+        )
+        scratch.adopt(path)
+        return path
+
+    def save_file(out_md: dict, path: str) -> dict:
+        """Store a file output, with a transfer task if it is large enough."""
+        if offload is not None and offload.applies(Path(path).stat().st_size):
+            return offload.upload(
+                path,
+                out_md["collection_url"],
+                out_md["collection_uuid"],
+                CONF.hash_algorithm,
+            )
+        return backend.save(
+            out_md["collection_url"], out_md["collection_uuid"], path=path
+        )
 
-        if "output_data" in kwargs["aero"]:
-            for name, val in kwargs["aero"]["output_data"].items():
+    def stage_bundle(scratch, name: str, val: dict) -> str:
+        """Stage a directory input, or only its listed `members`."""
+        directory = scratch.path(directory=val.get("tmp_dir"))
+        directory.mkdir(parents=True)
+        index = val["bundle"]["members"]
+
+        if val.get("members") is not None:
+            for member in val["members"]:
+                if member not in index:
+                    raise ClientError(
+                        code=404,
+                        message=f"Input {name} has no member {member}",
+                    )
+                scratch.check(index[member]["size"])
+                with open(member_path(directory, member), "wb") as f:
+                    backend.fetch(
+                        val["collection_url"],
+                        val["collection_uuid"],
+                        val["file_bn"],
+                        f,
+                        offset=index[member]["offset"],
+                        length=index[member]["size"],
+                    )
+            return str(directory)
+
+        if offload is not None and offload.applies(val.get("size")):
+            scratch.check(2 * val["size"])
+            bundle = fetch_offloaded(scratch, val, val["file_bn"], val)
+            extract_bundle(bundle, directory)
+            bundle.unlink()
+            return str(directory)
+
+        bundle = scratch.path(size=2 * (val.get("size") or 0))
+        verify = val.get("verify") is True
+        with open(bundle, "wb+") as f:
+            out = (
+                HashingWriter(f, val.get("checksum_algorithm", "md5")) if verify else f
+            )
+            backend.fetch(
+                val["collection_url"],
+                val["collection_uuid"],
+                val["file_bn"],
+                out,
+                size=val.get("size"),
+            )
+        if verify:
+            _verify_checksum(name, val, out)
+        extract_bundle(bundle, directory)
+        bundle.unlink()
+        return str(directory)
+
+    def stage(scratch, aero: dict) -> dict[str, Any]:
+        """Stage the inputs of a task, returning the function inputs."""
+        fn_in = {}
+        consumed = {}
+        if "output_data" in aero:
+            for name, val in aero["output_data"].items():
                 if "file" in val:
                     fn_in[name] = val["file"]
-        if "input_data" in kwargs["aero"]:
-            for name, val in kwargs["aero"]["input_data"].items():
-                TRANSFER_TOKEN = get_transfer_token(val["collection_uuid"])
-                headers = {"Authorization": f"Bearer {TRANSFER_TOKEN}"}
-
-                resp = requests.get(
-                    urllib.parse.urljoin(
-                        f"{val['collection_url']}/", f"{val['file_bn']}"
-                    ),
-                    headers=headers,
-                )
-
-                if "tmp_dir" not in val:
-                    val["tmp_dir"] = "/tmp"
-
-                tmp_path = Path(val["tmp_dir"]) / str(uuid.uuid4())
+                    scratch.adopt(val["file"])
+                if val.get("state") is True:
+                    previous = val.get("previous")
+                    fn_in[f"{name}_previous"] = None
+                    if previous is not None:
+                        consumed = previous.get("consumed") or {}
+
+                        tmp_path = scratch.path(directory=val.get("tmp_dir"))
+                        with open(tmp_path, "wb+") as f:
+                            backend.fetch(
+                                val["collection_url"],
+                                val["collection_uuid"],
+                                previous["file_bn"],
+                                f,
+                            )
+                        fn_in[f"{name}_previous"] = str(tmp_path)
+                        scratch.check()
+        if "input_data" in aero:
+            for name, val in aero["input_data"].items():
+                if val.get("bundle") is not None:
+                    fn_in[name] = stage_bundle(scratch, name, val)
+                    scratch.check()
+                    continue
+
+                file_bn = val["file_bn"]
+                recorded = val
+                if val.get("columnar") is True:
+                    if val.get("sidecar") is not None:
+                        file_bn = val["sidecar"]["file_bn"]
+                        recorded = val["sidecar"]
+                    else:
+                        logger.warning(
+                            f"No columnar sidecar for input {name}, staging source file."
+                        )
+
+                offsets = None
+                if val.get("delta") is True:
+                    offsets = incremental_offset(
+                        val.get("row_delta"), consumed.get(name), val["version"]
+                    )
+                    fn_in[f"{name}_delta"] = {
+                        "incremental": offsets is not None,
+                        "since_version": None,
+                        "offset": 0,
+                        "row_offset": 0,
+                        "empty": False,
+                    } | (offsets or {})
+
+                if (
+                    offsets is None
+                    and offload is not None
+                    and offload.applies(recorded.get("size"))
+                ):
+                    scratch.check(recorded["size"])
+                    fn_in[name] = str(fetch_offloaded(scratch, val, file_bn, recorded))
+                    scratch.check()
+                    continue
+
+                size = (recorded.get("size") or 0) - (offsets or {}).get("offset", 0)
+                tmp_path = scratch.path(size=size, directory=val.get("tmp_dir"))
+
+                verify = val.get("verify") is True and offsets is None
                 with open(tmp_path, "wb+") as f:
-                    f.write(resp.content)
+                    out = f
+                    if verify:
+                        out = HashingWriter(
+                            f, recorded.get("checksum_algorithm", "md5")
+                        )
+                    if offsets is not None:
+                        f.write(val["row_delta"]["header"].encode("utf-8") + b"\n")
+                    # nothing appended since the consumed version
+                    if offsets is None or not offsets["empty"]:
+                        backend.fetch(
+                            val["collection_url"],
+                            val["collection_uuid"],
+                            file_bn,
+                            out,
+                            offset=0 if offsets is None else offsets["offset"],
+                            size=size or None,
+                        )
                 fn_in[name] = str(tmp_path)
+                scratch.check()
+                if verify:
+                    _verify_checksum(name, recorded, out)
+        return fn_in
+
+    def save_directory(scratch, out_md: dict, path: str) -> dict:
+        """Store a directory output as a single bundle."""
+        bundle = scratch.path()
+        index = write_bundle(path, bundle)
+        metadata = save_file(out_md, str(bundle))
+        shutil.rmtree(path, ignore_errors=True)  # remove tmp output
+        return metadata | {"file_format": ("application/x-tar", None), "bundle": index}
+
+    def store(scratch, aero: dict, outputs: Any, subtasks: dict, metrics: bool) -> None:
+        """Store the outputs of a task, recording their metadata in `aero`."""
+        if not isinstance(outputs, list):
+            assert isinstance(
+                outputs, AeroOutput
+            ), "ERROR: function output is not an AeroOutput"
+            outputs = [outputs]
+            single_output = True
+        else:
+            single_output = False
 
-        aero_args = kwargs.pop("aero")
-        fn_in.update(**kwargs)
-
-        outputs = fn(**fn_in)
+        for ao in outputs:
+            name = ao.name
 
-        kwargs["aero"] = aero_args
+            out_md = aero["output_data"][name]
 
-        if isinstance(outputs, list):
-            for ao in outputs:
-                name = ao.name
+            if metrics:
+                subtasks[f"gcs_{name}"] = {"task_start": time.time_ns()}
 
-                if "metrics" in kwargs and kwargs["metrics"] is True:
-                    subtasks[f"gcs_{name}"] = {"task_start": time.time_ns()}
+            directory = ao.path is not None and Path(ao.path).is_dir()
 
-                metadata = gcs_save(
+            sidecar = None
+            if out_md.get("columnar") is True and not directory:
+                sidecar = build_sidecar(
                     path=ao.path,
-                    collection_url=kwargs["aero"]["output_data"][name][
-                        "collection_url"
-                    ],
-                    collection_uuid=kwargs["aero"]["output_data"][name][
-                        "collection_uuid"
-                    ],
+                    data=ao.data,
+                    file_format=out_md.get("file_format")
+                    if isinstance(out_md.get("file_format"), str)
+                    else None,
                 )
-                if "metrics" in kwargs and kwargs["metrics"] is True:
-                    subtasks[f"gcs_{name}"]["task_end"] = time.time_ns()
-                    subtasks[f"gcs_{name}"]["duration"] = (
-                        subtasks[f"gcs_{name}"]["task_end"]
-                        - subtasks[f"gcs_{name}"]["task_start"]
-                    )
-                kwargs["aero"]["output_data"][name].update(**metadata)
-        else:
-            assert isinstance(
-                outputs, AeroOutput
-            ), "ERROR: function output is not an AeroOutput"
-            name = outputs.name
 
-            if "metrics" in kwargs and kwargs["metrics"] is True:
-                subtasks[f"gcs_{name}"] = {"task_start": time.time_ns()}
-
-            metadata = gcs_save(
-                path=outputs.path,
-                collection_url=kwargs["aero"]["output_data"][name]["collection_url"],
-                collection_uuid=kwargs["aero"]["output_data"][name]["collection_uuid"],
-            )
+            if directory:
+                metadata = save_directory(scratch, out_md, ao.path)
+            elif ao.path is not None and ao.data is None:
+                metadata = save_file(out_md, ao.path)
+            else:
+                metadata = backend.save(
+                    out_md["collection_url"],
+                    out_md["collection_uuid"],
+                    path=ao.path,
+                    data=ao.data,
+                    file_format=ao.file_format,
+                )
 
-            if "metrics" in kwargs and kwargs["metrics"] is True:
+            if sidecar is not None:
+                metadata["sidecar"] = {
+                    **backend.save(
+                        out_md["collection_url"],
+                        out_md["collection_uuid"],
+                        path=sidecar.pop("file"),
+                    ),
+                    **sidecar,
+                }
+            if metrics:
                 subtasks[f"gcs_{name}"]["task_end"] = time.time_ns()
                 subtasks[f"gcs_{name}"]["duration"] = (
                     subtasks[f"gcs_{name}"]["task_end"]
                     - subtasks[f"gcs_{name}"]["task_start"]
                 )
 
-            if "url" in kwargs["aero"]["output_data"][name].keys():
-                metadata.pop("checksum", None)
-            kwargs["aero"]["output_data"][name].update(**metadata)
-
-        # remove tmp data
-        for k, v in fn_in.items():
-            if (
-                ("input_data" in kwargs["aero"] and k in kwargs["aero"]["input_data"])
-                and isinstance(v, str)
-                and Path(v).exists()
+            row_delta = out_md.get("row_delta")
+            if isinstance(row_delta, dict) and (
+                metadata["checksum"] != row_delta["source_checksum"]
+                if metadata.get("checksum_algorithm", "md5") == "md5"
+                else metadata["size"] != row_delta["source_size"]
             ):
-                Path(v).unlink(missing_ok=True)
+                # stored content differs from the download, offsets do not apply
+                row_delta.update(
+                    base_version=None,
+                    offset=None,
+                    row_offset=None,
+                    append_base=None,
+                )
 
-        if "metrics" in kwargs:
+            if out_md.get("state") is True:
+                metadata["consumed"] = {
+                    in_name: {
+                        "version": in_val["version"],
+                        "size": in_val["row_delta"]["source_size"],
+                        "rows": in_val["row_delta"]["rows"],
+                    }
+                    for in_name, in_val in aero.get("input_data", {}).items()
+                    if in_val.get("delta") is True
+                    and in_val.get("row_delta") is not None
+                }
+
+            if single_output and "url" in aero["output_data"][name].keys():
+                metadata.pop("checksum", None)
+            aero["output_data"][name].update(**metadata)
+
+    def store_profile(scratch, aero: dict, profile) -> None:
+        """Store the raw profile to the output marked `"profile": True`, if any."""
+        for name, out_md in aero.get("output_data", {}).items():
+            if out_md.get("profile") is True:
+                path = profile.save(scratch.path())
+                metadata = backend.save(
+                    out_md["collection_url"], out_md["collection_uuid"], path=str(path)
+                )
+                metadata["file_format"] = (
+                    "application/x-pstats"
+                    if profile.profiler == "cprofile"
+                    else "application/x-pyisession",
+                    None,
+                )
+                out_md.update(**metadata)
+                return
+
+    def run(scratch, *args, **kwargs):
+        task_start: float
+        task_end: float
+        subtasks: dict[str, float] = {}
+        phases: dict[str, dict] = {}
+
+        metrics = "metrics" in kwargs and kwargs["metrics"] is True
+
+        if metrics:
+            task_start = time.time_ns()
+            http_start = STATS.snapshot()
+
+        assert "aero" in kwargs.keys()
+
+        with PhaseUsage(enabled=metrics) as usage:
+            fn_in = stage(scratch, kwargs["aero"])
+        phases["stage"] = usage.as_dict() | {"scratch_bytes": scratch.used()}
+
+        aero_args = kwargs.pop("aero")
+        profiler = kwargs.pop("profile", None)
+        fn_in.update(**kwargs)
+
+        with PhaseUsage(enabled=metrics) as usage, FunctionProfile(profiler) as profile:
+            outputs = fn(**fn_in)
+        phases["function"] = usage.as_dict() | {"scratch_bytes": scratch.check()}
+
+        kwargs["aero"] = aero_args
+        if profiler is not None:
+            kwargs["profile"] = profiler
+
+        with PhaseUsage(enabled=metrics) as usage:
+            store(scratch, kwargs["aero"], outputs, subtasks, metrics)
+            if profile.enabled:
+                store_profile(scratch, kwargs["aero"], profile)
+        phases["upload"] = usage.as_dict() | {"scratch_bytes": scratch.used()}
+
+        if metrics:
             task_end = time.time_ns()
 
             kwargs["wrapper_metrics"] = {
@@ -412,8 +926,103 @@ def aero_format(fn: callable):
                 "task_end": task_end,
                 "duration": task_end - task_start,
                 "subtasks": subtasks,
+                "phases": phases,
+                "http": STATS.since(http_start),
+                "scratch": {
+                    "root": str(scratch.root),
+                    "peak_bytes": scratch.peak,
+                    "quota": scratch.quota,
+                },
+            }
+        if profile.enabled:
+            kwargs.setdefault("wrapper_metrics", {})["profile"] = profile.summary()
+
+        return kwargs
+
+    def run_pack(scratch, **kwargs):
+        import copy
+        import os
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        task_start: float
+        task_end: float
+        phases: dict[str, dict] = {}
+
+        pack = kwargs.pop("aero_pack")
+        workers = kwargs.pop("pack_workers", None) or os.cpu_count()
+        metrics = "metrics" in kwargs and kwargs["metrics"] is True
+
+        if metrics:
+            task_start = time.time_ns()
+            http_start = STATS.snapshot()
+
+        # inputs are shared by all the tasks of the pack, stage them once
+        with PhaseUsage(enabled=metrics) as usage:
+            shared = stage(scratch, kwargs["aero"])
+        phases["stage"] = usage.as_dict() | {"scratch_bytes": scratch.used()}
+
+        task_in = [
+            shared | {k: v for k, v in task.items() if k != "aero"} for task in pack
+        ]
+
+        with PhaseUsage(enabled=metrics) as usage:
+            if workers == 1 or len(pack) == 1:
+                ran = [_run_packed_task(fn, fn_in) for fn_in in task_in]
+            else:
+                payload = dill.dumps(fn)
+                with ProcessPoolExecutor(max_workers=min(workers, len(pack))) as pool:
+                    futures = [
+                        pool.submit(_run_packed_task, payload, fn_in)
+                        for fn_in in task_in
+                    ]
+                    ran = [f.result() for f in futures]
+        phases["function"] = usage.as_dict() | {"scratch_bytes": scratch.check()}
+
+        results = []
+        with PhaseUsage(enabled=metrics) as usage:
+            for task, (outputs, task_metrics) in zip(pack, ran):
+                result = {k: v for k, v in task.items() if k != "aero"}
+                if "error" in task_metrics:
+                    result["error"] = task_metrics.pop("error")
+                else:
+                    result["aero"] = copy.deepcopy(kwargs["aero"])
+                    subtasks = {}
+                    store(scratch, result["aero"], outputs, subtasks, metrics)
+                    task_metrics["subtasks"] = subtasks
+                if metrics:
+                    result["wrapper_metrics"] = task_metrics
+                results.append(result)
+        phases["upload"] = usage.as_dict() | {"scratch_bytes": scratch.used()}
+
+        kwargs["aero_pack"] = results
+
+        if metrics:
+            task_end = time.time_ns()
+
+            kwargs["wrapper_metrics"] = {
+                "task_start": task_start,
+                "task_end": task_end,
+                "duration": task_end - task_start,
+                "tasks": len(pack),
+                "failed": sum("error" in r for r in results),
+                "workers": workers,
+                "phases": phases,
+                "http": STATS.since(http_start),
+                "scratch": {
+                    "root": str(scratch.root),
+                    "peak_bytes": scratch.peak,
+                    "quota": scratch.quota,
+                },
             }
 
         return kwargs
 
+    def wrapper(*args, **kwargs):
+        # staged inputs and downloads are removed even if the function raises
+        with ScratchSpace() as scratch:
+            if "aero_pack" in kwargs:
+                return run_pack(scratch, **kwargs)
+            return run(scratch, *args, **kwargs)
+
     return wrapper
@@ -0,0 +1,78 @@
+"""Compare two benchmark result files and report regressions.
+
+Usage:
+    python benchmarks/compare.py baseline.json candidate.json --threshold 0.1
+
+Exits with a non-zero status if the median latency of any benchmark in the
+candidate is more than ``threshold`` (relative) slower than the baseline.
+"""
+
+import argparse
+import json
+import sys
+
+
+def _key(result: dict) -> tuple:
+    return result["operation"], result["size"], result["tasks"]
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> list[dict]:
+    """Compare the median latencies of matching benchmarks.
+
+    Returns:
+        list[dict]: One entry per benchmark present in both documents.
+    """
+    base = {_key(r): r for r in baseline["results"]}
+    rows = []
+    for result in candidate["results"]:
+        ref = base.get(_key(result))
+        if ref is None:
+            continue
+        before = ref["latency_s"]["median"]
+        after = result["latency_s"]["median"]
+        change = (after - before) / before if before > 0 else 0.0
+        rows.append(
+            {
+                "operation": result["operation"],
+                "size": result["size"],
+                "tasks": result["tasks"],
+                "baseline_s": before,
+                "candidate_s": after,
+                "change": change,
+                "regression": change > threshold,
+            }
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative slowdown of the median latency considered a regression",
+    )
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    rows = compare(baseline, candidate, args.threshold)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['operation']:>16} size={row['size']!s:>12} tasks={row['tasks']!s:>5}"
+            f"  {row['baseline_s'] * 1e3:10.2f} ms -> {row['candidate_s'] * 1e3:10.2f} ms"
+            f"  {row['change']:+8.1%} {flag}"
+        )
+
+    sys.exit(1 if any(row["regression"] for row in rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+"""Benchmark the AERO client against local stand-in servers.
+
+Measures latency and throughput of ``jobs.download``, ``utils.gcs_save``,
+``aero_format`` staging and upload, ``jobs.get_versions`` and
+``jobs.commit_analysis`` across file sizes and task counts. The results are
+written as JSON so that two runs can be compared with ``benchmarks/compare.py``.
+
+Usage:
+    python benchmarks/run.py --sizes 1KB 1MB 100MB 1GB --tasks 1 10 100 \
+        --repeat 5 --output results.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+from datetime import datetime
+from datetime import timezone
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from servers import MockAeroServer  # noqa: E402
+from servers import MockCollection  # noqa: E402
+
+_UNITS = {"B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3}
+
+DEFAULT_SIZES = ["1KB", "64KB", "1MB", "16MB", "128MB"]
+DEFAULT_TASKS = [1, 10, 100]
+SCHEMA_VERSION = 1
+
+
+def parse_size(size: str) -> int:
+    """Convert a human readable size (e.g. ``16MB``) to bytes."""
+    size = size.strip().upper()
+    for unit in sorted(_UNITS, key=len, reverse=True):
+        if size.endswith(unit):
+            return int(float(size[: -len(unit)]) * _UNITS[unit])
+    return int(size)
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """Summary statistics of latency samples in seconds."""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {
+        "min": ordered[0],
+        "median": statistics.median(ordered),
+        "mean": statistics.fmean(ordered),
+        "p95": p95,
+        "max": ordered[-1],
+        "stdev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+    }
+
+
+def measure(
+    fn: Callable[[], None],
+    repeat: int,
+    setup: Callable[[], None] | None = None,
+    warmup: int = 1,
+) -> list[float]:
+    """Time ``fn`` ``repeat`` times, running ``setup`` untimed before each call."""
+    samples = []
+    for i in range(warmup + repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        end = time.perf_counter()
+        if i >= warmup:
+            samples.append(end - start)
+    return samples
+
+
+def _git_revision() -> str | None:
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "HEAD"],
+                cwd=Path(__file__).parent,
+                stderr=subprocess.DEVNULL,
+            )
+            .decode()
+            .strip()
+        )
+    except Exception:
+        return None
+
+
+@contextlib.contextmanager
+def local_client(aero: MockAeroServer, workdir: Path):
+    """Point the client configuration and authentication at the local servers."""
+    from aero_client import utils
+
+    token_path = workdir / "client_tokens.json"
+    with open(token_path, "w") as f:
+        json.dump({utils.CONF.portal_client_id: {"refresh_token": "bench"}}, f)
+
+    saved = (utils.CONF.server_url, utils._TOKEN_PATH, utils.get_transfer_token)
+    utils.CONF.server_url = aero.url.rstrip("/")
+    utils._TOKEN_PATH = token_path
+    utils.get_transfer_token = lambda collection_uuid: "bench"
+    try:
+        yield utils
+    finally:
+        utils.CONF.server_url, utils._TOKEN_PATH, utils.get_transfer_token = saved
+
+
+def _write_file(path: Path, size: int) -> None:
+    with open(path, "wb") as f:
+        block = os.urandom(min(size, 1024 * 1024))
+        written = 0
+        while written < size:
+            data = block[: size - written]
+            f.write(data)
+            written += len(data)
+
+
+def bench_sizes(
+    aero: MockAeroServer,
+    collection: MockCollection,
+    workdir: Path,
+    sizes: list[int],
+    repeat: int,
+) -> list[dict]:
+    from aero_client import jobs
+    from aero_client import utils
+
+    results = []
+    collection_uuid = str(uuid.uuid4())
+
+    def user_function(inp, metrics=False):
+        return utils.AeroOutput(name="out", path=inp)
+
+    wrapped = utils.aero_format(user_function)
+
+    for size in sizes:
+        obj = collection.add_object(size)
+        data_id = aero.add_source("bench", collection.url + obj, obj)
+        flow_id = aero.add_flow(
+            [{"id": data_id, "name": "src", "url": collection.url + obj}]
+        )
+
+        def download():
+            _, kw = jobs.download(
+                aero={
+                    "flow_id": flow_id,
+                    "output_data": {"src": {"temp_dir": str(workdir)}},
+                }
+            )
+            Path(kw["aero"]["output_data"]["src"]["file"]).unlink()
+
+        upload_path = workdir / "upload"
+
+        def save():
+            utils.gcs_save(str(upload_path), collection.url, collection_uuid)
+
+        wrapper_metrics = []
+
+        def stage_and_upload():
+            kw = wrapped(
+                aero={
+                    "input_data": {
+                        "inp": {
+                            "collection_url": collection.url,
+                            "collection_uuid": collection_uuid,
+                            "file_bn": obj,
+                            "tmp_dir": str(workdir),
+                        }
+                    },
+                    "output_data": {
+                        "out": {
+                            "collection_url": collection.url,
+                            "collection_uuid": collection_uuid,
+                        }
+                    },
+                },
+                metrics=True,
+            )
+            wrapper_metrics.append(kw["wrapper_metrics"])
+
+        for operation, fn, setup in (
+            ("download", download, None),
+            ("gcs_save", save, lambda: _write_file(upload_path, size)),
+            ("aero_format", stage_and_upload, None),
+        ):
+            samples = measure(fn, repeat=repeat, setup=setup)
+            stats = summarize(samples)
+            result = {
+                "operation": operation,
+                "size": size,
+                "tasks": 1,
+                "repeat": repeat,
+                "latency_s": stats,
+                "throughput_bytes_s": size / stats["median"],
+            }
+            if operation == "aero_format":
+                result["wrapper_metrics"] = wrapper_metrics[-1]
+            results.append(result)
+            print(
+                f"{operation:>16} {size:>12} B  median {stats['median'] * 1e3:10.2f} ms"
+                f"  {result['throughput_bytes_s'] / 1024**2:10.2f} MiB/s",
+                file=sys.stderr,
+            )
+
+    return results
+
+
+def bench_tasks(
+    aero: MockAeroServer,
+    collection: MockCollection,
+    task_counts: list[int],
+    repeat: int,
+) -> list[dict]:
+    from aero_client import jobs
+
+    results = []
+    obj = collection.add_object(1024)
+    data_id = aero.add_source("bench", collection.url + obj, obj, n_versions=10)
+    flow_id = aero.add_flow([])
+
+    for tasks in task_counts:
+
+        def get_versions():
+            params = [
+                {
+                    "kwargs": {
+                        "aero": {
+                            "input_data": {"inp": {"id": data_id, "version": None}}
+                        }
+                    }
+                }
+                for _ in range(tasks)
+            ]
+            jobs.get_versions(*params)
+
+        def commit_analysis():
+            arglist = [
+                {
+                    "aero": {
+                        "flow_id": flow_id,
+                        "input_data": {"inp": {"id": data_id, "version": 10}},
+                        "output_data": {"out": {"file_bn": obj, "size": 1024}},
+                    }
+                }
+                for _ in range(tasks)
+            ]
+            jobs.commit_analysis(*arglist)
+
+        for operation, fn in (
+            ("get_versions", get_versions),
+            ("commit_analysis", commit_analysis),
+        ):
+            stats = summarize(measure(fn, repeat=repeat))
+            results.append(
+                {
+                    "operation": operation,
+                    "size": None,
+                    "tasks": tasks,
+                    "repeat": repeat,
+                    "latency_s": stats,
+                    "throughput_tasks_s": tasks / stats["median"],
+                }
+            )
+            print(
+                f"{operation:>16} {tasks:>10} tasks  median {stats['median'] * 1e3:10.2f} ms"
+                f"  {tasks / stats['median']:10.2f} tasks/s",
+                file=sys.stderr,
+            )
+
+    return results
+
+
+def run(
+    sizes: list[int],
+    task_counts: list[int],
+    repeat: int,
+    certfile: str | None = None,
+    keyfile: str | None = None,
+) -> dict:
+    """Run the full benchmark suite and return the results document."""
+    with tempfile.TemporaryDirectory(prefix="aero-bench-") as tmp:
+        workdir = Path(tmp)
+        with MockAeroServer() as aero, MockCollection(
+            certfile=certfile, keyfile=keyfile
+        ) as collection, local_client(aero, workdir):
+            results = bench_sizes(aero, collection, workdir, sizes, repeat)
+            results += bench_tasks(aero, collection, task_counts, repeat)
+
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "tls": certfile is not None,
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help=f"File sizes to benchmark. Defaults to {' '.join(DEFAULT_SIZES)}",
+    )
+    parser.add_argument(
+        "--tasks",
+        nargs="+",
+        type=int,
+        default=DEFAULT_TASKS,
+        help="Task counts for get_versions and commit_analysis",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions")
+    parser.add_argument(
+        "--certfile", default=None, help="Serve the collection over HTTPS"
+    )
+    parser.add_argument("--keyfile", default=None, help="Key for --certfile")
+    parser.add_argument(
+        "-o", "--output", default="bench_results.json", help="Output JSON file"
+    )
+    args = parser.parse_args()
+
+    document = run(
+        sizes=[parse_size(s) for s in args.sizes],
+        task_counts=args.tasks,
+        repeat=args.repeat,
+        certfile=args.certfile,
+        keyfile=args.keyfile,
+    )
+
+    with open(args.output, "w") as f:
+        json.dump(document, f, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
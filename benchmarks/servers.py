@@ -0,0 +1,291 @@
+"""Local stand-ins for the AERO REST server and a Globus guest collection.
+
+Both servers run in background threads on the loopback interface so the
+client functions can be benchmarked without Globus Auth, Globus Compute or
+network access. The collection stores uploaded objects on disk so that large
+(1 GB) payloads do not have to be held in memory by the server.
+"""
+
+import json
+import shutil
+import ssl
+import tempfile
+import threading
+import uuid
+
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs
+from urllib.parse import urlparse
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are separate writes, with Nagle's algorithm the body
+    # waits for the delayed ACK of the headers on keep-alive connections
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, body, status: int = 200) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length)
+
+
+class _Server:
+    """Base class running a ``ThreadingHTTPServer`` in a daemon thread."""
+
+    handler: type[BaseHTTPRequestHandler]
+
+    def __init__(self, certfile: str | None = None, keyfile: str | None = None):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self.handler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = self
+        self.scheme = "http"
+
+        if certfile is not None:
+            ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            ctx.load_cert_chain(certfile=certfile, keyfile=keyfile)
+            self.httpd.socket = ctx.wrap_socket(self.httpd.socket, server_side=True)
+            self.scheme = "https"
+
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"{self.scheme}://{host}:{port}/"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+class _CollectionHandler(_QuietHandler):
+    def do_GET(self):
+        state: MockCollection = self.server.state
+        path = state.root / Path(urlparse(self.path).path).name
+
+        if not path.is_file():
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", state.content_type)
+        self.send_header("Content-Length", str(path.stat().st_size))
+        self.end_headers()
+        with open(path, "rb") as f:
+            shutil.copyfileobj(f, self.wfile, _CHUNK_SIZE)
+
+    def do_PUT(self):
+        state: MockCollection = self.server.state
+        path = state.root / Path(urlparse(self.path).path).name
+        remaining = int(self.headers.get("Content-Length", 0))
+        chunked = self.headers.get("Transfer-Encoding", "") == "chunked"
+
+        with open(path, "wb") as f:
+            if chunked:
+                while True:
+                    size = int(self.rfile.readline().strip(), 16)
+                    if size == 0:
+                        self.rfile.readline()
+                        break
+                    f.write(self.rfile.read(size))
+                    self.rfile.readline()
+            else:
+                while remaining > 0:
+                    data = self.rfile.read(min(remaining, _CHUNK_SIZE))
+                    if not data:
+                        break
+                    f.write(data)
+                    remaining -= len(data)
+
+        self._send_json({"name": path.name})
+
+
+class MockCollection(_Server):
+    """HTTPS(-like) guest collection supporting ``GET`` and ``PUT`` of objects.
+
+    Args:
+        root (str | None, optional): Directory the objects are stored in.
+            A temporary directory is created if not provided.
+        content_type (str, optional): Content type returned on ``GET``.
+            Defaults to ``text/csv``.
+    """
+
+    handler = _CollectionHandler
+
+    def __init__(
+        self,
+        root: str | None = None,
+        content_type: str = "text/csv",
+        certfile: str | None = None,
+        keyfile: str | None = None,
+    ):
+        self._tmp = None
+        if root is None:
+            self._tmp = tempfile.TemporaryDirectory(prefix="aero-collection-")
+            root = self._tmp.name
+        self.root = Path(root)
+        self.content_type = content_type
+        super().__init__(certfile=certfile, keyfile=keyfile)
+
+    def add_object(self, size: int, name: str | None = None) -> str:
+        """Create an object of ``size`` bytes of CSV-like text.
+
+        Args:
+            size (int): Size of the object in bytes.
+            name (str | None, optional): Object name. Defaults to a random uuid.
+
+        Returns:
+            str: The object name.
+        """
+        name = name or str(uuid.uuid4())
+        row = b"1,2022-01-01,12345.678,abcdefghij\n"
+        with open(self.root / name, "wb") as f:
+            f.write(b"method,sample_collect_date,sars_cov_2,pad\n")
+            written = 42
+            block = row * (_CHUNK_SIZE // len(row))
+            while written < size:
+                data = block[: size - written]
+                f.write(data)
+                written += len(data)
+        return name
+
+    def stop(self) -> None:
+        super().stop()
+        if self._tmp is not None:
+            self._tmp.cleanup()
+
+
+class _AeroHandler(_QuietHandler):
+    def do_GET(self):
+        state: MockAeroServer = self.server.state
+        parsed = urlparse(self.path)
+        parts = [p for p in parsed.path.split("/") if p]
+
+        with state.lock:
+            state.requests += 1
+
+        if len(parts) == 2 and parts[0] == "flow":
+            flow = state.flows.get(parts[1])
+            if flow is None:
+                self.send_error(404)
+            else:
+                self._send_json(flow)
+        elif len(parts) == 3 and parts[0] == "data" and parts[2] == "latest":
+            versions = state.versions.get(parts[1])
+            if not versions:
+                self.send_error(404)
+            else:
+                self._send_json(versions[-1])
+        elif len(parts) == 3 and parts[0] == "data" and parts[2] == "versions":
+            self._send_json(state.versions.get(parts[1], []))
+        elif len(parts) == 2 and parts[0] == "data" and parts[1] == "search":
+            query = parse_qs(parsed.query).get("query", [""])[0]
+            self._send_json(
+                [d for d in state.data.values() if query.lower() in d["name"].lower()]
+            )
+        elif len(parts) == 1 and parts[0] in ("data", "prov", "flow"):
+            page = int(parse_qs(parsed.query).get("page", ["1"])[0])
+            records = {
+                "data": list(state.data.values()),
+                "prov": state.prov,
+                "flow": list(state.flows.values()),
+            }[parts[0]]
+            chunk = records[(page - 1) * 15 : page * 15]
+            if page > 1 and len(chunk) == 0:
+                self.send_error(404)
+            else:
+                self._send_json(chunk)
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        state: MockAeroServer = self.server.state
+        parts = [p for p in urlparse(self.path).path.split("/") if p]
+        body = self._read_body()
+
+        with state.lock:
+            state.requests += 1
+
+        if parts == ["prov", "new"]:
+            record = json.loads(body)
+            with state.lock:
+                record["id"] = len(state.prov) + 1
+                state.prov.append(record)
+            self._send_json({"id": record["id"]})
+        else:
+            self.send_error(404)
+
+
+class MockAeroServer(_Server):
+    """In-memory stand-in for the subset of the AERO REST API used by the client."""
+
+    handler = _AeroHandler
+
+    def __init__(self, certfile: str | None = None, keyfile: str | None = None):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.flows: dict[str, dict] = {}
+        self.data: dict[str, dict] = {}
+        self.versions: dict[str, list[dict]] = {}
+        self.prov: list[dict] = []
+        super().__init__(certfile=certfile, keyfile=keyfile)
+
+    def add_source(
+        self, name: str, url: str, file_name: str, n_versions: int = 1
+    ) -> str:
+        """Register a data source with ``n_versions`` versions pointing at ``file_name``.
+
+        Returns:
+            str: The data id.
+        """
+        data_id = str(uuid.uuid4())
+        self.data[data_id] = {"id": data_id, "name": name, "url": url}
+        self.versions[data_id] = [
+            {
+                "id": str(uuid.uuid4()),
+                "version": v + 1,
+                "data_file": {"file_name": file_name, "encoding": "utf-8"},
+            }
+            for v in range(n_versions)
+        ]
+        return data_id
+
+    def add_flow(self, contributed_to: list[dict]) -> str:
+        """Register an ingestion flow contributing to the provided sources.
+
+        Returns:
+            str: The flow id.
+        """
+        flow_id = str(uuid.uuid4())
+        self.flows[flow_id] = {
+            "id": flow_id,
+            "contributed_to": contributed_to,
+            "derived_from": [],
+            "function_args": {"kwargs": {}},
+        }
+        return flow_id
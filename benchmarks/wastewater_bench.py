@@ -0,0 +1,186 @@
+"""Benchmark the chunked wastewater transform on large synthetic inputs.
+
+Compares the single-frame implementation the chunked transform replaced
+with `scripts/wastewater_transform.iter_transform`. Each run is executed in
+its own process so that its peak RSS can be measured.
+
+Usage:
+    python benchmarks/wastewater_bench.py --size 4GB --chunksize 1000000 \
+        --output wastewater.json
+"""
+
+import argparse
+import importlib.util
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from datetime import datetime
+from datetime import timezone
+from pathlib import Path
+
+from run import _git_revision
+from run import parse_size
+from run import summarize
+
+_SCRIPT = Path(__file__).parents[1] / "scripts" / "wastewater_transform.py"
+_MODES = ("single_frame", "chunked")
+
+
+def generate(path: Path, size: int, batch_rows: int = 1_000_000, seed: int = 0):
+    """Write a synthetic wastewater CSV of at least ``size`` bytes."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2022-01-01")
+    header = True
+    written = 0
+    while written < size:
+        days = np.sort(rng.integers(0, 1000, batch_rows))
+        pd.DataFrame(
+            {
+                "sample_collect_date": (
+                    start + pd.to_timedelta(days, unit="D")
+                ).strftime("%Y-%m-%d"),
+                "method": rng.integers(0, 3, batch_rows),
+                "sars_cov_2": rng.uniform(1, 1e6, batch_rows).round(3),
+                "pcr_target": "sars-cov-2",
+            }
+        ).to_csv(path, mode="w" if header else "a", header=header, index=False)
+        header = False
+        written = path.stat().st_size
+
+
+def single_frame(path: str) -> int:
+    """The transform as implemented before it was chunked."""
+    import numpy as np
+    import pandas as pd
+
+    odata = pd.read_csv(path)
+    odata = odata.loc[
+        odata.method != 0, ["sars_cov_2", "sample_collect_date"]
+    ].reset_index(drop=True)
+    odata.columns = ["gene_copy", "date"]
+    odata["date"] = pd.to_datetime(odata["date"])
+    odata["num_date"] = (odata["date"] - pd.Timestamp("1970-01-01")).dt.days
+    odata["year"] = np.nan
+    odata.loc[odata["num_date"] < 19358, "year"] = 2022
+    odata.loc[(odata["num_date"] >= 19358) & (odata["num_date"] < 19724), "year"] = 2023
+    odata.loc[odata["num_date"] >= 19724, "year"] = 2024
+    odata["yearday"] = odata["num_date"]
+    for year, offset in ((2022, 52), (2023, 53), (2024, 54)):
+        odata.loc[odata["year"] == year, "yearday"] = (
+            odata.loc[odata["year"] == year, "num_date"] - (offset * 365) - 12
+        )
+    odata["year_day"] = odata["num_date"] - (52 * 365) - 12
+    odata["new_time"] = odata["year_day"] - (odata["year_day"].iloc[0] - 1)
+    odata["sum_genes"] = odata["gene_copy"]
+    odata["log_gene_copies"] = np.log10(odata["gene_copy"])
+    odata["epi_week2"] = (odata["yearday"] - 1) / 7 + 1
+    odata["epi_week"] = np.floor(odata["epi_week2"])
+    return len(odata)
+
+
+def chunked(path: str, chunksize: int) -> int:
+    spec = importlib.util.spec_from_file_location("wastewater_transform", _SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return sum(len(c) for c in module.iter_transform(path, chunksize=chunksize))
+
+
+def _run_one(mode: str, path: str, chunksize: int) -> None:
+    start = time.perf_counter()
+    rows = single_frame(path) if mode == "single_frame" else chunked(path, chunksize)
+    duration = time.perf_counter() - start
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    scale = 1 if sys.platform == "darwin" else 1024
+    print(json.dumps({"duration": duration, "rows": rows, "peak_rss": maxrss * scale}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="2GB", help="Synthetic input size")
+    parser.add_argument("--chunksize", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--modes", nargs="+", choices=_MODES, default=list(_MODES))
+    parser.add_argument("--input", default=None, help="Reuse an existing input CSV")
+    parser.add_argument("-o", "--output", default="wastewater_bench.json")
+    parser.add_argument(
+        "--run-one", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS
+    )
+    args = parser.parse_args()
+
+    if args.run_one is not None:
+        _run_one(args.run_one[0], args.run_one[1], args.chunksize)
+        return
+
+    with tempfile.TemporaryDirectory(prefix="aero-wastewater-") as tmp:
+        path = Path(args.input) if args.input else Path(tmp) / "wastewater.csv"
+        if args.input is None:
+            print(f"Generating {args.size} synthetic input...", file=sys.stderr)
+            generate(path, parse_size(args.size))
+        size = path.stat().st_size
+
+        results = []
+        for mode in args.modes:
+            runs = []
+            for _ in range(args.repeat):
+                out = subprocess.run(
+                    [
+                        sys.executable,
+                        __file__,
+                        "--chunksize",
+                        str(args.chunksize),
+                        "--run-one",
+                        mode,
+                        str(path),
+                    ],
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                )
+                runs.append(json.loads(out.stdout.splitlines()[-1]))
+            stats = summarize([r["duration"] for r in runs])
+            results.append(
+                {
+                    "operation": f"wastewater_transform_{mode}",
+                    "size": size,
+                    "tasks": 1,
+                    "repeat": args.repeat,
+                    "chunksize": args.chunksize if mode == "chunked" else None,
+                    "rows": runs[-1]["rows"],
+                    "latency_s": stats,
+                    "throughput_bytes_s": size / stats["median"],
+                    "peak_rss": max(r["peak_rss"] for r in runs),
+                }
+            )
+            print(
+                f"{mode:>14} {size / 1024**3:6.2f} GiB  median {stats['median']:8.2f} s"
+                f"  peak RSS {results[-1]['peak_rss'] / 1024**2:10.1f} MiB",
+                file=sys.stderr,
+            )
+
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "schema_version": 1,
+                "meta": {
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                    "git_revision": _git_revision(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                },
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,57 @@
 import os
-import globus_sdk
-from globus_sdk.scopes import AuthScopes
-from globus_compute_sdk import Client
-from globus_compute_sdk.sdk.login_manager import AuthorizerLoginManager
-from globus_compute_sdk.sdk.login_manager.manager import ComputeScopeBuilder
 
 
-def transform(*args, **kwargs):
+# numerical dates (days since 1970-01-01) at which 2023 and 2024 begin
+_YEAR_BOUNDS = (19358, 19724)
+_YEARS = (2022, 2023, 2024)
+# offset subtracted from the numerical date to obtain the day of the year
+_YEARDAY_OFFSETS = tuple((52 + i) * 365 + 12 for i in range(len(_YEARS)))
+_USECOLS = ["method", "sars_cov_2", "sample_collect_date"]
+
+
+def transform_chunk(chunk, state: dict):
+    """Transform a chunk of the raw wastewater data.
+
+    All derived columns are computed in a single vectorized pass. The
+    cross-chunk `state` carries the first `year_day` of the data (used for
+    `new_time`) and the number of rows emitted so far (used for the index).
+
+    Args:
+        chunk (pandas.DataFrame): Chunk of the raw wastewater CSV.
+        state (dict): Cross-chunk state, initially empty. Updated in place.
+
+    Returns:
+        pandas.DataFrame: The transformed chunk.
+    """
     import pandas as pd
     import numpy as np
 
-    # load input
-    odata = pd.read_csv(kwargs["file"])
-
     # keep relevant info, rename
-    odata = odata.loc[
-        odata.method != 0, ["sars_cov_2", "sample_collect_date"]
-    ].reset_index(drop=True)
+    odata = chunk.loc[chunk.method != 0, ["sars_cov_2", "sample_collect_date"]]
     odata.columns = ["gene_copy", "date"]
 
+    rows = state.get("rows", 0)
+    odata.index = pd.RangeIndex(rows, rows + len(odata))
+    state["rows"] = rows + len(odata)
+
     # convert date to numerical (equivalent to what R does)
-    reference_date = pd.Timestamp("1970-01-01")
     odata["date"] = pd.to_datetime(odata["date"])
-    odata["num_date"] = (odata["date"] - reference_date).dt.days
-
-    # assign year
-    odata["year"] = np.nan
-    odata.loc[odata["num_date"] < 19358, "year"] = 2022
-    odata.loc[(odata["num_date"] >= 19358) & (odata["num_date"] < 19724), "year"] = 2023
-    odata.loc[odata["num_date"] >= 19724, "year"] = 2024
-
-    # calculate yearday and time
-    odata["yearday"] = odata["num_date"]
-    odata.loc[odata["year"] == 2022, "yearday"] = (
-        odata.loc[odata["year"] == 2022, "num_date"] - (52 * 365) - 12
-    )
-    odata.loc[odata["year"] == 2023, "yearday"] = (
-        odata.loc[odata["year"] == 2023, "num_date"] - (53 * 365) - 12
-    )
-    odata.loc[odata["year"] == 2024, "yearday"] = (
-        odata.loc[odata["year"] == 2024, "num_date"] - (54 * 365) - 12
-    )
-
-    odata["year_day"] = odata["num_date"] - (52 * 365) - 12
-    odata['new_time'] = odata['year_day'] - (odata['year_day'].iloc[0]-1)
+    num_date = (odata["date"] - pd.Timestamp("1970-01-01")).dt.days
+    odata["num_date"] = num_date
+
+    # assign year, yearday and time
+    conditions = [
+        num_date < _YEAR_BOUNDS[0],
+        (num_date >= _YEAR_BOUNDS[0]) & (num_date < _YEAR_BOUNDS[1]),
+        num_date >= _YEAR_BOUNDS[1],
+    ]
+    odata["year"] = np.select(conditions, _YEARS, default=np.nan)
+    odata["yearday"] = num_date - np.select(conditions, _YEARDAY_OFFSETS, default=0)
+
+    odata["year_day"] = num_date - _YEARDAY_OFFSETS[0]
+    if "first_year_day" not in state and len(odata) > 0:
+        state["first_year_day"] = odata["year_day"].iloc[0]
+    odata["new_time"] = odata["year_day"] - (state.get("first_year_day", 0) - 1)
 
     # calculate values
     odata["sum_genes"] = odata["gene_copy"]
@@ -52,19 +60,67 @@ def transform(*args, **kwargs):
     odata["epi_week2"] = (odata["yearday"] - 1) / 7 + 1
     odata["epi_week"] = np.floor(odata["epi_week2"])
 
-    return args, kwargs
+    return odata
 
-    # # validate with R output
-    # oldata = pd.read_csv('Obriendata.csv')
 
-    # # compare, round for numerical comparison
-    # df1 = odata.round(5)
-    # df2 = oldata.round(5)
+def iter_transform(path: str, chunksize: int = 1_000_000):
+    """Transform the wastewater CSV in bounded-memory chunks.
 
-    # assert(df1.compare(df2).shape[0] == 0)
+    Args:
+        path (str): Path to the raw wastewater CSV.
+        chunksize (int, optional): Number of rows read at a time.
+            Defaults to 1,000,000.
+
+    Yields:
+        pandas.DataFrame: The transformed chunks, in order.
+    """
+    import pandas as pd
+
+    state = {}
+    with pd.read_csv(path, usecols=_USECOLS, chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield transform_chunk(chunk, state)
+
+
+def stream_transform(path: str, output: str, chunksize: int = 1_000_000) -> int:
+    """Transform the wastewater CSV at `path` into the CSV at `output`.
+
+    Returns:
+        int: Number of rows written.
+    """
+    rows = 0
+    header = True
+    for odata in iter_transform(path, chunksize=chunksize):
+        odata.to_csv(output, mode="w" if header else "a", header=header, index=False)
+        header = False
+        rows += len(odata)
+    return rows
+
+
+def transform(*args, **kwargs):
+    """Transform the wastewater data at `kwargs["file"]`.
+
+    The data is processed in chunks of `kwargs["chunksize"]` rows, and
+    written to `kwargs["output"]` if provided.
+    """
+    chunksize = kwargs.get("chunksize", 1_000_000)
+
+    if "output" in kwargs:
+        stream_transform(kwargs["file"], kwargs["output"], chunksize=chunksize)
+    else:
+        for _ in iter_transform(kwargs["file"], chunksize=chunksize):
+            pass
+
+    return args, kwargs
 
 
 if __name__ == "__main__":
+    import globus_sdk
+    from globus_sdk.scopes import AuthScopes
+    from globus_compute_sdk import Client
+    from globus_compute_sdk.sdk.login_manager import AuthorizerLoginManager
+    from globus_compute_sdk.sdk.login_manager.manager import ComputeScopeBuilder
+
     c = globus_sdk.ConfidentialAppAuthClient(
         os.environ["GLOBUS_COMPUTE_CLIENT_ID"],
         os.environ["GLOBUS_COMPUTE_CLIENT_SECRET"],
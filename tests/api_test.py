@@ -0,0 +1,179 @@
+from conftest import FakeResponse
+
+
+class FakeVersionServer:
+    def __init__(self, n_versions, page_size=3):
+        self.versions = [
+            {"version": v, "created_at": f"2024-01-{v:02d}T00:00:00"}
+            for v in range(1, n_versions + 1)
+        ]
+        self.page_size = page_size
+        self.requests = []
+
+    def request(self, method, url, headers, params, verify, **kwargs):
+        self.requests.append(params)
+        matching = [v for v in self.versions if v["version"] >= params["min_version"]]
+        start = (params["page"] - 1) * self.page_size
+        page = matching[start : start + self.page_size]
+        if len(page) == 0 and params["page"] > 1:
+            return FakeResponse(status_code=404)
+        return FakeResponse(page)
+
+
+def test_list_versions_pages_and_cache(api, monkeypatch):
+    server = FakeVersionServer(7)
+    monkeypatch.setattr(api, "session", server)
+
+    versions = api.list_versions("d1")
+    assert next(versions)["version"] == 1
+    assert len(server.requests) == 1  # lazily fetched page by page
+    assert [v["version"] for v in versions] == list(range(2, 8))
+
+    server.versions.append({"version": 8, "created_at": "2024-01-08T00:00:00"})
+    server.requests.clear()
+    assert [v["version"] for v in api.list_versions("d1")] == list(range(1, 9))
+    assert server.requests[0]["min_version"] == 8
+
+    server.requests.clear()
+    assert [v["version"] for v in api.list_versions("d1", max_version=5)] == [
+        1,
+        2,
+        3,
+        4,
+        5,
+    ]
+    assert server.requests == []
+
+
+def test_list_versions_ranges(api, monkeypatch):
+    monkeypatch.setattr(api, "session", FakeVersionServer(7))
+
+    assert [
+        v["version"] for v in api.list_versions("d2", min_version=3, max_version=4)
+    ] == [3, 4]
+    assert [
+        v["version"]
+        for v in api.list_versions(
+            "d2", since="2024-01-05T00:00:00", until="2024-01-06T00:00:00"
+        )
+    ] == [5, 6]
+    # range queries are not cached, so the full listing is still complete
+    assert [v["version"] for v in api.list_versions("d2")] == list(range(1, 8))
+
+
+def test_list_versions_stream(api, monkeypatch):
+    server = FakeVersionServer(7)
+    monkeypatch.setattr(api, "session", server)
+
+    versions = api.list_versions("d3", min_version=2, stream=True)
+    assert [v["version"] for v in versions] == list(range(2, 8))
+    assert [v["version"] for v in api.list_versions("d3", stream=True)] == list(
+        range(1, 8)
+    )
+    server.requests.clear()
+    assert [v["version"] for v in api.list_versions("d3")] == list(range(1, 8))
+    assert server.requests[0]["min_version"] == 8
+
+    versions = list(api.list_versions("d3", typed=True))
+    assert [v.version for v in versions] == list(range(1, 8))
+    assert versions[0].created_at == "2024-01-01T00:00:00"
+
+
+class FakeSearchServer:
+    def __init__(self, results, page_size=2):
+        self.results = results
+        self.page_size = page_size
+        self.requests = []
+
+    def request(self, method, url, headers, params, verify, **kwargs):
+        self.requests.append(params)
+        if headers.get("If-None-Match") == '"v1"':
+            return FakeResponse(status_code=304)
+        if "page" not in params:
+            return FakeResponse(self.results, headers={"ETag": '"v1"'})
+        start = (params["page"] - 1) * self.page_size
+        return FakeResponse(self.results[start : start + self.page_size])
+
+
+def test_search_sources_cache(api, monkeypatch):
+    server = FakeSearchServer([{"id": "a"}, {"id": "b"}])
+    monkeypatch.setattr(api, "session", server)
+
+    assert api.search_sources("covid  cases") == server.results
+    assert api.search_sources(" covid cases ") == server.results
+    assert len(server.requests) == 1
+
+    # stale entries are revalidated
+    monkeypatch.setattr(api.SEARCH_CACHE, "ttl", 0)
+    assert api.search_sources("covid cases") == server.results
+    assert len(server.requests) == 2
+
+    api.search_sources("q2")
+    api.search_sources("q3")
+    assert len(api.SEARCH_CACHE) == 2  # least recently used query evicted
+
+
+def test_iter_search_sources(api, monkeypatch):
+    server = FakeSearchServer([{"id": i} for i in range(5)])
+    monkeypatch.setattr(api, "session", server)
+
+    results = api.iter_search_sources("q")
+    assert next(results) == {"id": 0}
+    assert len(server.requests) == 1
+    assert [r["id"] for r in results] == [1, 2, 3, 4]
+    assert [p["page"] for p in server.requests] == [1, 2, 3, 4]
+
+
+def test_iter_search_sources_stream(api, monkeypatch):
+    server = FakeSearchServer([{"id": i} for i in range(5)])
+    monkeypatch.setattr(api, "session", server)
+
+    results = api.iter_search_sources("q", stream=True)
+    assert [r["id"] for r in results] == [0, 1, 2, 3, 4]
+    assert [p["page"] for p in server.requests] == [1, 2, 3, 4]
+
+
+def test_search_sources_errors(api, monkeypatch):
+    import pytest
+
+    from aero_client import transport
+    from aero_client.error import RemoteError
+
+    class ErrorServer:
+        def request(self, method, url, headers, params, verify, **kwargs):
+            return FakeResponse({"detail": "search backend down"}, status_code=500)
+
+    monkeypatch.setattr(api, "session", ErrorServer())
+    monkeypatch.setattr(transport.time, "sleep", lambda s: None)
+    monkeypatch.setattr(transport, "_breakers", {})
+
+    with pytest.raises(RemoteError) as e:
+        api.search_sources("q")
+    assert e.value.code == 500
+    assert len(api.SEARCH_CACHE) == 0
+
+    for stream in (False, True):
+        with pytest.raises(RemoteError):
+            list(api.iter_search_sources("q", stream=stream))
+
+
+def test_list_metadata_typed(api, monkeypatch):
+    from conftest import fake_http
+
+    pages = {1: [{"id": "p1", "flow_id": "f1"}], 2: [{"id": "p2", "flow_id": "f1"}]}
+
+    def get(url, params=None, **kwargs):
+        page = (params or {}).get("page", 1)
+        if page not in pages:
+            return FakeResponse(status_code=404)
+        return FakeResponse(pages[page])
+
+    fake_http(monkeypatch, get=get)
+    monkeypatch.setattr(api, "session", api.SESSION)
+
+    assert [[p.id for p in page] for page in api.list_metadata("prov", typed=True)] == [
+        ["p1"],
+        ["p2"],
+    ]
+    records = api.list_metadata("prov", stream=True, typed=True)
+    assert [p.id for p in records] == ["p1", "p2"]
@@ -0,0 +1,83 @@
+import tarfile
+
+from pathlib import Path
+
+from aero_client import utils
+from aero_client.bundles import extract_bundle
+from aero_client.bundles import write_bundle
+from aero_client.storage import LocalStorage
+
+
+def _tree(root):
+    return {
+        p.relative_to(root).as_posix(): p.read_bytes()
+        for p in sorted(root.rglob("*"))
+        if p.is_file()
+    }
+
+
+def test_bundle_index(tmp_path):
+    src = tmp_path / "src"
+    (src / "sub").mkdir(parents=True)
+    (src / "a.txt").write_bytes(b"hello")
+    (src / "sub" / "b.csv").write_bytes(b"x" * 1000)
+
+    index = write_bundle(src, tmp_path / "b.tar")
+    content = (tmp_path / "b.tar").read_bytes()
+    for name, member in index["members"].items():
+        data = content[member["offset"] : member["offset"] + member["size"]]
+        assert data == (src / name).read_bytes()
+
+    assert _tree(extract_bundle(tmp_path / "b.tar", tmp_path / "out")) == _tree(src)
+
+    # members escaping the destination are not extracted
+    with tarfile.open(tmp_path / "evil.tar", "w") as tar:
+        tar.add(src / "a.txt", arcname="../escaped.txt")
+    extract_bundle(tmp_path / "evil.tar", tmp_path / "out2")
+    assert not (tmp_path / "escaped.txt").exists()
+
+
+def test_directory_output_and_staging(tmp_path):
+    storage = LocalStorage(tmp_path / "store")
+    collection = {"collection_url": "local", "collection_uuid": "c"}
+
+    def produce():
+        out = tmp_path / "results"
+        out.mkdir()
+        for i in range(50):
+            (out / f"part-{i}.csv").write_text(f"{i}\n")
+        return utils.AeroOutput(name="parts", path=str(out))
+
+    result = utils.aero_format(produce, storage=storage)(
+        aero={"output_data": {"parts": dict(collection)}}
+    )
+    stored = result["aero"]["output_data"]["parts"]
+    assert len(stored["bundle"]["members"]) == 50
+    assert len(list((tmp_path / "store" / "c").iterdir())) == 1  # a single upload
+    assert not (tmp_path / "results").exists()
+
+    received = {}
+
+    def consume(parts):
+        received["tree"] = {p.name: p.read_text() for p in Path(parts).iterdir()}
+        return []
+
+    inp = dict(collection) | {
+        "file_bn": stored["file_bn"],
+        "bundle": stored["bundle"],
+        "checksum": stored["checksum"],
+        "verify": True,
+    }
+    utils.aero_format(consume, storage=storage)(
+        aero={"input_data": {"parts": inp}, "output_data": {}}
+    )
+    assert len(received["tree"]) == 50
+    assert received["tree"]["part-7.csv"] == "7\n"
+
+    utils.aero_format(consume, storage=storage)(
+        aero={
+            "input_data": {"parts": inp | {"members": ["part-3.csv", "part-42.csv"]}},
+            "output_data": {},
+        }
+    )
+    assert received["tree"] == {"part-3.csv": "3\n", "part-42.csv": "42\n"}
@@ -0,0 +1,53 @@
+from conftest import FakeResponse
+from conftest import fake_http
+
+from aero_client.cache import ConditionalCache
+from aero_client.cache import get_json
+
+
+def test_get_json_revalidates(monkeypatch, tmp_path):
+    flow = {"id": "f1", "contributed_to": [{"name": "out"}]}
+    requests = []
+
+    def get(url, headers, verify):
+        requests.append(headers)
+        if headers.get("If-None-Match") == '"f1-v1"':
+            return FakeResponse(status_code=304)
+        return FakeResponse(flow, headers={"ETag": '"f1-v1"'})
+
+    fake_http(monkeypatch, get=get)
+    cache = ConditionalCache(tmp_path)
+    headers = {"Authorization": "Bearer a"}
+
+    first = get_json("https://aero/flow/f1", headers, cache=cache, verify=False)
+    assert first == flow
+    assert get_json("https://aero/flow/f1", headers, cache=cache, verify=False) is first
+    assert requests[1]["If-None-Match"] == '"f1-v1"'
+
+    # persisted for other processes, but not shared between credentials
+    restored = ConditionalCache(tmp_path)
+    assert (
+        get_json("https://aero/flow/f1", headers, cache=restored, verify=False) == flow
+    )
+    assert requests[2]["If-None-Match"] == '"f1-v1"'
+    get_json(
+        "https://aero/flow/f1",
+        {"Authorization": "Bearer b"},
+        cache=restored,
+        verify=False,
+    )
+    assert "If-None-Match" not in requests[3]
+
+
+def test_get_flow_cached(api, monkeypatch):
+    flow = {"function_args": {"kwargs": {"aero": {}}}}
+    responses = [
+        FakeResponse(flow, headers={"ETag": '"v1"'}),
+        FakeResponse(status_code=304),
+        FakeResponse(status_code=304),
+    ]
+    fake_http(monkeypatch, get=lambda url, **kw: responses.pop(0))
+
+    assert api.get_flow("f1") == {"aero": {}}
+    api.get_flow("f1")["aero"]["mutated"] = True
+    assert api.get_flow("f1", inputs_only=False) == flow
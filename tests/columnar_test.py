@@ -0,0 +1,104 @@
+import io
+
+import pandas as pd
+import pytest
+from conftest import fake_http
+
+pytest.importorskip("pyarrow")
+
+from aero_client import utils  # noqa: E402
+from aero_client.columnar import read_columnar  # noqa: E402
+from aero_client.columnar import to_parquet  # noqa: E402
+
+
+class _FakeResponse:
+    status_code = 200
+
+    def __init__(self, content=b""):
+        self.content = content
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i : i + chunk_size]
+
+    def close(self):
+        pass
+
+
+def test_to_parquet(tmp_path):
+    src = tmp_path / "data.csv"
+    src.write_text("a,b,c\n1,x,0.5\n2,y,1.5\n")
+
+    sidecar = to_parquet(str(src))
+
+    assert sidecar["rows"] == 2
+    assert sidecar["schema"] == [
+        {"name": "a", "type": "int64"},
+        {"name": "b", "type": "string"},
+        {"name": "c", "type": "double"},
+    ]
+    df = read_columnar(sidecar["file"], columns=["a", "c"])
+    assert list(df.columns) == ["a", "c"]
+    assert df["c"].tolist() == [0.5, 1.5]
+
+
+def test_sidecar_upload_and_staging(monkeypatch, tmp_path):
+    store = {}
+
+    def put(url, headers, data):
+        store[url.rsplit("/", 1)[-1]] = b"".join(data)
+        return _FakeResponse()
+
+    def get(url, headers, **kwargs):
+        return _FakeResponse(store[url.rsplit("/", 1)[-1]])
+
+    monkeypatch.setattr(utils, "get_transfer_token", lambda collection_uuid: "tok")
+    fake_http(monkeypatch, get=get, put=put)
+
+    src = tmp_path / "download"
+    src.write_text("a,b\n1,x\n2,y\n")
+
+    def ingest(out):
+        return utils.AeroOutput(name="out", path=out)
+
+    collection = {"collection_url": "https://c/", "collection_uuid": "uuid"}
+    output_kwargs = utils.aero_format(ingest)(
+        aero={
+            "output_data": {
+                "out": {
+                    **collection,
+                    "file": str(src),
+                    "file_format": ".csv",
+                    "columnar": True,
+                }
+            }
+        }
+    )
+
+    md = output_kwargs["aero"]["output_data"]["out"]
+    assert md["sidecar"]["file_format"] == ".parquet"
+    assert md["sidecar"]["rows"] == 2
+    assert md["sidecar"]["file_bn"] in store
+
+    staged = {}
+
+    def analysis(inp):
+        staged["df"] = pd.read_parquet(inp)
+        return []
+
+    utils.aero_format(analysis)(
+        aero={
+            "input_data": {
+                "inp": {
+                    **collection,
+                    "file_bn": md["file_bn"],
+                    "sidecar": md["sidecar"],
+                    "columnar": True,
+                    "tmp_dir": str(tmp_path),
+                }
+            },
+            "output_data": {},
+        }
+    )
+
+    assert staged["df"].equals(pd.read_csv(io.StringIO("a,b\n1,x\n2,y\n")))
@@ -0,0 +1,49 @@
+import importlib
+import json
+
+import pytest
+
+
+@pytest.fixture
+def api(monkeypatch, tmp_path):
+    """The `aero_client.api` module, imported without authenticating."""
+    from aero_client import cache
+    from aero_client import utils
+
+    monkeypatch.setattr(utils, "_client_auth", lambda: "token")
+    api = importlib.import_module("aero_client.api")
+    monkeypatch.setattr(api, "VERSION_CACHE", api.VersionCache(tmp_path / "versions"))
+    monkeypatch.setattr(api, "SEARCH_CACHE", api.SearchCache(maxsize=2, ttl=60))
+    monkeypatch.setattr(
+        cache, "_DEFAULT_CACHE", cache.ConditionalCache(tmp_path / "http")
+    )
+    return api
+
+
+class FakeResponse:
+    def __init__(self, body=None, status_code=200, headers=None):
+        self.body = body
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = b""
+
+    def json(self):
+        return self.body
+
+    def iter_content(self, chunk_size=1):
+        data = json.dumps(self.body).encode()
+        for i in range(0, len(data), chunk_size):
+            yield data[i : i + chunk_size]
+
+    def close(self):
+        pass
+
+
+def fake_http(monkeypatch, **handlers):
+    """Route the requests of `aero_client.transport` to `handlers` keyed by lowercase method."""
+    from aero_client import transport
+
+    def request(method, url, **kwargs):
+        return handlers[method.lower()](url, **kwargs)
+
+    monkeypatch.setattr(transport.SESSION, "request", request)
@@ -0,0 +1,189 @@
+from conftest import fake_http
+
+from aero_client import utils
+from aero_client.storage import HTTPSStorage
+from aero_client.delta import detect_append
+from aero_client.delta import incremental_offset
+
+V1 = b"date,value\n2024-01-01,1\n2024-01-02,2\n"
+V2 = V1 + b"2024-01-03,3\n"
+
+
+class _FakeResponse:
+    def __init__(self, content=b"", status_code=200):
+        self.content = content
+        self.status_code = status_code
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i : i + chunk_size]
+
+    def close(self):
+        pass
+
+
+def test_detect_append():
+    first = detect_append(V1, None, None)
+    assert first["rows"] == 2
+    assert first["base_version"] is None
+
+    second = detect_append(V2, first | {"append_base": 1}, 1)
+    assert second["base_version"] == 1
+    assert second["offset"] == len(V1)
+    assert second["row_offset"] == 2
+    assert second["rows"] == 3
+    assert second["append_base"] == 1
+
+    rewritten = detect_append(b"date,value\n2024-01-01,9\n", second, 2)
+    assert rewritten["base_version"] is None
+    assert rewritten["append_base"] == 3
+
+
+def test_incremental_offset():
+    delta = detect_append(V2, detect_append(V1, None, None) | {"append_base": 1}, 1)
+    consumed = {"version": 1, "size": len(V1), "rows": 2}
+
+    assert incremental_offset(delta, consumed, 2) == {
+        "since_version": 1,
+        "offset": len(V1),
+        "row_offset": 2,
+        "empty": False,
+    }
+    unchanged = {"version": 2, "size": len(V2), "rows": 3}
+    assert incremental_offset(delta, unchanged, 2)["empty"] is True
+    assert incremental_offset(delta, None, 2) is None
+    assert incremental_offset(delta | {"append_base": 2}, consumed, 2) is None
+
+
+def test_incremental_staging(monkeypatch, tmp_path):
+    store = {"v2": V2, "state1": b"total\n3\n"}
+    uploads = {}
+
+    def get(url, headers, **kwargs):
+        content = store[url.rsplit("/", 1)[-1]]
+        if "Range" in headers:
+            start = int(headers["Range"][len("bytes=") : -1])
+            return _FakeResponse(content[start:], 206)
+        return _FakeResponse(content)
+
+    def put(url, headers, data):
+        uploads[url.rsplit("/", 1)[-1]] = b"".join(data)
+        return _FakeResponse()
+
+    monkeypatch.setattr(utils, "get_transfer_token", lambda collection_uuid: "tok")
+    fake_http(monkeypatch, get=get, put=put)
+
+    received = {}
+
+    def analysis(inp, inp_delta, state_previous):
+        received["rows"] = open(inp, "rb").read()
+        received["delta"] = inp_delta
+        received["previous"] = open(state_previous, "rb").read()
+        out = tmp_path / "state"
+        out.write_bytes(b"total\n6\n")
+        return utils.AeroOutput(name="state", path=str(out))
+
+    delta = detect_append(V2, detect_append(V1, None, None) | {"append_base": 1}, 1)
+    collection = {"collection_url": "https://c/", "collection_uuid": "uuid"}
+    output_kwargs = utils.aero_format(analysis)(
+        aero={
+            "input_data": {
+                "inp": {
+                    **collection,
+                    "version": 2,
+                    "file_bn": "v2",
+                    "delta": True,
+                    "row_delta": delta,
+                    "tmp_dir": str(tmp_path),
+                }
+            },
+            "output_data": {
+                "state": {
+                    **collection,
+                    "state": True,
+                    "tmp_dir": str(tmp_path),
+                    "previous": {
+                        "version": 1,
+                        "file_bn": "state1",
+                        "consumed": {"inp": {"version": 1, "size": len(V1), "rows": 2}},
+                    },
+                }
+            },
+        }
+    )
+
+    assert received["rows"] == b"date,value\n2024-01-03,3\n"
+    assert received["delta"]["incremental"] is True
+    assert received["delta"]["row_offset"] == 2
+    assert received["previous"] == b"total\n3\n"
+    assert output_kwargs["aero"]["output_data"]["state"]["consumed"] == {
+        "inp": {"version": 2, "size": len(V2), "rows": 3}
+    }
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_incremental_rerun_unchanged(monkeypatch, tmp_path):
+    fetched = []
+
+    def get(url, headers, **kwargs):
+        fetched.append(url)
+        return _FakeResponse(b"total\n6\n")
+
+    def put(url, headers, data):
+        b"".join(data)
+        return _FakeResponse()
+
+    monkeypatch.setattr(utils, "get_transfer_token", lambda collection_uuid: "tok")
+    fake_http(monkeypatch, get=get, put=put)
+
+    received = {}
+
+    def analysis(inp, inp_delta, state_previous):
+        received["rows"] = open(inp, "rb").read()
+        received["delta"] = inp_delta
+        return utils.AeroOutput(name="state", data=b"total\n6\n")
+
+    delta = detect_append(V2, detect_append(V1, None, None) | {"append_base": 1}, 1)
+    collection = {"collection_url": "https://c/", "collection_uuid": "uuid"}
+    utils.aero_format(analysis)(
+        aero={
+            "input_data": {
+                "inp": {
+                    **collection,
+                    "version": 2,
+                    "file_bn": "v2",
+                    "delta": True,
+                    "row_delta": delta,
+                }
+            },
+            "output_data": {
+                "state": {
+                    **collection,
+                    "state": True,
+                    "previous": {
+                        "version": 2,
+                        "file_bn": "state2",
+                        "consumed": {"inp": {"version": 2, "size": len(V2), "rows": 3}},
+                    },
+                }
+            },
+        }
+    )
+
+    # only the header is staged, the source is not fetched
+    assert received["rows"] == b"date,value\n"
+    assert received["delta"]["incremental"] is True
+    assert received["delta"]["empty"] is True
+    assert fetched == ["https://c/state2"]
+
+
+def test_fetch_empty_range(monkeypatch, tmp_path):
+    monkeypatch.setattr(utils, "get_transfer_token", lambda collection_uuid: "tok")
+    fake_http(
+        monkeypatch,
+        get=lambda url, headers, **kwargs: _FakeResponse(b"range not satisfiable", 416),
+    )
+
+    with open(tmp_path / "tail", "wb") as f:
+        assert HTTPSStorage().fetch("https://c/", "uuid", "v2", f, offset=len(V2)) == 0
+    assert (tmp_path / "tail").read_bytes() == b""
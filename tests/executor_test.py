@@ -0,0 +1,57 @@
+from aero_client.executor import LocalExecutor
+from aero_client.storage import LocalStorage
+
+
+def record_commit(kwargs):
+    return {"committed": sorted(kwargs["aero"]["output_data"])}
+
+
+def test_local_executor(tmp_path):
+    storage = LocalStorage(tmp_path / "store")
+    (tmp_path / "store" / "in-collection").mkdir(parents=True)
+    (tmp_path / "store" / "in-collection" / "obj").write_text("1,2,3")
+
+    def count(inp, factor, metrics=False):
+        from aero_client.utils import AeroOutput
+
+        values = open(inp).read().split(",")
+        return AeroOutput(name="out", data=str(len(values) * factor).encode())
+
+    tasks = [
+        {
+            "aero": {
+                "flow_id": "f1",
+                "input_data": {
+                    "inp": {
+                        "collection_url": "local",
+                        "collection_uuid": "in-collection",
+                        "file_bn": "obj",
+                        "tmp_dir": str(tmp_path),
+                    }
+                },
+                "output_data": {
+                    "out": {
+                        "collection_url": "local",
+                        "collection_uuid": "out-collection",
+                    }
+                },
+            },
+            "factor": factor,
+            "metrics": True,
+        }
+        for factor in range(4)
+    ]
+
+    with LocalExecutor(
+        max_workers=2, storage=storage, pull=None, commit=record_commit
+    ) as ex:
+        results = ex.map(count, tasks)
+
+    for factor, result in enumerate(results):
+        out = result["kwargs"]["aero"]["output_data"]["out"]
+        stored = tmp_path / "store" / "out-collection" / out["file_bn"]
+        assert stored.read_text() == str(3 * factor)
+        assert out["size"] == len(str(3 * factor))
+        assert result["commit"] == {"committed": ["out"]}
+        assert set(result["metrics"]) == {"function", "commit"}
+        assert "wrapper_metrics" in result["kwargs"]
@@ -0,0 +1,126 @@
+import hashlib
+import io
+import threading
+
+import pytest
+
+from conftest import fake_http
+
+from aero_client import hashing
+from aero_client import utils
+from aero_client.error import ChecksumError
+from aero_client.hashing import BackgroundHasher
+from aero_client.hashing import HashingWriter
+from aero_client.hashing import checksum
+from aero_client.storage import HTTPSStorage
+from aero_client.storage import LocalStorage
+
+
+def test_background_hasher():
+    content = b"x" * (1024 * 1024 + 7)
+    for algorithm in ("md5", "blake2b"):
+        h = BackgroundHasher(algorithm)
+        for i in range(0, len(content), 100_000):
+            h.update(content[i : i + 100_000])
+        assert h.hexdigest() == hashlib.new(algorithm, content).hexdigest()
+        assert checksum(content, algorithm) == h.hexdigest()
+
+    with pytest.raises(ValueError):
+        BackgroundHasher("crc32")
+
+    out = io.BytesIO()
+    writer = HashingWriter(out, "sha256")
+    writer.write(b"abc")
+    assert out.getvalue() == b"abc"
+    assert writer.hash.hexdigest() == hashlib.sha256(b"abc").hexdigest()
+
+
+def test_verified_staging(tmp_path):
+    storage = LocalStorage(tmp_path / "store")
+    md = storage.save("local", "c", data=b"1,2,3")
+    assert md["checksum_algorithm"] == utils.CONF.hash_algorithm
+
+    def count(inp):
+        return utils.AeroOutput(name="out", data=open(inp, "rb").read())
+
+    wrapped = utils.aero_format(count, storage=storage)
+
+    def task(recorded):
+        return {
+            "aero": {
+                "input_data": {
+                    "inp": {
+                        "collection_url": "local",
+                        "collection_uuid": "c",
+                        "file_bn": md["file_bn"],
+                        "tmp_dir": str(tmp_path),
+                        "verify": True,
+                    }
+                    | recorded
+                },
+                "output_data": {
+                    "out": {"collection_url": "local", "collection_uuid": "c"}
+                },
+            }
+        }
+
+    wrapped(**task({"checksum": md["checksum"]}))
+
+    with pytest.raises(ChecksumError):
+        wrapped(**task({"checksum": "0" * 32}))
+
+    blake = {"checksum": checksum(b"1,2,3", "blake2b"), "checksum_algorithm": "blake2b"}
+    wrapped(**task(blake))
+
+
+class _FakeResponse:
+    status_code = 200
+
+    def __init__(self, content=b""):
+        self.content = content
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i : i + chunk_size]
+
+    def close(self):
+        pass
+
+
+def test_background_hashing_during_io(monkeypatch, tmp_path):
+    hashed_in = set()
+    work = BackgroundHasher._work
+
+    def spy(self):
+        hashed_in.add(threading.current_thread())
+        work(self)
+
+    monkeypatch.setattr(BackgroundHasher, "_work", spy)
+    monkeypatch.setattr(utils, "get_transfer_token", lambda collection_uuid: "tok")
+
+    content = bytes(range(256)) * 16 * 1024
+    uploaded = []
+
+    def put(url, headers, data):
+        # http.client reads request bodies in 16 KiB blocks
+        while chunk := data.read(16 * 1024):
+            uploaded.append(chunk)
+        return _FakeResponse()
+
+    fake_http(
+        monkeypatch,
+        put=put,
+        get=lambda url, headers, **kwargs: _FakeResponse(content),
+    )
+
+    md = utils.gcs_save(None, "https://c/", "uuid", data=content)
+    assert md["checksum"] == checksum(content, md["checksum_algorithm"])
+    assert max(map(len, uploaded)) < hashing._BATCH_SIZE
+    assert hashed_in and threading.main_thread() not in hashed_in
+
+    hashed_in.clear()
+    with open(tmp_path / "staged", "wb") as f:
+        writer = HashingWriter(f, "sha256")
+        HTTPSStorage().fetch("https://c/", "uuid", "obj", writer)
+    assert writer.hash.hexdigest() == hashlib.sha256(content).hexdigest()
+    assert hashed_in and threading.main_thread() not in hashed_in
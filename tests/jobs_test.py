@@ -0,0 +1,94 @@
+import threading
+import time
+
+from conftest import FakeResponse
+from conftest import fake_http
+
+from aero_client import jobs
+from aero_client import transfers
+from aero_client import utils
+
+
+class _SourceResponse(FakeResponse):
+    def __init__(self, content):
+        super().__init__(headers={"content-type": "text/csv"})
+        self.content = content
+        self.encoding = "utf-8"
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i : i + chunk_size]
+
+
+def _sources(monkeypatch, names):
+    """Serve the flow and its sources, returning the peak concurrent downloads."""
+    flow = {
+        "contributed_to": [
+            {"id": f"id-{n}", "name": n, "url": f"https://src/{n}"} for n in names
+        ]
+    }
+    active, peak = 0, [0]
+    lock = threading.Lock()
+
+    def get(url, headers=None, verify=True, **kwargs):
+        nonlocal active
+        if url.startswith("https://src/"):
+            with lock:
+                active += 1
+                peak[0] = max(peak[0], active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+            return _SourceResponse(url.rsplit("/", 1)[-1].encode())
+        return FakeResponse(flow)
+
+    fake_http(monkeypatch, get=get)
+    monkeypatch.setattr(
+        utils,
+        "load_tokens",
+        lambda: {utils.CONF.portal_client_id: {"refresh_token": "t"}},
+    )
+    return peak
+
+
+def test_download_all_sources(monkeypatch, tmp_path):
+    names = [f"plant{i}" for i in range(6)]
+    peak = _sources(monkeypatch, names)
+
+    _, kwargs = jobs.download(
+        aero={
+            "flow_id": "f1",
+            "download_concurrency": 3,
+            "output_data": {n: {"temp_dir": str(tmp_path)} for n in names},
+        },
+        metrics=True,
+    )
+
+    for n in names:
+        md = kwargs["aero"]["output_data"][n]
+        assert md["id"] == f"id-{n}"
+        assert open(md["file"]).read() == n
+        assert kwargs["download_metrics"]["sources"][n]["size"] == len(n)
+    assert 1 < peak[0] <= 3
+
+
+def test_download_transfer_limits(monkeypatch, tmp_path):
+    names = [f"plant{i}" for i in range(6)]
+    peak = _sources(monkeypatch, names)
+
+    scheduler = transfers.TransferScheduler(host_limit=2)
+    throttled = []
+    monkeypatch.setattr(scheduler, "throttle", throttled.append)
+    monkeypatch.setattr(transfers, "scheduler", lambda: scheduler)
+
+    jobs.download(
+        aero={
+            "flow_id": "f1",
+            "download_concurrency": 6,
+            "output_data": {n: {"temp_dir": str(tmp_path)} for n in names},
+        }
+    )
+
+    # the host limit applies to the concurrent downloads of the same source host
+    assert peak[0] == 2
+    assert sorted(throttled) == sorted(len(n) for n in names)
@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+from aero_client.jsonstream import iter_array
+
+
+def _chunks(text, size):
+    data = text.encode()
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 1024])
+def test_iter_array(size):
+    records = [{"id": "é", "n": 12345}, [1, 2.5], "s", 678, None, {}]
+    text = json.dumps(records, indent=2, ensure_ascii=False)
+    assert list(iter_array(_chunks(text, size))) == records
+    assert list(iter_array(_chunks(" [ ] ", size))) == []
+
+
+def test_iter_array_is_incremental():
+    def chunks():
+        yield b'[{"id": 1}, '
+        yield b'{"id": 2}'
+        raise AssertionError("read past the first record")
+
+    assert next(iter_array(chunks())) == {"id": 1}
+
+
+@pytest.mark.parametrize("text", ['{"a": 1}', "[1, 2", "[1 2]", "[1,]", ""])
+def test_iter_array_invalid(text):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_array(_chunks(text, 3)))
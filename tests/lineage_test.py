@@ -0,0 +1,72 @@
+from aero_client.lineage import LineageIndex
+
+RECORDS = [
+    {
+        "id": 1,
+        "flow_id": "clean",
+        "input_data": {"raw": {"id": "raw", "version": 1}},
+        "output_data": {"clean": {"id": "clean", "version": 1}},
+    },
+    {
+        "id": 2,
+        "flow_id": "report",
+        "input_data": {
+            "clean": {"id": "clean", "version": 1},
+            "pop": {"id": "pop", "version": 3},
+        },
+        "output_data": {"report": {"id": "report", "version": 1}},
+    },
+]
+
+
+def test_lineage_queries():
+    index = LineageIndex()
+    assert index.update(RECORDS) == 2
+    assert index.update(RECORDS) == 0
+
+    assert index.downstream("raw@1") == {
+        "flow:clean": 1,
+        "clean@1": 2,
+        "flow:report": 3,
+        "report@1": 4,
+    }
+    assert index.downstream("raw", depth=2) == {"flow:clean": 1, "clean@1": 2}
+    assert set(index.upstream("report@1")) == {
+        "flow:report",
+        "clean@1",
+        "pop@3",
+        "flow:clean",
+        "raw@1",
+    }
+    assert index.upstream("report") == index.upstream("report@1")
+    assert index.downstream("unknown") == {}
+
+
+def test_lineage_refresh_and_persist(api, monkeypatch, tmp_path):
+    pages = [RECORDS[:1], RECORDS[1:]]
+    requested = []
+
+    def list_metadata(metadata_type, page=1):
+        requested.append(page)
+        yield from pages[page - 1 :]
+
+    monkeypatch.setattr(api, "list_metadata", list_metadata)
+
+    path = tmp_path / "lineage.json"
+    index = LineageIndex(path)
+    assert index.refresh() == 2
+
+    restored = LineageIndex(path)
+    assert restored.downstream("raw@1") == index.downstream("raw@1")
+
+    pages[1] = pages[1] + [
+        {
+            "id": 3,
+            "flow_id": "report",
+            "input_data": {"clean": {"id": "clean", "version": 1}},
+            "output_data": {"report": {"id": "report", "version": 2}},
+        }
+    ]
+    assert restored.refresh() == 1
+    assert requested == [1, 2]
+    assert "report@2" in restored.downstream("clean@1")
@@ -0,0 +1,44 @@
+from aero_client.metrics import PhaseUsage
+from aero_client.utils import aero_format
+
+
+def test_phase_usage():
+    with PhaseUsage() as usage:
+        data = bytearray(8 * 1024 * 1024)
+        sum(range(10**5))
+
+    metrics = usage.as_dict()
+    assert metrics["duration"] > 0
+    assert metrics["cpu_user"] + metrics["cpu_system"] > 0
+    assert metrics["peak_rss"] >= len(data)
+    assert metrics["peak_rss_scope"] in ("phase", "process")
+
+
+def test_phase_usage_disabled():
+    with PhaseUsage(enabled=False) as usage:
+        pass
+
+    assert usage.as_dict() == {}
+
+
+def test_wrapper_phase_metrics():
+    def user_function(arg1, metrics):
+        return []
+
+    output_kwargs = aero_format(user_function)(
+        aero={"output_data": {}}, arg1=1, metrics=True
+    )
+
+    phases = output_kwargs["wrapper_metrics"]["phases"]
+    assert set(phases) == {"stage", "function", "upload"}
+    for phase in phases.values():
+        assert {"duration", "cpu_user", "cpu_system", "peak_rss", "io"} <= set(phase)
+
+
+def test_wrapper_without_metrics():
+    def user_function(metrics):
+        return []
+
+    output_kwargs = aero_format(user_function)(aero={"output_data": {}}, metrics=False)
+
+    assert "wrapper_metrics" not in output_kwargs
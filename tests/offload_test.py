@@ -0,0 +1,104 @@
+import hashlib
+
+import pytest
+
+from aero_client import utils
+from aero_client.error import ChecksumError
+from aero_client.error import RemoteError
+from aero_client.offload import LocalTransferClient
+from aero_client.offload import TransferOffload
+from aero_client.storage import LocalStorage
+
+
+@pytest.fixture
+def storage(tmp_path):
+    store = tmp_path / "store"
+    client = LocalTransferClient(
+        {"c": store / "c", "node": tmp_path / "shared"},
+    )
+    offload = TransferOffload(
+        "node", tmp_path / "shared", threshold=1000, client=client
+    )
+    return LocalStorage(store, offload=offload)
+
+
+def _task(storage, inputs):
+    return {
+        "aero": {
+            "input_data": {
+                name: {"collection_url": "https://c/", "collection_uuid": "c"}
+                | storage.save("https://c/", "c", data=content)
+                for name, content in inputs.items()
+            },
+            "output_data": {
+                "large_out": {"collection_url": "https://c/", "collection_uuid": "c"},
+                "small_out": {"collection_url": "https://c/", "collection_uuid": "c"},
+            },
+        }
+    }
+
+
+def test_offloaded_transfers(tmp_path, storage):
+    large = b"0123456789" * 200
+
+    def copy(large_in, small_in):
+        with open(tmp_path / "large", "wb") as f:
+            f.write(open(large_in, "rb").read()[::-1])
+        with open(tmp_path / "small", "wb") as f:
+            f.write(open(small_in, "rb").read()[::-1])
+        return [
+            utils.AeroOutput(name="large_out", path=str(tmp_path / "large")),
+            utils.AeroOutput(name="small_out", path=str(tmp_path / "small")),
+        ]
+
+    aero = utils.aero_format(copy, storage=storage)(
+        **_task(storage, {"large_in": large, "small_in": b"abc"})
+    )["aero"]
+
+    # only objects above the threshold move by transfer tasks
+    assert aero["input_data"]["large_in"]["transfer"]["status"] == "SUCCEEDED"
+    assert "transfer" not in aero["input_data"]["small_in"]
+    assert "transfer" not in aero["output_data"]["small_out"]
+
+    out = aero["output_data"]["large_out"]
+    assert out["transfer"]["bytes_transferred"] == len(large)
+    assert out["size"] == len(large)
+    stored = (tmp_path / "store" / "c" / out["file_bn"]).read_bytes()
+    assert stored == large[::-1]
+    assert out["checksum"] == hashlib.new(out["checksum_algorithm"], stored).hexdigest()
+
+    # staged and uploaded files are removed from the shared directory
+    assert list((tmp_path / "shared").iterdir()) == []
+
+
+def test_offloaded_checksum_mismatch(tmp_path, storage):
+    for recorded, error in (
+        ({"checksum": "0" * 32, "checksum_algorithm": "md5"}, RemoteError),
+        # verified locally, Globus Transfer does not support blake2b
+        (
+            {"checksum": "0" * 128, "checksum_algorithm": "blake2b", "verify": True},
+            ChecksumError,
+        ),
+    ):
+        task = _task(storage, {"large_in": b"x" * 1000})
+        task["aero"]["input_data"]["large_in"] |= recorded
+
+        with pytest.raises(error):
+            utils.aero_format(lambda large_in: [], storage=storage)(**task)
+        assert list((tmp_path / "shared").iterdir()) == []
+
+
+def test_failed_upload(tmp_path, storage):
+    class FailingClient(LocalTransferClient):
+        def get_task(self, task_id):
+            return super().get_task(task_id) | {"status": "FAILED"}
+
+    storage.offload._client = FailingClient(storage.offload.client.collections)
+    out = tmp_path / "large"
+    out.write_bytes(b"x" * 1000)
+
+    with pytest.raises(RemoteError):
+        storage.offload.upload(out, "https://c/", "c")
+    # the output is back in place
+    assert out.read_bytes() == b"x" * 1000
+    assert list((tmp_path / "shared").iterdir()) == []
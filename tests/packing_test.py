@@ -0,0 +1,59 @@
+from aero_client import utils
+from aero_client.storage import LocalStorage
+
+
+def scale(inp, factor):
+    from aero_client.utils import AeroOutput
+
+    if factor < 0:
+        raise ValueError("negative factor")
+    values = open(inp).read().split(",")
+    return AeroOutput(name="out", data=str(len(values) * factor).encode())
+
+
+def test_pack_tasks(api):
+    tasks = [{"factor": i} for i in range(5)] + [{"factor": 5, "metrics": True}]
+    packs = api._pack_tasks(tasks, pack_size=4, pack_workers=2)
+    assert [len(p["aero_pack"]) for p in packs] == [4, 2]
+    assert "metrics" not in packs[0]
+    assert packs[1]["metrics"] is True
+
+
+def test_packed_invocation(tmp_path):
+    storage = LocalStorage(tmp_path / "store")
+    md = storage.save("local", "in", data=b"1,2,3")
+
+    result = utils.aero_format(scale, storage=storage)(
+        aero={
+            "flow_id": "f1",
+            "input_data": {
+                "inp": {
+                    "collection_url": "local",
+                    "collection_uuid": "in",
+                    "file_bn": md["file_bn"],
+                }
+            },
+            "output_data": {
+                "out": {"collection_url": "local", "collection_uuid": "out"}
+            },
+        },
+        aero_pack=[{"factor": 1}, {"factor": -1}, {"factor": 2}],
+        pack_workers=2,
+        metrics=True,
+    )
+
+    ok, failed, ok2 = result["aero_pack"]
+    assert "ValueError" in failed["error"]
+    for task, factor in ((ok, 1), (ok2, 2)):
+        out = task["aero"]["output_data"]["out"]
+        stored = tmp_path / "store" / "out" / out["file_bn"]
+        assert stored.read_text() == str(3 * factor)
+        assert task["factor"] == factor
+        assert "duration" in task["wrapper_metrics"]
+    assert (
+        ok["aero"]["output_data"]["out"]["file_bn"]
+        != ok2["aero"]["output_data"]["out"]["file_bn"]
+    )
+    assert result["wrapper_metrics"]["tasks"] == 3
+    assert result["wrapper_metrics"]["failed"] == 1
+    assert "file_bn" not in result["aero"]["output_data"]["out"]
@@ -0,0 +1,55 @@
+import pstats
+
+import pytest
+
+from aero_client.profiling import FunctionProfile
+from aero_client.storage import LocalStorage
+from aero_client.utils import aero_format
+
+
+def _hotspot(n):
+    return sum(i * i for i in range(n))
+
+
+def test_function_profile(tmp_path):
+    with FunctionProfile("cprofile") as profile:
+        _hotspot(200_000)
+
+    summary = profile.summary()
+    assert summary["profiler"] == "cprofile"
+    assert any("_hotspot" in f["function"] for f in summary["top"])
+    assert pstats.Stats(str(profile.save(tmp_path / "prof"))).total_calls > 0
+
+    with FunctionProfile(None) as disabled:
+        _hotspot(10)
+    assert disabled.summary() == {}
+
+    with pytest.raises(ValueError):
+        FunctionProfile("perf")
+
+
+def test_wrapper_profile(tmp_path):
+    storage = LocalStorage(tmp_path / "store")
+
+    def user_function(n):
+        _hotspot(n)
+        return []
+
+    output_kwargs = aero_format(user_function, storage=storage)(
+        aero={
+            "output_data": {
+                "prof": {
+                    "collection_url": "local",
+                    "collection_uuid": "c",
+                    "profile": True,
+                }
+            }
+        },
+        n=100_000,
+        profile="cprofile",
+    )
+
+    summary = output_kwargs["wrapper_metrics"]["profile"]
+    assert any("_hotspot" in f["function"] for f in summary["top"])
+    stored = output_kwargs["aero"]["output_data"]["prof"]
+    assert pstats.Stats(str(tmp_path / "store" / "c" / stored["file_bn"]))
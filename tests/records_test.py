@@ -0,0 +1,64 @@
+import pickle
+
+import pytest
+
+from aero_client.records import Prov
+from aero_client.records import Version
+from aero_client.records import to_columns
+from aero_client.records import to_dataframe
+
+PROV = {
+    "id": "p1",
+    "flow_id": "f1",
+    "created_at": "2024-01-01T00:00:00",
+    "input_data": {"cases": {"id": "d1", "version": 3}},
+    "output_data": {"trend": {"id": "d2", "version": 1}},
+    "tag": "nightly",
+}
+
+
+def test_record_fields():
+    prov = Prov.from_json(PROV)
+    assert not hasattr(prov, "__dict__")
+    assert prov.flow_id == "f1"
+    assert prov.input_data == PROV["input_data"]  # decoded on access
+    assert prov.tag == "nightly"
+    assert prov.function_args is None
+    assert prov.get("output_data.trend.version") == 1
+    with pytest.raises(AttributeError):
+        prov.missing
+
+    assert prov.to_json() == PROV
+    assert pickle.loads(pickle.dumps(prov)) == prov
+
+
+def test_lazy_fields_decoded_once(monkeypatch):
+    from aero_client import records
+
+    decoded = []
+    loads = records.json.loads
+    monkeypatch.setattr(records.json, "loads", lambda s: decoded.append(s) or loads(s))
+
+    prov = Prov.from_json(PROV)
+    assert decoded == []
+    for _ in range(3):
+        assert prov.input_data == PROV["input_data"]
+        assert prov.get("output_data.trend.id") == "d2"
+    assert len(decoded) == 1
+    assert prov._lazy is None
+
+
+def test_to_columns():
+    versions = [
+        Version.from_json({"version": v, "data_file": {"size": 10 * v}})
+        for v in range(1, 4)
+    ]
+    assert to_columns(versions, ["version", "data_file.size"]) == {
+        "version": [1, 2, 3],
+        "data_file.size": [10, 20, 30],
+    }
+    assert to_columns(versions)["version"] == [1, 2, 3]
+    assert to_columns([], ["version"]) == {"version": []}
+
+    df = to_dataframe(versions, ["version", "data_file.size"])
+    assert df["data_file.size"].sum() == 60
@@ -0,0 +1,119 @@
+import json
+import threading
+import time
+import uuid
+
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import pytest
+import requests
+
+from aero_client import utils
+from aero_client.error import ReplayError
+from aero_client.replay import load_cassette
+from aero_client.replay import record
+from aero_client.replay import replay
+from aero_client.transport import request
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_PUT(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_record_and_replay(server, tmp_path):
+    cassette = tmp_path / "flow.cassette"
+    session = requests.Session()
+    headers = {"Authorization": "Bearer secret"}
+
+    with record(cassette, session=session):
+        first = request("GET", f"{server}/data/1", headers=headers, session=session)
+        request("PUT", f"{server}/{uuid.uuid4()}", data=b"x" * 100, session=session)
+
+    exchanges = load_cassette(cassette)
+    assert [e["status"] for e in exchanges] == [200, 201]
+    assert exchanges[0]["request_headers"]["Authorization"] == "<redacted>"
+    assert exchanges[1]["request_size"] == 100
+    assert "secret" not in cassette.read_text()
+
+    session = requests.Session()  # the server is no longer needed
+    with replay(cassette, session=session, latency=True):
+        resp = request("GET", f"{server}/data/1", session=session)
+        assert resp.json() == first.json()
+        # uploads to randomly named objects still match
+        resp = request("PUT", f"{server}/{uuid.uuid4()}", data=b"y", session=session)
+        assert resp.status_code == 201
+        with pytest.raises(ReplayError):
+            request("GET", f"{server}/data/2", session=session)
+
+    assert session.get_adapter(server).__class__.__name__ == "HTTPAdapter"
+
+
+def test_replay_large_bodies_by_size(server, tmp_path):
+    cassette = tmp_path / "flow.cassette"
+    session = requests.Session()
+    with record(cassette, session=session, max_body=4):
+        request("GET", f"{server}/data/1", session=session)
+
+    [exchange] = load_cassette(cassette)
+    assert exchange["body"] is None
+
+    exchange["duration"] = 0.2
+    cassette.write_text(json.dumps(exchange) + "\n")
+    with replay(cassette, session=session, latency=0.5):
+        start = time.perf_counter()
+        resp = request("GET", f"{server}/data/1", session=session)
+        assert time.perf_counter() - start >= 0.1
+    assert resp.content == bytes(exchange["size"])
+
+
+def test_replay_staging(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "get_transfer_token", lambda collection_uuid: "tok")
+    cassette = tmp_path / "flow.cassette"
+    collection = {"collection_url": f"{server}/", "collection_uuid": "c"}
+
+    def upper(inp):
+        return utils.AeroOutput(name="out", data=open(inp, "rb").read().upper())
+
+    def run():
+        return utils.aero_format(upper)(
+            aero={
+                "input_data": {"inp": collection | {"file_bn": "obj"}},
+                "output_data": {"out": dict(collection)},
+            }
+        )["aero"]["output_data"]["out"]
+
+    with record(cassette):
+        recorded = run()
+    assert [e["method"] for e in load_cassette(cassette)] == ["GET", "PUT"]
+
+    # inputs are staged with streamed reads of the replayed responses
+    with replay(cassette):
+        replayed = run()
+    assert replayed["checksum"] == recorded["checksum"]
+    assert replayed["size"] == len(b'{"PATH": "/OBJ"}')
@@ -0,0 +1,59 @@
+import json
+import socket
+
+import pytest
+
+from aero_client import utils
+from aero_client.error import ScratchQuotaError
+from aero_client.scratch import ScratchSpace
+from aero_client.scratch import collect_orphans
+from aero_client.storage import LocalStorage
+
+
+def test_scratch_quota_and_cleanup(tmp_path):
+    with ScratchSpace(tmp_path, quota=10) as scratch:
+        path = scratch.path()
+        path.write_bytes(b"x" * 8)
+        assert scratch.check() == 8
+        with pytest.raises(ScratchQuotaError):
+            scratch.path(size=4)
+        session = scratch.dir
+    assert not session.exists()
+
+
+def test_collect_orphans(tmp_path):
+    dead = tmp_path / "aero-1-dead"
+    dead.mkdir()
+    (dead / "staged").write_bytes(b"x" * 5)
+    (dead / ".owner").write_text(
+        json.dumps({"host": socket.gethostname(), "pid": 2**22 + 1})
+    )
+
+    with ScratchSpace(tmp_path) as scratch:
+        assert not dead.exists()
+        assert collect_orphans(tmp_path) == 0  # live sessions are kept
+        assert scratch.dir.exists()
+
+
+def test_wrapper_cleans_scratch_on_failure(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils.CONF, "scratch_dir", tmp_path / "scratch")
+    storage = LocalStorage(tmp_path / "store")
+    md = storage.save("local", "c", data=b"1,2,3")
+
+    def failing(inp):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        utils.aero_format(failing, storage=storage)(
+            aero={
+                "input_data": {
+                    "inp": {
+                        "collection_url": "local",
+                        "collection_uuid": "c",
+                        "file_bn": md["file_bn"],
+                    }
+                },
+                "output_data": {},
+            }
+        )
+    assert list((tmp_path / "scratch").iterdir()) == []
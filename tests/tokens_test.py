@@ -0,0 +1,51 @@
+import json
+import multiprocessing
+import time
+
+from aero_client.tokens import TokenStore
+
+
+def _worker(path, refreshes, results):
+    def refresh(refresh_token):
+        with open(refreshes, "a") as f:
+            f.write(f"{refresh_token}\n")
+        time.sleep(0.1)
+        return {"access_token": "fresh", "expires_at_seconds": time.time() + 3600}
+
+    results.put(TokenStore(path).access_token("collection", refresh))
+
+
+def test_concurrent_refresh_happens_once(tmp_path):
+    path = tmp_path / "client_tokens.json"
+    path.write_text(
+        json.dumps(
+            {
+                "collection": {
+                    "access_token": "stale",
+                    "refresh_token": "r1",
+                    "expires_at_seconds": 0,
+                },
+                "portal": {"refresh_token": "p1"},
+            }
+        )
+    )
+    refreshes = tmp_path / "refreshes"
+    refreshes.touch()
+
+    ctx = multiprocessing.get_context("fork")
+    results = ctx.Queue()
+    workers = [
+        ctx.Process(target=_worker, args=(path, refreshes, results)) for _ in range(16)
+    ]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    assert [results.get() for _ in workers] == ["fresh"] * 16
+    assert refreshes.read_text() == "r1\n"
+
+    tokens = TokenStore(path).load()
+    assert tokens["collection"]["refresh_token"] == "r1"
+    assert tokens["portal"] == {"refresh_token": "p1"}
+    assert (path.stat().st_mode & 0o777) == 0o600
@@ -0,0 +1,113 @@
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from conftest import fake_http
+
+from aero_client import storage
+from aero_client import utils
+
+from aero_client.transfers import TokenBucket
+from aero_client.transfers import TransferScheduler
+
+
+def test_concurrency_limits():
+    scheduler = TransferScheduler(collection_limit=2, host_limit=3)
+    lock = threading.Lock()
+    active = {"c1": 0, "c2": 0, "host": 0}
+    peak = {"c1": 0, "c2": 0, "host": 0}
+
+    def transfer(collection):
+        with scheduler.slot(collection, "host", size=1):
+            with lock:
+                for key in (collection, "host"):
+                    active[key] += 1
+                    peak[key] = max(peak[key], active[key])
+            time.sleep(0.02)
+            with lock:
+                active[collection] -= 1
+                active["host"] -= 1
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(transfer, ["c1", "c2"] * 8))
+
+    assert peak["c1"] == 2 and peak["c2"] <= 2
+    assert peak["host"] == 3
+
+
+def test_small_transfers_first():
+    scheduler = TransferScheduler(collection_limit=1)
+    order = []
+    started = threading.Event()
+
+    def transfer(size):
+        with scheduler.slot("c", "host", size=size):
+            order.append(size)
+            started.set()
+            time.sleep(0.02)
+
+    with ThreadPoolExecutor(4) as pool:
+        pool.submit(transfer, 0)  # holds the only slot
+        started.wait()
+        for size in (300, 100, 200):
+            pool.submit(transfer, size)
+            time.sleep(0.005)
+
+    assert order == [0, 100, 200, 300]
+
+    # transfers that waited too long are not starved by smaller ones
+    scheduler = TransferScheduler(collection_limit=1, starvation=0)
+    order.clear()
+    started.clear()
+    with ThreadPoolExecutor(4) as pool:
+        pool.submit(transfer, 0)
+        started.wait()
+        for size in (300, 100):
+            pool.submit(transfer, size)
+            time.sleep(0.005)
+    assert order == [0, 300, 100]
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=1000, burst=100)
+    start = time.monotonic()
+    for _ in range(3):
+        bucket.consume(100)
+    assert time.monotonic() - start >= 0.15
+
+
+def test_fetch_throttled_per_chunk(monkeypatch, tmp_path):
+    transfers = TransferScheduler()
+    transfers.bucket = TokenBucket(8 * 1024 * 1024, burst=1024 * 1024)
+    events = []
+    throttle = transfers.throttle
+
+    def record(n):
+        events.append(("throttle", n))
+        throttle(n)
+
+    class Response:
+        status_code = 200
+
+        def iter_content(self, chunk_size=1):
+            for _ in range(4):
+                events.append(("received", chunk_size))
+                yield bytes(chunk_size)
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(transfers, "throttle", record)
+    monkeypatch.setattr(storage, "scheduler", lambda: transfers)
+    monkeypatch.setattr(utils, "get_transfer_token", lambda collection_uuid: "tok")
+    fake_http(monkeypatch, get=lambda url, **kwargs: Response())
+
+    start = time.monotonic()
+    with open(tmp_path / "obj", "wb") as f:
+        storage.HTTPSStorage().fetch("https://c/", "uuid", "obj", f)
+
+    # each chunk is paid for as it arrives, before the next one is read
+    chunk = storage._CHUNK_SIZE
+    assert events == [("received", chunk), ("throttle", chunk)] * 4
+    assert time.monotonic() - start >= 0.3
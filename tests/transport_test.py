@@ -0,0 +1,118 @@
+import pytest
+import requests
+from conftest import FakeResponse
+
+from aero_client import transport
+from aero_client.error import CircuitOpenError
+from aero_client.error import RemoteError
+from aero_client.error import TransientError
+
+POLICY = transport.RetryPolicy(
+    max_retries=2, backoff=0, failure_threshold=3, reset_timeout=60
+)
+
+
+class FlakySession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        resp = self.responses.pop(0)
+        if isinstance(resp, BaseException):
+            raise resp
+        return resp
+
+
+@pytest.fixture(autouse=True)
+def _reset_breakers(monkeypatch):
+    monkeypatch.setattr(transport, "_breakers", {})
+    monkeypatch.setattr(transport.time, "sleep", lambda s: None)
+
+
+def test_retries_transient_failures():
+    session = FlakySession(
+        [
+            requests.ConnectionError("reset"),
+            FakeResponse(status_code=503),
+            FakeResponse({"ok": 1}),
+        ]
+    )
+    resp = transport.request("GET", "https://a/x", policy=POLICY, session=session)
+    assert resp.json() == {"ok": 1}
+    assert session.calls == 3
+    assert transport.breaker("a").state == "closed"
+
+
+def test_no_retry_for_non_idempotent_requests():
+    session = FlakySession([FakeResponse(status_code=503), FakeResponse()])
+    with pytest.raises(TransientError) as e:
+        transport.request("POST", "https://b/x", policy=POLICY, session=session)
+    assert e.value.code == 503
+    assert session.calls == 1
+
+
+def test_client_errors_are_not_retried():
+    session = FlakySession([FakeResponse(status_code=404)])
+    with pytest.raises(RemoteError) as e:
+        transport.request("GET", "https://c/x", policy=POLICY, session=session)
+    assert not isinstance(e.value, TransientError)
+    assert e.value.code == 404
+
+    session = FlakySession([FakeResponse(status_code=404)])
+    resp = transport.request(
+        "GET", "https://c/x", policy=POLICY, session=session, raise_for_status=False
+    )
+    assert resp.status_code == 404
+
+
+def test_circuit_breaker_opens_and_recovers(monkeypatch):
+    session = FlakySession([FakeResponse(status_code=500)] * 3)
+    with pytest.raises(TransientError):
+        transport.request("GET", "https://d/x", policy=POLICY, session=session)
+    assert transport.breaker("d").state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        transport.request("GET", "https://d/x", policy=POLICY, session=session)
+    assert session.calls == 3
+
+    circuit = transport.breaker("d")
+    monkeypatch.setattr(circuit, "opened_at", circuit.opened_at - 60)
+    session.responses.append(FakeResponse())
+    transport.request("GET", "https://d/x", policy=POLICY, session=session)
+    assert circuit.state == "closed"
+
+
+def test_interrupted_trial_request(monkeypatch):
+    session = FlakySession([FakeResponse(status_code=500)] * 3)
+    with pytest.raises(TransientError):
+        transport.request("GET", "https://e/x", policy=POLICY, session=session)
+
+    circuit = transport.breaker("e")
+    monkeypatch.setattr(circuit, "opened_at", circuit.opened_at - 60)
+    session.responses.append(requests.exceptions.ChunkedEncodingError("broken"))
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        transport.request("GET", "https://e/x", policy=POLICY, session=session)
+    assert circuit.state == "open"
+
+    # the failed trial does not block the next one
+    monkeypatch.setattr(circuit, "opened_at", circuit.opened_at - 60)
+    session.responses.append(KeyboardInterrupt())
+    with pytest.raises(KeyboardInterrupt):
+        transport.request("GET", "https://e/x", policy=POLICY, session=session)
+    session.responses.append(FakeResponse())
+    transport.request("GET", "https://e/x", policy=POLICY, session=session)
+    assert circuit.state == "closed"
+
+
+def test_transient_responses_are_closed():
+    closed = []
+
+    class Response(FakeResponse):
+        def close(self):
+            closed.append(self.status_code)
+
+    session = FlakySession([Response(status_code=503), Response()])
+    transport.request("GET", "https://f/x", policy=POLICY, session=session)
+    assert closed == [503]
@@ -0,0 +1,61 @@
+from conftest import FakeResponse
+
+from aero_client.triggers import TriggerScheduler
+from aero_client.triggers import WatchedFlow
+from aero_client.utils import PolicyEnum
+
+
+class FakeSession:
+    def __init__(self, versions):
+        self.versions = versions
+        self.headers = {}
+        self.not_modified = 0
+
+    def request(self, method, url, headers, verify):
+        data_id = url.split("/")[-2]
+        etag = f'"{data_id}-{self.versions[data_id]}"'
+        if headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            return FakeResponse(status_code=304)
+        return FakeResponse({"version": self.versions[data_id]}, headers={"ETag": etag})
+
+
+def test_trigger_policies(tmp_path):
+    versions = {"a": 1, "b": 1}
+    flows = [
+        WatchedFlow("any", PolicyEnum.ANY, ["a", "b"]),
+        WatchedFlow("all", PolicyEnum.ALL, ["a", "b"]),
+    ]
+    triggered = []
+    scheduler = TriggerScheduler(
+        flows,
+        trigger=lambda flow, v: triggered.append((flow.flow_id, v)),
+        state_path=tmp_path / "triggers.json",
+        token="token",
+    )
+    scheduler.session = FakeSession(versions)
+
+    assert scheduler.poll_once() == []
+    assert scheduler.poll_once() == []
+    assert scheduler.session.not_modified == 2
+
+    versions["a"] = 2
+    assert scheduler.poll_once() == ["any"]
+    assert triggered == [("any", {"a": 2, "b": 1})]
+
+    versions["b"] = 2
+    assert sorted(scheduler.poll_once()) == ["all", "any"]
+
+    # a restarted scheduler resumes from the persisted state
+    restarted = TriggerScheduler(
+        flows, trigger=lambda *a: None, state_path=tmp_path / "triggers.json", token="t"
+    )
+    restarted.session = FakeSession(versions)
+    assert restarted.poll_once() == []
+
+
+def test_from_flow():
+    flow = WatchedFlow.from_flow(
+        {"id": "f1", "policy": 3, "derived_from": [{"id": "a"}, {"id": "b"}]}
+    )
+    assert flow == WatchedFlow("f1", PolicyEnum.ALL, ["a", "b"])
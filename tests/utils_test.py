@@ -1,3 +1,5 @@
+from conftest import fake_http
+
 from aero_client.utils import aero_format
 
 
@@ -74,3 +76,83 @@ def test_ingestion_decorator():
             "size": 2,
         }
     }
+
+
+class _FakeResponse:
+    status_code = 200
+    content = b""
+
+
+def _capture_put(monkeypatch):
+    from aero_client import utils
+
+    uploads = {}
+
+    def put(url, headers, data):
+        uploads[url] = b"".join(data)
+        return _FakeResponse()
+
+    monkeypatch.setattr(utils, "get_transfer_token", lambda collection_uuid: "tok")
+    fake_http(monkeypatch, put=put)
+    return uploads
+
+
+def test_gcs_save_in_memory(monkeypatch, tmp_path):
+    import hashlib
+    import io
+
+    import pandas as pd
+
+    from aero_client.utils import gcs_save
+
+    uploads = _capture_put(monkeypatch)
+    df = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})
+
+    for data, expected in (
+        (b"raw bytes", b"raw bytes"),
+        (io.BytesIO(b"file-like"), b"file-like"),
+        (df, b"a,b\n1,x\n2,y\n"),
+    ):
+        md = gcs_save(None, "https://collection/", "uuid", data=data)
+        assert uploads[f"https://collection/{md['file_bn']}"] == expected
+        assert md["checksum"] == hashlib.md5(expected).hexdigest()
+        assert md["size"] == len(expected)
+
+    path = tmp_path / "out.csv"
+    path.write_bytes(b"on disk")
+    md = gcs_save(str(path), "https://collection/", "uuid")
+    assert uploads[f"https://collection/{md['file_bn']}"] == b"on disk"
+    assert md["file_format"] == ("text/csv", None)
+    assert not path.exists()
+
+
+def test_gcs_save_parquet(monkeypatch):
+    import io
+
+    import pandas as pd
+    import pytest
+
+    pa = pytest.importorskip("pyarrow")
+
+    from aero_client.utils import gcs_save
+
+    uploads = _capture_put(monkeypatch)
+    df = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})
+
+    for data, file_format in ((df, "parquet"), (pa.Table.from_pandas(df), None)):
+        md = gcs_save(None, "https://c/", "uuid", data=data, file_format=file_format)
+        assert md["file_format"] == ("application/vnd.apache.parquet", None)
+        stored = pd.read_parquet(io.BytesIO(uploads[f"https://c/{md['file_bn']}"]))
+        assert stored[["a", "b"]].equals(df)
+
+
+def test_aero_output_requires_one_source():
+    import pytest
+
+    from aero_client.error import ClientError
+    from aero_client.utils import AeroOutput
+
+    with pytest.raises(ClientError):
+        AeroOutput(name="out")
+    with pytest.raises(ClientError):
+        AeroOutput(name="out", path="/tmp/out", data=b"")
@@ -0,0 +1,72 @@
+import importlib.util
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+_SCRIPT = Path(__file__).parents[1] / "scripts" / "wastewater_transform.py"
+_spec = importlib.util.spec_from_file_location("wastewater_transform", _SCRIPT)
+wastewater_transform = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(wastewater_transform)
+
+
+def reference_transform(path):
+    """Single-frame implementation the chunked transform must reproduce."""
+    odata = pd.read_csv(path)
+    odata = odata.loc[
+        odata.method != 0, ["sars_cov_2", "sample_collect_date"]
+    ].reset_index(drop=True)
+    odata.columns = ["gene_copy", "date"]
+
+    reference_date = pd.Timestamp("1970-01-01")
+    odata["date"] = pd.to_datetime(odata["date"])
+    odata["num_date"] = (odata["date"] - reference_date).dt.days
+
+    odata["year"] = np.nan
+    odata.loc[odata["num_date"] < 19358, "year"] = 2022
+    odata.loc[(odata["num_date"] >= 19358) & (odata["num_date"] < 19724), "year"] = 2023
+    odata.loc[odata["num_date"] >= 19724, "year"] = 2024
+
+    odata["yearday"] = odata["num_date"]
+    for year, offset in ((2022, 52), (2023, 53), (2024, 54)):
+        odata.loc[odata["year"] == year, "yearday"] = (
+            odata.loc[odata["year"] == year, "num_date"] - (offset * 365) - 12
+        )
+
+    odata["year_day"] = odata["num_date"] - (52 * 365) - 12
+    odata["new_time"] = odata["year_day"] - (odata["year_day"].iloc[0] - 1)
+
+    odata["sum_genes"] = odata["gene_copy"]
+    odata["log_gene_copies"] = np.log10(odata["gene_copy"])
+
+    odata["epi_week2"] = (odata["yearday"] - 1) / 7 + 1
+    odata["epi_week"] = np.floor(odata["epi_week2"])
+    return odata
+
+
+def test_chunked_transform_matches_reference(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 1000
+    dates = pd.Timestamp("2022-06-01") + pd.to_timedelta(
+        np.sort(rng.integers(0, 900, n)), unit="D"
+    )
+    src = tmp_path / "wastewater.csv"
+    pd.DataFrame(
+        {
+            "sample_collect_date": dates.strftime("%Y-%m-%d"),
+            "method": rng.integers(0, 3, n),
+            "sars_cov_2": rng.uniform(1, 1e6, n),
+            "pcr_target": "sars-cov-2",
+        }
+    ).to_csv(src, index=False)
+
+    expected = reference_transform(src)
+    chunked = pd.concat(wastewater_transform.iter_transform(src, chunksize=97))
+    pd.testing.assert_frame_equal(chunked, expected, check_index_type=False)
+
+    out = tmp_path / "out.csv"
+    assert wastewater_transform.stream_transform(src, out, chunksize=97) == len(
+        expected
+    )
+    assert len(pd.read_csv(out)) == len(expected)